@@ -1,21 +1,149 @@
 # admin_routes.py - 관리자 관련 라우트 (PostgreSQL 버전)
 from flask import render_template, request, redirect, url_for, session, Response, jsonify
-from datetime import date
+from datetime import date, timedelta
 import csv
 import io
-from utils import login_required, parse_int, parse_float
-from calculations import calculate_dashboard_data, determine_health
+import json
+from utils import login_required, parse_int, parse_float, policy_from_thresholds
+from simulation import run_simulation, validate_scenario, MAX_SCENARIOS
+from http_cache import conditional_get, get_etag_stats
+from fragment_cache import render_dashboard, get_fragment_stats, fragments
+from jobs import job_runner
+from shared_settings import shared_settings
+from singleflight import single_flight, flights
+from live import hub as live_hub, event_stream
+from calculations import (calculate_dashboard_rows, determine_health, calculate_portfolio_health_history,
+                          load_labor_rate_table, get_company_rollups,
+                          get_forecasts)
+from app_logging import get_logger
+
+log = get_logger('admin')
+
+# 리포트 화면은 결과를 읽기만 하고 projects_data가 커서 기다린 요청에도 복사 없이 공유
+@single_flight('reports', key=lambda dm: None, copy_result=False)
+def build_reports_data(dm):
+    """리포트 화면 데이터 계산 (reports_data, projects_data)"""
+    # PostgreSQL 방식으로 데이터 조회
+    projects_data = dm.get_projects()
+    users = dm.get_users()
+    labor_costs = dm.get_labor_costs()
+    rate_table = load_labor_rate_table(labor_costs)
+    
+    # 간단한 리포트 데이터 계산
+    reports_data = {
+        'total_projects': len(projects_data),
+        'total_users': len([u for u in users.values() if u.get('role') == 'user']),
+        'total_work_types': len(labor_costs),
+        'projects_summary': [],
+        'total_cost': 0,
+        'total_workers': 0
+    }
+    
+    # 프로젝트별 요약
+    for project_name, project_data in projects_data.items():
+        work_types = project_data.get('work_types', [])
+        daily_data = project_data.get('daily_data', {})
+        
+        total_workers = 0
+        total_cost = 0
+        total_days = len(daily_data)
+        
+        # 총 인원 및 비용 계산
+        for date_key, date_data in daily_data.items():
+            for work_type, work_data in date_data.items():
+                workers = work_data.get('total', 0)
+                total_workers += workers
+                
+                # 해당 날짜에 유효했던 단가로 계산 (단가 변경이 과거 비용을 바꾸지 않도록)
+                if work_type in labor_costs:
+                    total_cost += rate_table.daily_cost(work_type, date_key, work_data)
+
+        # 상태 산정
+        p_status, _, p_meta = determine_health(project_data, labor_costs)
+
+        reports_data['projects_summary'].append({
+            'name': project_name,
+            'work_types_count': len(work_types),
+            'total_workers': total_workers,
+            'total_cost': total_cost,
+            'working_days': total_days,
+            'avg_progress': round(p_meta.get('avg_progress', 0.0), 1),
+            'status': p_status
+        })
+        
+        reports_data['total_cost'] += total_cost
+        reports_data['total_workers'] += total_workers
+    
+    return reports_data, projects_data
 
-def register_admin_routes(app, dm):
+def build_labor_csv(dm):
+    """전체 일일 출역 CSV 텍스트 (엑셀용 BOM 포함)"""
+    projects_data = dm.get_projects()
     
+    output = io.StringIO(newline='')
+    writer = csv.writer(output)
+    writer.writerow(['프로젝트', '날짜', '공종', '주간', '야간', '심야', '계', '공정율'])
+
+    for project_name, project_data in projects_data.items():
+        daily_data = project_data.get('daily_data', {})
+        for date_key, date_data in daily_data.items():
+            for work_type, work_data in date_data.items():
+                writer.writerow([
+                    project_name, date_key, work_type,
+                    parse_int(work_data.get('day', 0), 0),
+                    parse_int(work_data.get('night', 0), 0),
+                    parse_int(work_data.get('midnight', 0), 0),
+                    parse_int(work_data.get('total', 0), 0),
+                    parse_float(work_data.get('progress', 0), 0.0)
+                ])
+
+    return '\ufeff' + output.getvalue()  # BOM 추가(엑셀 한글 안전)
+
+# ===== 백그라운드 작업 핸들러 (jobs 프로세스 풀의 자식 프로세스에서 실행) =====
+_job_dm = None
+
+def _job_data_manager():
+    """작업 프로세스 안에서 쓸 DB 매니저 (자식 프로세스당 1개, 첫 작업 때 연결)"""
+    global _job_dm
+    if _job_dm is None:
+        from database import DatabaseManager
+        _job_dm = DatabaseManager(lazy=True)
+    return _job_dm
+
+def reports_job(params):
+    shared_settings.refresh()  # 위험도 임계값을 웹 워커와 같게
+    reports_data, _ = build_reports_data(_job_data_manager())
+    return json.dumps(reports_data, ensure_ascii=False, default=str), 'application/json', 'reports.json'
+
+def labor_csv_job(params):
+    return build_labor_csv(_job_data_manager()), 'text/csv; charset=utf-8', 'labor_data.csv'
+
+def register_admin_routes(app, dm):
+
+    # 백그라운드 작업 종류 등록
+    job_runner.register('reports', reports_job)
+    job_runner.register('csv', labor_csv_job)
+
     @app.route('/admin')
     @login_required(role='admin')
+    @conditional_get
     def admin_dashboard():
-        dashboard_data = calculate_dashboard_data()
-        return render_template('admin_dashboard.html', dashboard_data=dashboard_data)
+        return render_dashboard('admin_dashboard.html', calculate_dashboard_rows())
+
+    @app.route('/admin/live')
+    @login_required(role='admin')
+    def admin_live():
+        """대시보드 실시간 갱신 (Server-Sent Events)"""
+        q = live_hub.subscribe()
+        if q is None:
+            # 동시 연결 한도 초과: 204는 EventSource 재접속을 멈추므로 클라이언트는 새로고침 방식 유지
+            return Response(status=204)
+        return Response(event_stream(q), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
     @app.route('/admin/projects')
     @login_required(role='admin')
+    @conditional_get
     def admin_projects():
         # PostgreSQL 방식으로 데이터 조회
         labor_costs = dm.get_labor_costs()
@@ -127,7 +255,7 @@ def register_admin_routes(app, dm):
             return redirect(url_for('admin_projects'))
             
         except Exception as e:
-            print(f"프로젝트 업데이트 오류: {e}")
+            log.error("프로젝트 업데이트 오류: %s", e)
             return redirect(url_for('admin_projects'))
 
     # 사용자 관리
@@ -280,9 +408,18 @@ def register_admin_routes(app, dm):
                     night_cost = parse_int(request.form.get(night_key, '0'), 0)
                     midnight_cost = parse_int(request.form.get(midnight_key, '0'), 0)
                     
+                    # 적용 시작일 (미입력 시 오늘부터)
+                    effective_date = None
+                    if request.form.get('effective_date'):
+                        try:
+                            effective_date = date.fromisoformat(request.form['effective_date'])
+                        except ValueError:
+                            return jsonify({'success': False, 'message': '적용일 형식이 올바르지 않습니다.'})
+
                     # 값이 유효하면 업데이트
                     if day_cost >= 0 and night_cost >= 0 and midnight_cost >= 0:
-                        dm.save_labor_cost(work_type, day_cost, night_cost, midnight_cost)
+                        dm.save_labor_cost(work_type, day_cost, night_cost, midnight_cost,
+                                           effective_date=effective_date)
                         updated_work_type = work_type
                         break
             
@@ -335,7 +472,7 @@ def register_admin_routes(app, dm):
         if work_type in labor_costs:
             current_lock = labor_costs[work_type].get('locked', False)
             # PostgreSQL에는 별도의 lock 테이블이나 컬럼이 필요 - 일단 단순화
-            print(f"공종 잠금 토글: {work_type} - {not current_lock}")
+            log.info("공종 잠금 토글: %s - %s", work_type, not current_lock)
         
         return redirect(url_for('admin_labor_cost'))
 
@@ -387,22 +524,10 @@ def register_admin_routes(app, dm):
             }
         }
         
-        # utils.py의 HEALTH_POLICY 업데이트
-        from utils import HEALTH_POLICY
-        HEALTH_POLICY.update({
-            'COST_WARN_RATIO': settings['risk_thresholds']['cost_warn_ratio'] / 100.0,
-            'COST_DANGER_RATIO': settings['risk_thresholds']['cost_danger_ratio'] / 100.0,
-            'PROGRESS_WARN_DIFF': settings['risk_thresholds']['progress_warn_diff'] / 100.0,
-            'PROGRESS_DANGER_DIFF': settings['risk_thresholds']['progress_danger_diff'] / 100.0,
-            'WORKERS_WARN_DROP': -settings['risk_thresholds']['workers_warn_drop'] / 100.0,
-            'WORKERS_DANGER_DROP': -settings['risk_thresholds']['workers_danger_drop'] / 100.0,
-            'WORKERS_WARN_SURGE': settings['risk_thresholds']['workers_warn_surge'] / 100.0,
-            'WORKERS_DANGER_SURGE': settings['risk_thresholds']['workers_danger_surge'] / 100.0,
-        })
-        
         try:
-            # PostgreSQL에 설정 저장 로직 필요 (나중에 구현)
-            print("설정이 업데이트되었습니다.")
+            # 위험도 임계값은 공유 설정에 저장 (모든 워커가 같은 HEALTH_POLICY/ETag를 쓰도록)
+            shared_settings.update('health', **policy_from_thresholds(settings['risk_thresholds']))
+            log.info("설정이 업데이트되었습니다.")
             
             # 성공 메시지와 함께 리다이렉트
             return render_template('admin_settings.html', 
@@ -414,62 +539,168 @@ def register_admin_routes(app, dm):
                                  settings={**settings, 'theme': request.form.get('theme', 'dark')},
                                  error_msg=f"설정 저장 중 오류가 발생했습니다: {str(e)}")
 
+    @app.route('/admin/api/health-history')
+    @login_required(role='admin')
+    def health_history_api():
+        """일자별 위험도 이력 (추이 차트용). ?project=&from=YYYY-MM-DD&to=YYYY-MM-DD"""
+        try:
+            end = date.fromisoformat(request.args.get('to') or date.today().isoformat())
+            start = date.fromisoformat(request.args.get('from') or (end - timedelta(days=29)).isoformat())
+        except ValueError:
+            return jsonify({'success': False, 'message': '날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)'}), 400
+        if start > end:
+            return jsonify({'success': False, 'message': '시작일이 종료일보다 늦습니다.'}), 400
+        if (end - start).days > 366:
+            return jsonify({'success': False, 'message': '조회 기간은 최대 1년입니다.'}), 400
+
+        project_name = (request.args.get('project') or '').strip() or None
+        history = calculate_portfolio_health_history(start.isoformat(), end.isoformat(), project_name)
+        return jsonify({
+            'success': True,
+            'from': start.isoformat(),
+            'to': end.isoformat(),
+            'projects': history
+        })
+
+    @app.route('/admin/api/simulate', methods=['POST'])
+    @login_required(role='admin')
+    def simulate_api():
+        """노무단가/위험도 임계값 가정 시뮬레이션 (DB·현재 설정은 변경하지 않음)"""
+        data = request.get_json(silent=True) or {}
+        scenarios = data.get('scenarios')
+        if not isinstance(scenarios, list) or not scenarios:
+            return jsonify({'success': False, 'message': 'scenarios 목록을 입력해주세요.'}), 400
+        if len(scenarios) > MAX_SCENARIOS:
+            return jsonify({'success': False, 'message': f'시나리오는 최대 {MAX_SCENARIOS}개까지 가능합니다.'}), 400
+        for i, scenario in enumerate(scenarios):
+            error = validate_scenario(scenario)
+            if error:
+                return jsonify({'success': False, 'message': f'시나리오 {i + 1}: {error}'}), 400
+
+        return jsonify({'success': True, 'scenarios': run_simulation(scenarios)})
+
+    @app.route('/admin/api/companies')
+    @login_required(role='admin')
+    def company_rollups_api():
+        """업체별 집계 (페이지 단위). ?page=1&per_page=20"""
+        page = max(parse_int(request.args.get('page'), 1), 1)
+        per_page = min(max(parse_int(request.args.get('per_page'), 20), 1), 100)
+        rows = get_company_rollups()
+        start = (page - 1) * per_page
+        return jsonify({
+            'success': True,
+            'page': page,
+            'per_page': per_page,
+            'total': len(rows),
+            'pages': (len(rows) + per_page - 1) // per_page,
+            'companies': rows[start:start + per_page]
+        })
+
+    @app.route('/admin/api/forecast')
+    @login_required(role='admin')
+    def forecast_api():
+        """프로젝트·공종별 완료일/예산 소진일 예측. ?overrun=1이면 예산 초과 예상 프로젝트만"""
+        forecasts = get_forecasts()
+        if request.args.get('overrun') == '1':
+            forecasts = [f for f in forecasts
+                         if f['overrun'] or any(w['overrun'] for w in f['work_types'])]
+        return jsonify({'success': True, 'projects': forecasts})
+
+    @app.route('/admin/cache/etag', methods=['GET', 'POST'])
+    @login_required(role='admin')
+    def etag_settings():
+        """조건부 GET 사용 여부 조회/변경 및 엔드포인트별 304 적중 통계"""
+        from utils import ETAG_POLICY
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            enabled = bool(data['enabled']) if 'enabled' in data else not ETAG_POLICY['enabled']
+            shared_settings.update('etag', enabled=enabled)
+        return jsonify({'success': True, 'enabled': ETAG_POLICY['enabled'], 'stats': get_etag_stats()})
+
+    @app.route('/admin/cache/fragments', methods=['GET', 'POST'])
+    @login_required(role='admin')
+    def fragment_cache_settings():
+        """대시보드 행 조각 캐시 사용 여부 조회/변경 및 렌더링 시간 통계 (캐시 사용/미사용 비교)"""
+        from utils import FRAGMENT_POLICY
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            enabled = bool(data['enabled']) if 'enabled' in data else not FRAGMENT_POLICY['enabled']
+            shared_settings.update('fragments', enabled=enabled)
+            if data.get('clear'):
+                fragments.clear()
+        return jsonify({'success': True, **get_fragment_stats()})
+
+    @app.route('/admin/cache/snapshot', methods=['GET', 'POST'])
+    @login_required(role='admin')
+    def snapshot_settings():
+        """읽기 스냅샷 상태 (나이, 크기, 갱신 횟수) 조회 / POST {enabled, refresh}로 켜고 끄거나 전체 재생성"""
+        from utils import SNAPSHOT_POLICY
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if 'enabled' in data:
+                shared_settings.update('snapshot', enabled=bool(data['enabled']))
+                if SNAPSHOT_POLICY['enabled']:
+                    dm.snapshot.start()
+            if data.get('refresh'):
+                dm.snapshot.request_full_refresh()
+        return jsonify({'success': True, **dm.snapshot.stats()})
+
+    @app.route('/admin/cache/single-flight', methods=['GET', 'POST'])
+    @login_required(role='admin')
+    def single_flight_settings():
+        """동시 계산 합치기 사용 여부 조회/변경 및 계산별 대기/절약 통계. POST {enabled, reset}"""
+        from utils import SINGLE_FLIGHT_POLICY
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            if 'enabled' in data:
+                shared_settings.update('single_flight', enabled=bool(data['enabled']))
+            if data.get('reset'):
+                flights.reset_stats()
+        return jsonify({'success': True, 'enabled': SINGLE_FLIGHT_POLICY['enabled'], 'stats': flights.stats()})
+
+    # 백그라운드 작업
+    def job_status(job):
+        return {k: job.get(k) for k in ('id', 'kind', 'params', 'status', 'submitted_by', 'submitted_at',
+                                        'started_at', 'finished_at', 'error', 'size', 'deduplicated')
+                if k in job}
+
+    @app.route('/admin/jobs', methods=['GET', 'POST'])
+    @login_required(role='admin')
+    def admin_jobs():
+        """POST: 작업 등록 {kind: 'reports'|'csv', params: {}} / GET: 작업 목록"""
+        if request.method == 'POST':
+            data = request.get_json(silent=True) or {}
+            try:
+                job = job_runner.submit(data.get('kind', ''), data.get('params') or {}, session.get('username'))
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)}), 400
+            return jsonify({'success': True, 'job': job_status(job)}), 202
+        return jsonify({'success': True, 'jobs': [job_status(j) for j in job_runner.list()]})
+
+    @app.route('/admin/jobs/<job_id>')
+    @login_required(role='admin')
+    def admin_job_status(job_id):
+        job = job_runner.get(job_id)
+        if not job:
+            return jsonify({'success': False, 'message': '작업을 찾을 수 없습니다.'}), 404
+        return jsonify({'success': True, 'job': job_status(job)})
+
+    @app.route('/admin/jobs/<job_id>/download')
+    @login_required(role='admin')
+    def admin_job_download(job_id):
+        result = job_runner.result(job_id)
+        if not result:
+            return jsonify({'success': False, 'message': '완료된 작업 결과가 없습니다.'}), 404
+        data, mimetype, filename = result
+        return Response(data, mimetype=mimetype,
+                        headers={'Content-Disposition': f'attachment; filename={filename}'})
+
     # 리포트
     @app.route('/admin/reports')
     @login_required(role='admin')
+    @conditional_get
     def admin_reports():
-        # PostgreSQL 방식으로 데이터 조회
-        projects_data = dm.get_projects()
-        users = dm.get_users()
-        labor_costs = dm.get_labor_costs()
-        
-        # 간단한 리포트 데이터 계산
-        reports_data = {
-            'total_projects': len(projects_data),
-            'total_users': len([u for u in users.values() if u.get('role') == 'user']),
-            'total_work_types': len(labor_costs),
-            'projects_summary': [],
-            'total_cost': 0,
-            'total_workers': 0
-        }
-        
-        # 프로젝트별 요약
-        for project_name, project_data in projects_data.items():
-            work_types = project_data.get('work_types', [])
-            daily_data = project_data.get('daily_data', {})
-            
-            total_workers = 0
-            total_cost = 0
-            total_days = len(daily_data)
-            
-            # 총 인원 및 비용 계산
-            for date_data in daily_data.values():
-                for work_type, work_data in date_data.items():
-                    workers = work_data.get('total', 0)
-                    total_workers += workers
-                    
-                    if work_type in labor_costs:
-                        day_cost = work_data.get('day', 0) * labor_costs[work_type].get('day', 0)
-                        night_cost = work_data.get('night', 0) * labor_costs[work_type].get('night', 0)
-                        midnight_cost = work_data.get('midnight', 0) * labor_costs[work_type].get('midnight', 0)
-                        total_cost += day_cost + night_cost + midnight_cost
-
-            # 상태 산정
-            p_status, _, p_meta = determine_health(project_data, labor_costs)
-
-            reports_data['projects_summary'].append({
-                'name': project_name,
-                'work_types_count': len(work_types),
-                'total_workers': total_workers,
-                'total_cost': total_cost,
-                'working_days': total_days,
-                'avg_progress': round(p_meta.get('avg_progress', 0.0), 1),
-                'status': p_status
-            })
-            
-            reports_data['total_cost'] += total_cost
-            reports_data['total_workers'] += total_workers
-        
+        reports_data, projects_data = build_reports_data(dm)
         return render_template('admin_reports.html',
                                reports_data=reports_data,
                                projects_data=projects_data)
@@ -477,28 +708,8 @@ def register_admin_routes(app, dm):
     @app.route('/admin/reports/export/csv')
     @login_required(role='admin')
     def export_csv():
-        projects_data = dm.get_projects()
-        
-        output = io.StringIO(newline='')
-        writer = csv.writer(output)
-        writer.writerow(['프로젝트', '날짜', '공종', '주간', '야간', '심야', '계', '공정율'])
-
-        for project_name, project_data in projects_data.items():
-            daily_data = project_data.get('daily_data', {})
-            for date_key, date_data in daily_data.items():
-                for work_type, work_data in date_data.items():
-                    writer.writerow([
-                        project_name, date_key, work_type,
-                        parse_int(work_data.get('day', 0), 0),
-                        parse_int(work_data.get('night', 0), 0),
-                        parse_int(work_data.get('midnight', 0), 0),
-                        parse_int(work_data.get('total', 0), 0),
-                        parse_float(work_data.get('progress', 0), 0.0)
-                    ])
-
-        csv_text = '\ufeff' + output.getvalue()  # BOM 추가(엑셀 한글 안전)
         return Response(
-            csv_text,
+            build_labor_csv(dm),
             mimetype='text/csv; charset=utf-8',
             headers={'Content-Disposition': 'attachment; filename=labor_data.csv'}
-        )
\ No newline at end of file
+        )
@@ -0,0 +1,182 @@
+# anomaly.py - 공종별 출역 이상치 탐지 (이동 평균/분산 z-score)
+import threading
+from bisect import insort
+from collections import deque
+from datetime import date, timedelta
+from utils import ANOMALY_POLICY, parse_int
+from change_tracker import ChangeTracker
+from app_logging import get_logger
+
+log = get_logger('anomaly')
+
+class _RollingStats:
+    """최근 N개 (날짜, 값)의 합·제곱합. 날짜순 추가/수정/제거는 O(1)."""
+
+    def __init__(self, size):
+        self.size = size
+        self.points = deque()  # 날짜 오름차순 (date_key, value)
+        self.values = {}       # date_key -> value
+        self.s = 0.0
+        self.ss = 0.0
+
+    def stats_excluding(self, date_key):
+        """date_key 값을 제외한 (표본 수, 평균, 표준편차)"""
+        n, s, ss = len(self.values), self.s, self.ss
+        if date_key in self.values:
+            v = self.values[date_key]
+            n, s, ss = n - 1, s - v, ss - v * v
+        if n <= 0:
+            return 0, 0.0, 0.0
+        mean = s / n
+        var = max(ss / n - mean * mean, 0.0)
+        return n, mean, var ** 0.5
+
+    def set(self, date_key, value):
+        if date_key in self.values:
+            old = self.values[date_key]
+            self.s += value - old
+            self.ss += value * value - old * old
+            self.values[date_key] = value
+            for i, (d, _) in enumerate(reversed(self.points)):
+                if d == date_key:
+                    self.points[len(self.points) - 1 - i] = (date_key, value)
+                    break
+            return
+        if len(self.points) >= self.size and date_key < self.points[0][0]:
+            return  # 창보다 오래된 날짜는 반영하지 않음
+        if not self.points or date_key > self.points[-1][0]:
+            self.points.append((date_key, value))
+        else:
+            # 과거 날짜 뒤늦은 입력 (드묾)
+            items = list(self.points)
+            insort(items, (date_key, value))
+            self.points = deque(items)
+        self.values[date_key] = value
+        self.s += value
+        self.ss += value * value
+        if len(self.points) > self.size:
+            old_key, old_value = self.points.popleft()
+            del self.values[old_key]
+            self.s -= old_value
+            self.ss -= old_value * old_value
+
+class AttendanceAnomalyDetector:
+    """(프로젝트, 공종[, 요일])별 이동 통계를 유지하고 최신 입력의 z-score로 이상치를 판단."""
+
+    def __init__(self, policy=None):
+        self.policy = policy or ANOMALY_POLICY
+        self._stats = {}   # (project, work_type, weekday|None) -> _RollingStats
+        self._latest = {}  # (project, work_type) -> 최신 입력일 평가 결과
+        self._loaded = False
+        self._changes = ChangeTracker()  # 다른 워커의 입력 감지
+        self._lock = threading.Lock()
+
+    def _stats_for(self, project_name, work_type, date_key):
+        if self.policy.get('BY_WEEKDAY', True):
+            key = (project_name, work_type, date.fromisoformat(date_key).weekday())
+            size = self.policy.get('WEEKDAY_WINDOW', 6)
+        else:
+            key = (project_name, work_type, None)
+            size = self.policy.get('WINDOW_DAYS', 28)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats[key] = _RollingStats(size)
+        return stats
+
+    def _observe(self, project_name, work_type, date_key, value):
+        stats = self._stats_for(project_name, work_type, date_key)
+        stats.set(date_key, value)
+
+        latest = self._latest.get((project_name, work_type))
+        if latest is not None and latest['date'] > date_key:
+            # 과거 날짜의 늦은 입력/수정: 통계가 바뀌었으므로 최신 입력일을 다시 평가
+            date_key, value = latest['date'], latest['value']
+            stats = self._stats_for(project_name, work_type, date_key)
+        self._evaluate(stats, project_name, work_type, date_key, value)
+
+    def _evaluate(self, stats, project_name, work_type, date_key, value):
+        n, mean, std = stats.stats_excluding(date_key)
+        level, z = 'good', 0.0
+        if n >= self.policy.get('MIN_SAMPLES', 4):
+            z = (value - mean) / max(std, self.policy.get('MIN_STD', 1.0))
+            if abs(z) >= self.policy.get('Z_DANGER', 3.0):
+                level = 'bad'
+            elif abs(z) >= self.policy.get('Z_WARN', 2.0):
+                level = 'warn'
+        self._latest[(project_name, work_type)] = {
+            'work_type': work_type,
+            'date': date_key,
+            'value': value,
+            'mean': round(mean, 1),
+            'std': round(std, 1),
+            'z': round(z, 2),
+            'samples': n,
+            'level': level,
+        }
+
+    def observe(self, project_name, work_type, date_key, value):
+        """입력 1건 반영 (저장 시 호출, O(1))"""
+        with self._lock:
+            self._observe(project_name, work_type, str(date_key), parse_int(value, 0))
+
+    def seed_days(self):
+        """통계를 채우는 데 필요한 최근 기간(일): 비교 표본 + 최신 입력일"""
+        if self.policy.get('BY_WEEKDAY', True):
+            return (self.policy.get('WEEKDAY_WINDOW', 6) + 1) * 7
+        return self.policy.get('WINDOW_DAYS', 28) + 1
+
+    def seed(self, history):
+        """{프로젝트명: {날짜: {공종: {...}}}} 일일 데이터로 통계를 새로 채움"""
+        with self._lock:
+            self._stats, self._latest = {}, {}
+            for project_name, daily_data in history.items():
+                for date_key in sorted(daily_data):
+                    for work_type, wd in daily_data[date_key].items():
+                        self._observe(project_name, work_type, date_key, parse_int(wd.get('total', 0), 0))
+            self._loaded = True
+
+    def sync(self, dm):
+        """다른 워커에서 저장된 입력(과거 날짜의 늦은 입력 포함)을 변경 로그에서 반영.
+
+        처음 호출이거나 변경 로그를 따라가지 못하면 seed_days() 기간의 일일 데이터로 다시 채운다
+        (대시보드 조회 기간(30일)만으로는 요일별 표본이 모자라 재시작 직후 판단이 거의 안 됨).
+        """
+        try:
+            changes = self._changes.poll(dm)
+        except Exception as e:
+            log.warning("변경 로그 확인 실패 - 이상치 통계 유지: %s", e)
+            return
+        if changes is None or not self._loaded:
+            snapshot = dm.snapshot.current() if dm.snapshot is not None else None
+            today = date.today()
+            start = today - timedelta(days=self.seed_days())
+            self.seed(dm.get_daily_data_until(today.isoformat(), start_date=start.isoformat()))
+            if snapshot is not None:
+                # 스냅샷이 아직 반영하지 않은 변경은 다음 sync()에서 다시 받음 (같은 값 반영은 결과가 같음)
+                self._changes.rewind(snapshot.seq)
+            return
+        for table, action, data in changes:
+            self.on_data_write(table, action, data)
+
+    def remove_project(self, project_name):
+        with self._lock:
+            self._stats = {k: v for k, v in self._stats.items() if k[0] != project_name}
+            self._latest = {k: v for k, v in self._latest.items() if k[0] != project_name}
+
+    def project_anomalies(self, project_name):
+        """프로젝트의 최신 입력 중 이상치(warn/bad) 목록 (|z| 큰 순)"""
+        with self._lock:
+            rows = [dict(v) for k, v in self._latest.items()
+                    if k[0] == project_name and v['level'] != 'good']
+        rows.sort(key=lambda r: -abs(r['z']))
+        return rows
+
+    def on_data_write(self, table, action, data):
+        """DatabaseManager 쓰기 알림 콜백"""
+        if table == 'daily_data':
+            for row in data.get('rows') or [data]:
+                self.observe(row['project_name'], row['work_type'], row['work_date'], row['total'])
+        elif table == 'projects' and action == 'delete':
+            self.remove_project(data['project_name'])
+
+detector = AttendanceAnomalyDetector()
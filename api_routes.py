@@ -0,0 +1,310 @@
+# api_routes.py - 버전 JSON API (/api/v1) - 모바일/스크립트용
+import re
+import json
+import base64
+from datetime import date
+from functools import wraps
+from flask import request, session, Response
+from utils import parse_int, parse_float, CHANGE_FEED_POLICY
+from calculations import calculate_dashboard_data, calculate_project_summary
+from http_cache import conditional_get
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+DASHBOARD_FIELDS = {
+    'project_name', 'recent_date', 'today_workers', 'contract_workers', 'cumulative_workers',
+    'schedule_rate', 'avg_progress', 'work_count', 'status', 'status_color', 'health_meta', 'anomalies',
+}
+SUMMARY_FIELDS = {
+    'work_type', 'today', 'today_day', 'today_night', 'today_midnight', 'cumulative', 'cumulative_day',
+    'cumulative_night', 'cumulative_midnight', 'today_progress', 'cumulative_progress',
+}
+DAILY_FIELDS = {'date', 'work_type', 'day', 'night', 'midnight', 'total', 'progress'}
+
+# 오프라인 일괄 전송 한도 (요청당)
+MAX_BATCH_SUBMISSIONS = 200
+MAX_BATCH_ENTRIES = 2000
+SUBMISSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{8,64}$')
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+def compact_json(data, status=200):
+    """공백 없는 JSON 응답 (한글은 그대로)"""
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=str)
+    return Response(body, status=status, mimetype='application/json')
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values, ensure_ascii=False).encode('utf-8')).decode('ascii').rstrip('=')
+
+# 커서 값 종류: str, int(0 이상 bigint 범위), CURSOR_DATE(YYYY-MM-DD 문자열)
+CURSOR_DATE = 'date'
+
+def decode_cursor(cursor, shape):
+    """cursor → 값 목록. 길이/값 종류가 shape과 다르면 ApiError(400) (잘못된 값이 DB 조회까지 가지 않도록)"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError('cursor 값이 올바르지 않습니다.')
+    if not isinstance(values, list) or len(values) != len(shape):
+        raise ApiError('cursor 값이 올바르지 않습니다.')
+    for value, kind in zip(values, shape):
+        if kind == CURSOR_DATE:
+            try:
+                date.fromisoformat(value)
+            except (TypeError, ValueError):
+                raise ApiError('cursor 값이 올바르지 않습니다.')
+        elif not isinstance(value, kind) or isinstance(value, bool) or (
+                kind is int and not 0 <= value < 2 ** 63):
+            raise ApiError('cursor 값이 올바르지 않습니다.')
+    return values
+
+def parse_fields(allowed):
+    """?fields=a,b,c → 선택 필드 집합 (없으면 None = 전체)"""
+    raw = (request.args.get('fields') or '').strip()
+    if not raw:
+        return None
+    fields = {f.strip() for f in raw.split(',') if f.strip()}
+    unknown = fields - allowed
+    if unknown:
+        raise ApiError(f"알 수 없는 필드: {', '.join(sorted(unknown))}")
+    return fields
+
+def project(rows, fields):
+    if fields is None:
+        return rows
+    return [{k: v for k, v in row.items() if k in fields} for row in rows]
+
+def parse_limit():
+    return min(max(parse_int(request.args.get('limit'), DEFAULT_LIMIT), 1), MAX_LIMIT)
+
+def parse_date_arg(name):
+    value = (request.args.get(name) or '').strip()
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise ApiError(f'{name} 날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)')
+
+def parse_submission(raw, projects_data):
+    """오프라인 제출 1건 검증 → 정규화된 dict (잘못되면 ApiError)"""
+    if not isinstance(raw, dict):
+        raise ApiError('제출 형식이 올바르지 않습니다.')
+    submission_id = str(raw.get('submission_id') or '')
+    if not SUBMISSION_ID_PATTERN.match(submission_id):
+        raise ApiError('submission_id 형식이 올바르지 않습니다.')
+    project_name = raw.get('project_name')
+    if project_name not in projects_data:
+        raise ApiError('프로젝트를 찾을 수 없습니다.', 404)
+    try:
+        work_date = date.fromisoformat(str(raw.get('work_date') or '')).isoformat()
+    except ValueError:
+        raise ApiError('work_date 날짜 형식이 올바르지 않습니다. (YYYY-MM-DD)')
+    entries = raw.get('entries')
+    if not isinstance(entries, list) or not entries:
+        raise ApiError('entries가 비어 있습니다.')
+
+    work_types = set(projects_data[project_name].get('work_types') or [])
+    parsed = []
+    for e in entries:
+        if not isinstance(e, dict) or e.get('work_type') not in work_types:
+            raise ApiError(f"프로젝트에 없는 공종입니다: {e.get('work_type') if isinstance(e, dict) else e}")
+        row = {'work_type': e['work_type'], 'progress': min(max(parse_float(e.get('progress')), 0.0), 100.0)}
+        for shift in ('day', 'night', 'midnight'):
+            row[shift] = parse_int(e.get(shift))
+            if row[shift] < 0:
+                raise ApiError('인원은 0 이상이어야 합니다.')
+        parsed.append(row)
+    return {'submission_id': submission_id, 'project_name': project_name, 'work_date': work_date, 'entries': parsed}
+
+def api_login_required(role=None):
+    """API용 인증 데코레이터 (리다이렉트 대신 401/403 JSON)"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if 'username' not in session:
+                return compact_json({'success': False, 'message': '로그인이 필요합니다.'}, 401)
+            if role and session.get('role') != role:
+                return compact_json({'success': False, 'message': '권한이 없습니다.'}, 403)
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def register_api_routes(app, dm):
+    """/api/v1 JSON API 라우트를 등록합니다."""
+
+    @app.errorhandler(ApiError)
+    def handle_api_error(e):
+        return compact_json({'success': False, 'message': e.message}, e.status)
+
+    def check_project_access(project_name, projects_data=None):
+        if projects_data is not None and project_name not in projects_data:
+            raise ApiError('프로젝트를 찾을 수 없습니다.', 404)
+        if session.get('role') != 'admin':
+            user = dm.get_users().get(session['username'], {})
+            if project_name not in (user.get('projects') or []):
+                raise ApiError('권한이 없습니다.', 403)
+
+    @app.route('/api/v1/dashboard')
+    @api_login_required(role='admin')
+    @conditional_get
+    def api_dashboard():
+        """대시보드 행 목록. ?after=<cursor>&limit=&fields="""
+        fields = parse_fields(DASHBOARD_FIELDS)
+        limit = parse_limit()
+        after = decode_cursor(request.args['after'], (str,))[0] if request.args.get('after') else None
+
+        rows = sorted(calculate_dashboard_data(), key=lambda r: r['project_name'])
+        if after is not None:
+            rows = [r for r in rows if r['project_name'] > after]
+        page = rows[:limit]
+        next_cursor = encode_cursor([page[-1]['project_name']]) if len(rows) > limit else None
+        return compact_json({'items': project(page, fields), 'next_cursor': next_cursor})
+
+    @app.route('/api/v1/projects/<project_name>/summary')
+    @api_login_required()
+    @conditional_get
+    def api_project_summary(project_name):
+        """공종별 당일/누계 요약. ?date=YYYY-MM-DD&after=<cursor>&limit=&fields="""
+        fields = parse_fields(SUMMARY_FIELDS)
+        limit = parse_limit()
+        check_project_access(project_name, dm.get_projects(include_daily_data=False))
+        current_date = parse_date_arg('date') or date.today().isoformat()
+
+        summary, totals = calculate_project_summary(project_name, current_date)
+        start = 0
+        if request.args.get('after'):
+            after = decode_cursor(request.args['after'], (str,))[0]
+            names = [row['work_type'] for row in summary]
+            if after not in names:
+                raise ApiError('cursor 값이 올바르지 않습니다.')
+            start = names.index(after) + 1
+        page = summary[start:start + limit]
+        next_cursor = encode_cursor([page[-1]['work_type']]) if start + limit < len(summary) else None
+        return compact_json({
+            'project_name': project_name,
+            'date': current_date,
+            'items': project(page, fields),
+            'totals': totals,
+            'next_cursor': next_cursor,
+        })
+
+    @app.route('/api/v1/projects/<project_name>/daily')
+    @api_login_required()
+    @conditional_get
+    def api_project_daily(project_name):
+        """일일 출역 행 (날짜, 공종 순 키셋 페이지). ?from=&to=&after=<cursor>&limit=&fields="""
+        fields = parse_fields(DAILY_FIELDS)
+        limit = parse_limit()
+        check_project_access(project_name, dm.get_projects(include_daily_data=False))
+        start_date, end_date = parse_date_arg('from'), parse_date_arg('to')
+
+        after = None
+        if request.args.get('after'):
+            after = decode_cursor(request.args['after'], (CURSOR_DATE, str))
+
+        # 다음 페이지 존재 여부 확인을 위해 1건 더 조회
+        rows = dm.get_daily_rows(project_name, start_date, end_date, after, limit + 1)
+        page = rows[:limit]
+        next_cursor = encode_cursor([page[-1]['date'], page[-1]['work_type']]) if len(rows) > limit else None
+        return compact_json({
+            'project_name': project_name,
+            'items': project(page, fields),
+            'next_cursor': next_cursor,
+        })
+
+    @app.route('/api/v1/attendance/batch', methods=['POST'])
+    @api_login_required()
+    def api_attendance_batch():
+        """오프라인 대기열 일괄 전송. 제출별 결과: applied / duplicate(이미 반영) / rejected(재전송 불필요)"""
+        payload = request.get_json(silent=True) or {}
+        submissions = payload.get('submissions')
+        if not isinstance(submissions, list) or not submissions:
+            raise ApiError('submissions가 비어 있습니다.')
+        if len(submissions) > MAX_BATCH_SUBMISSIONS:
+            raise ApiError(f'한 번에 최대 {MAX_BATCH_SUBMISSIONS}건까지 전송할 수 있습니다.', 413)
+
+        projects_data = dm.get_projects(include_daily_data=False)
+        allowed = None
+        if session.get('role') != 'admin':
+            allowed = set(dm.get_users().get(session['username'], {}).get('projects') or [])
+
+        # 결과는 요청 순서(index)대로. submission_id가 없거나 잘못된 제출도 서로 섞이지 않도록 index로 구분
+        results, seen, valid = [], set(), []
+        for index, raw in enumerate(submissions):
+            submission_id = raw.get('submission_id') if isinstance(raw, dict) else None
+            if not isinstance(submission_id, str) or not SUBMISSION_ID_PATTERN.match(submission_id):
+                results.append({'index': index, 'submission_id': submission_id if isinstance(submission_id, str) else None,
+                                'status': 'rejected', 'message': 'submission_id 형식이 올바르지 않습니다.'})
+                continue
+            if submission_id in seen:
+                # 같은 요청 안의 중복 제출: 첫 제출로 처리되므로 재전송 불필요 (index별 결과는 유지)
+                results.append({'index': index, 'submission_id': submission_id, 'status': 'duplicate'})
+                continue
+            seen.add(submission_id)
+            try:
+                submission = parse_submission(raw, projects_data)
+                if allowed is not None and submission['project_name'] not in allowed:
+                    raise ApiError('권한이 없습니다.', 403)
+            except ApiError as e:
+                results.append({'index': index, 'submission_id': submission_id, 'status': 'rejected', 'message': e.message})
+                continue
+            results.append({'index': index, 'submission_id': submission_id, 'status': None})
+            valid.append(submission)
+        if sum(len(s['entries']) for s in valid) > MAX_BATCH_ENTRIES:
+            raise ApiError(f'한 번에 최대 {MAX_BATCH_ENTRIES}행까지 전송할 수 있습니다.', 413)
+
+        duplicates = dm.save_daily_data_batch(valid, username=session['username'])
+        for r in results:
+            if r['status'] is None:
+                r['status'] = 'duplicate' if r['submission_id'] in duplicates else 'applied'
+        counts = {status: sum(1 for r in results if r['status'] == status)
+                  for status in ('applied', 'duplicate', 'rejected')}
+        return compact_json({'success': True, 'results': results, **counts})
+
+    @app.route('/api/v1/changes')
+    @api_login_required()
+    def api_changes():
+        """증분 동기화: ?since=<cursor>&limit= 이후 변경 목록 (번호 순).
+
+        since 없이 호출하거나 커서가 보관 기간보다 오래되면 reset=true와 현재 커서를 돌려준다.
+        이 경우 전체 데이터를 다시 받은 뒤 그 커서부터 이어서 동기화한다.
+        """
+        limit = min(max(parse_int(request.args.get('limit'), DEFAULT_LIMIT), 1), CHANGE_FEED_POLICY['max_limit'])
+        since = None
+        if request.args.get('since'):
+            since = decode_cursor(request.args['since'], (int,))[0]
+
+        project_names = None
+        if session.get('role') != 'admin':
+            project_names = dm.get_users().get(session['username'], {}).get('projects') or []
+        rows, head, purged_through = dm.get_changes(
+            since or 0, limit + 1 if since is not None else 0, project_names,
+            include_users=session.get('role') == 'admin')
+        if since is None or since < purged_through or since > head:
+            return compact_json({'items': [], 'cursor': encode_cursor([head]), 'has_more': False, 'reset': True})
+
+        page = rows[:limit]
+        has_more = len(rows) > limit
+        # 다 읽었으면 (권한 밖 항목을 건너뛴 경우 포함) 현재 마지막 번호까지 진행
+        cursor = page[-1]['seq'] if has_more else head
+        return compact_json({
+            'items': [{
+                'seq': row['seq'],
+                'table': row['table_name'],
+                'action': row['action'],
+                'key': row['entity_key'],
+                'data': row['data'],
+                'at': row['created_at'].isoformat() if row['created_at'] else None,
+            } for row in page],
+            'cursor': encode_cursor([cursor]),
+            'has_more': has_more,
+            'reset': False,
+        })
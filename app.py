@@ -1,29 +1,84 @@
 # app.py - 메인 애플리케이션 (PostgreSQL 버전)
+import time
+_startup_phases = []  # (단계, 초) - 기동 시간 로그용
+_phase_start = time.perf_counter()
+
+def _end_phase(name):
+    global _phase_start
+    now = time.perf_counter()
+    _startup_phases.append((name, now - _phase_start))
+    _phase_start = now
+
 from flask import Flask, render_template, request, redirect, url_for, session, jsonify
 from datetime import date, datetime
 import os
 
+# 구조화 로그 (큐 + 백그라운드 기록 스레드). 워커에서는 포크 후 다시 시작
+import app_logging
+app_logging.start()
+log = app_logging.get_logger('app')
+
 # PostgreSQL 데이터베이스 매니저 사용
 from database import DatabaseManager
 
 from calculations import calculate_project_work_summary
 from admin_routes import register_admin_routes
 from user_routes import register_user_routes
+from api_routes import register_api_routes
+from assets import asset_url, render_service_worker
 
 app = Flask(__name__)
 # 세션 키는 환경변수 우선
 app.secret_key = os.environ.get('SECRET_KEY', 'change_me_in_env')
 app.config['JSON_AS_ASCII'] = False
 
-# PostgreSQL 데이터 매니저 초기화
+# 응답 압축 (gzip/brotli) 및 사전 압축 정적 파일
+from compression import CompressionMiddleware
+app.wsgi_app = CompressionMiddleware(app.wsgi_app, static_dir=os.path.join(app.root_path, 'static'))
+
+# PostgreSQL 데이터 매니저 초기화 (연결은 첫 쿼리 때 - DB 일시 장애로 기동이 막히거나 죽지 않음)
+_end_phase('imports')
 try:
-    dm = DatabaseManager()
-    print("✅ PostgreSQL 데이터베이스 연결 성공")
+    dm = DatabaseManager(lazy=True)
 except Exception as e:
-    print(f"❌ 데이터베이스 연결 실패: {e}")
+    log.error("데이터베이스 설정 오류: %s", e)
     exit(1)
+_end_phase('db')
 from utils import set_data_manager
 set_data_manager(dm)
+# 출역 저장 시 이상치 통계 갱신
+from anomaly import detector as anomaly_detector
+dm.add_write_listener(anomaly_detector.on_data_write)
+# 데이터 변경 시 ETag용 데이터 버전 증가
+from http_cache import conditional_get, on_data_write as bump_data_version
+dm.add_write_listener(bump_data_version)
+# 대시보드 실시간 갱신 알림 (다른 워커로 NOTIFY 전달)
+from live import hub as live_hub
+dm.add_write_listener(live_hub.on_data_write)
+# 노무단가 변경 시 공종명 유사도 색인 재생성
+from work_type_index import work_type_index
+dm.add_write_listener(work_type_index.on_data_write)
+# 출역/프로젝트 변경 시 해당 프로젝트 예측만 다시 계산
+from calculations import mark_forecast_dirty
+dm.add_write_listener(mark_forecast_dirty)
+# 대시보드 행/조각 캐시 키의 프로젝트별 변경 버전
+from calculations import dashboard_versions
+dm.add_write_listener(dashboard_versions.on_data_write)
+# 프로젝트/출역/단가 변경 시 업체별 집계 캐시 무효화
+from calculations import invalidate_company_rollups
+dm.add_write_listener(invalidate_company_rollups)
+# 읽기 스냅샷 모드 (DATA_SNAPSHOT=1): 조회는 메모리 스냅샷, 쓰기 후 변경분만 다시 조회
+from snapshot import SnapshotStore
+from utils import SNAPSHOT_POLICY
+dm.snapshot = SnapshotStore(dm)
+dm.add_write_listener(dm.snapshot.on_data_write)
+# 관리 화면 설정(캐시 토글, 위험도 임계값)은 워커 간 공유 파일에서 요청마다 확인
+from shared_settings import shared_settings
+
+@app.before_request
+def sync_shared_settings():
+    if shared_settings.refresh() and SNAPSHOT_POLICY['enabled']:
+        dm.snapshot.start()
 # 데이터 새로고침 제거 (PostgreSQL은 실시간 연결)
 # @app.before_request 제거
 
@@ -41,7 +96,8 @@ def format_currency(value):
 def utility_processor():
     return dict(
         calculate_project_work_summary=calculate_project_work_summary,
-        sum=sum
+        sum=sum,
+        asset_url=lambda filename: asset_url(app.static_folder, filename)
     )
 
 # ===== 기본 인증 라우트 =====
@@ -70,7 +126,7 @@ def login_post():
         else:
             return render_template('login.html', error='아이디 또는 비밀번호가 틀렸습니다.')
     except Exception as e:
-        print(f"로그인 에러: {e}")
+        log.error("로그인 에러: %s", e)
         return render_template('login.html', error='데이터베이스 연결 문제가 발생했습니다.')
 
 @app.route('/logout')
@@ -81,8 +137,10 @@ def logout():
 # ===== PWA 지원 라우트 =====
 @app.route('/sw.js')
 def service_worker():
-    from flask import send_from_directory
-    return send_from_directory('static', 'sw.js', mimetype='application/javascript')
+    # 사전 캐시 목록(콘텐츠 해시)을 붙여 제공, 갱신 확인이 늦지 않도록 캐시하지 않음
+    response = app.response_class(render_service_worker(app.static_folder), mimetype='application/javascript')
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/manifest.json')
 def manifest():
@@ -94,16 +152,14 @@ def manifest():
 def check_work_type_similarity():
     data = request.get_json()
     new_type = (data.get('work_type', '') or '').strip()
-    labor_costs = dm.get_labor_costs()
-    existing_types = list(labor_costs.keys())
-    similar_types = []
-    for existing in existing_types:
-        if new_type in existing or existing in new_type:
-            if new_type.lower() != existing.lower():
-                similar_types.append(existing)
-    return jsonify({'similar_types': similar_types, 'has_similarity': len(similar_types) > 0})
+    # 입력 중에도 호출되므로 DB 조회 없이 메모리 색인에서 검색 (노무단가 변경 시 재색인)
+    candidates = work_type_index.search(new_type)
+    similar_types = [c['work_type'] for c in candidates]
+    return jsonify({'similar_types': similar_types, 'candidates': candidates,
+                    'has_similarity': len(similar_types) > 0})
 
 @app.route('/get-available-work-types')
+@conditional_get
 def get_available_work_types():
     labor_costs = dm.get_labor_costs()
     return jsonify({'work_types': list(labor_costs.keys())})
@@ -136,20 +192,100 @@ def update_work_type_name():
 # ===== 시스템 초기화 제거 =====
 # reset-all-data 라우트 제거 (PostgreSQL에서는 필요없음)
 
+# ===== 상태 점검 (로그인 불필요) =====
+import lifecycle
+
+@app.route('/healthz')
+def healthz():
+    """프로세스 생존 확인 (DB를 건드리지 않음)"""
+    return jsonify({'status': 'ok', 'pid': os.getpid()})
+
+@app.route('/readyz')
+def readyz():
+    """트래픽 수신 가능 여부: DB 응답 + 워밍업 완료"""
+    warm = lifecycle.warm_status()
+    checks = {'database': dm.ping(), 'warm': warm['warm']}
+    if SNAPSHOT_POLICY['enabled']:
+        checks['snapshot'] = dm.snapshot.current() is not None
+    ready = all(checks.values())
+    response = jsonify({'status': 'ready' if ready else 'not_ready', 'checks': checks,
+                        'warming': warm['warming'], 'warm_up_failed': warm['failed']})
+    response.headers['Cache-Control'] = 'no-store'
+    return response, (200 if ready else 503)
+
 # ===== 라우트 등록 =====
+from metrics import register_metrics_routes, registry as metrics_registry
+from server_timing import register_timing_hooks
+from profiler import register_profiling_routes
+app_logging.register_logging_hooks(app)  # 요청 ID를 다른 훅보다 먼저 부여
+register_metrics_routes(app, dm)
+register_timing_hooks(app)
+register_profiling_routes(app)
 register_admin_routes(app, dm)
 register_user_routes(app, dm)
+register_api_routes(app, dm)
+_end_phase('routes')
+
+# ===== 워커 수명 주기 (gunicorn.conf.py 훅에서 호출) =====
+# 스레드/연결은 포크 이후 워커에서 시작해야 preload 모드에서도 공유되지 않음
+from calculations import shutdown_process_pool, calculate_dashboard_data
+from jobs import job_runner
+
+def _close_before_fork():
+    dm.close()
+    shutdown_process_pool()
+    job_runner.shutdown()
+    app_logging.stop()  # 남은 로그 기록 후 기록 스레드 종료 (포크 시 큐 잠금 공유 방지)
+
+def _reinit_worker():
+    app_logging.after_fork()
+    dm.after_fork()
+    dm.start_compaction()
+    live_hub.after_fork()
+    metrics_registry.start()
+    if SNAPSHOT_POLICY['enabled']:
+        dm.snapshot.start()
+
+def _warm_templates():
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+
+def _warm_snapshot():
+    if SNAPSHOT_POLICY['enabled'] and not dm.snapshot.wait_ready(30):
+        log.warning("스냅샷 준비 시간 초과 - DB 조회로 시작합니다.")
+
+def _warm_dashboard():
+    calculate_dashboard_data()
+    work_type_index.search('')
+
+def _shutdown_worker():
+    shutdown_process_pool()
+    job_runner.shutdown()
+    dm.close()
+    metrics_registry.shutdown()
+    app_logging.stop()
+
+lifecycle.register('pre_fork', _close_before_fork)
+lifecycle.register('worker_init', _reinit_worker)
+lifecycle.register('warm_up', _warm_templates)
+lifecycle.register('warm_up', _warm_snapshot)
+lifecycle.register('warm_up', _warm_dashboard)
+lifecycle.register('worker_exit', _shutdown_worker)
+_end_phase('lifecycle')
+log.info("앱 로드 완료", extra={'phases_ms': {name: round(seconds * 1000) for name, seconds in _startup_phases}})
 
 # ===== 실행 =====
 if __name__ == '__main__':
-    print("🚀 노무비 관리 시스템 시작...")
+    lifecycle.init_worker()
+    lifecycle.wait_warm()
+    log.info("노무비 관리 시스템 시작...")
     try:
         users = dm.get_users()
         projects = dm.get_projects()
         labor_costs = dm.get_labor_costs()
-        print(f"📊 데이터 로드: 프로젝트 {len(projects)}개, 사용자 {len(users)}개, 노무단가 {len(labor_costs)}개")
+        log.info("데이터 로드: 프로젝트 %s개, 사용자 %s개, 노무단가 %s개", len(projects), len(users), len(labor_costs))
     except Exception as e:
-        print(f"❌ 데이터 확인 실패: {e}")
+        log.error("데이터 확인 실패: %s", e)
     
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
\ No newline at end of file
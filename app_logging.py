@@ -0,0 +1,181 @@
+# app_logging.py - 구조화 로그 (JSON 한 줄), 큐 + 백그라운드 기록 스레드, 요청 ID
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+from datetime import datetime, timezone
+from utils import LOG_POLICY
+
+ROOT_LOGGER = 'laborapp'
+
+# 요청 처리 중인 스레드의 요청 ID (로그 기록 시 자동으로 붙음)
+_local = threading.local()
+
+# LogRecord 기본 속성 (나머지는 extra={...}로 넘긴 필드로 보고 그대로 출력)
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'request_id'}
+
+_REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+def get_logger(name):
+    """laborapp.<모듈> 로거 (핸들러는 laborapp 로거 하나에만 붙음)"""
+    return logging.getLogger(f'{ROOT_LOGGER}.{name}')
+
+def current_request_id():
+    return getattr(_local, 'request_id', None)
+
+def _extras(record):
+    return {k: v for k, v in record.__dict__.items() if k not in _RECORD_ATTRS and not k.startswith('_')}
+
+class JsonFormatter(logging.Formatter):
+    """{"ts", "level", "logger", "msg", "pid", "request_id", ...extra, "exc"}"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'pid': record.process,
+        }
+        if getattr(record, 'request_id', None):
+            entry['request_id'] = record.request_id
+        entry.update(_extras(record))
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class TextFormatter(logging.Formatter):
+    """개발용 한 줄 텍스트 (LOG_FORMAT=text)"""
+
+    def format(self, record):
+        line = f"{self.formatTime(record, '%H:%M:%S')} {record.levelname:<7} [{record.name}] {record.getMessage()}"
+        fields = _extras(record)
+        if getattr(record, 'request_id', None):
+            fields = dict(request_id=record.request_id, **fields)
+        if fields:
+            line += ' ' + ' '.join(f'{k}={v}' for k, v in fields.items())
+        if record.exc_text:
+            line += '\n' + record.exc_text
+        return line
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """호출한 스레드에서는 메시지 조립과 요청 ID만 붙이고 큐에 넣음 (출력/직렬화는 기록 스레드).
+    큐가 가득 차면 요청을 막지 않고 버린다."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.request_id = current_request_id()
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_handler = None
+_listener = None
+_listener_pid = None
+_lock = threading.Lock()
+
+def _output_handler():
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter() if LOG_POLICY['format'] == 'json' else TextFormatter())
+    return handler
+
+def start():
+    """laborapp 로거에 큐 핸들러를 붙이고 기록 스레드 시작 (이미 실행 중이면 그대로)"""
+    global _handler, _listener, _listener_pid
+    with _lock:
+        if _listener is not None:
+            return
+        logger = logging.getLogger(ROOT_LOGGER)
+        logger.setLevel(LOG_POLICY['level'])
+        logger.propagate = False
+        # 포크 후에는 부모의 큐(내부 잠금 포함)를 버리고 새 큐 사용
+        q = queue.Queue(maxsize=LOG_POLICY['queue_size'])
+        if _handler is None:
+            _handler = _QueueHandler(q)
+            logger.addHandler(_handler)
+        else:
+            _handler.queue = q
+        _listener = logging.handlers.QueueListener(q, _output_handler())
+        _listener.start()
+        _listener_pid = os.getpid()
+
+def stop():
+    """남은 로그를 모두 기록하고 기록 스레드 종료 (포크 직전, 워커 종료 시)"""
+    global _listener
+    with _lock:
+        if _listener is None:
+            return
+        try:
+            _listener.stop()
+        except Exception:
+            pass
+        _listener = None
+
+def after_fork():
+    """포크된 워커: 부모의 기록 스레드는 따라오지 않으므로 새로 시작"""
+    global _listener, _lock
+    if _listener_pid != os.getpid():
+        _lock = threading.Lock()
+        _listener = None
+    start()
+
+def stats():
+    return {
+        'level': logging.getLevelName(logging.getLogger(ROOT_LOGGER).level),
+        'format': LOG_POLICY['format'],
+        'queued': _handler.queue.qsize() if _handler is not None else 0,
+        'dropped': _handler.dropped if _handler is not None else 0,
+    }
+
+atexit.register(stop)
+
+def register_logging_hooks(app):
+    """요청 ID 부여(X-Request-ID)와 요청 로그 (method, path, status, duration_ms)"""
+    from flask import request
+
+    access_log = get_logger('access')
+
+    @app.before_request
+    def _start_request_log():
+        incoming = request.headers.get('X-Request-ID', '')
+        _local.request_id = incoming if _REQUEST_ID_PATTERN.match(incoming) else uuid.uuid4().hex[:16]
+        _local.started = time.perf_counter()
+
+    @app.after_request
+    def _finish_request_log(response):
+        request_id = current_request_id()
+        if request_id is None:
+            return response
+        response.headers['X-Request-ID'] = request_id
+        if LOG_POLICY['access_log'] and access_log.isEnabledFor(logging.INFO):
+            access_log.info('request', extra={
+                'method': request.method,
+                'path': request.path,
+                'endpoint': request.endpoint,
+                'status': response.status_code,
+                'duration_ms': round((time.perf_counter() - _local.started) * 1000, 1),
+            })
+        return response
+
+    @app.teardown_request
+    def _clear_request_id(exc):
+        _local.request_id = None
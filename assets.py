@@ -0,0 +1,60 @@
+# assets.py - 정적 파일 콘텐츠 해시 매니페스트 (서비스 워커 사전 캐시 / 캐시 무효화용)
+import os
+import json
+import hashlib
+
+ASSET_MANIFEST_FILE = 'asset-manifest.json'
+# 매니페스트에서 제외: 서비스 워커 자체(/sw.js로 제공), 사전 압축 사본, 매니페스트 파일
+EXCLUDED_FILES = ('sw.js', ASSET_MANIFEST_FILE)
+EXCLUDED_EXTENSIONS = ('.gz', '.br')
+
+_manifest_cache = {}
+
+def build_asset_manifest(static_dir):
+    """{'version': 전체 해시, 'assets': {상대경로: 파일 해시}}"""
+    assets = {}
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.startswith('.') or name.endswith(EXCLUDED_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, static_dir).replace(os.sep, '/')
+            if rel in EXCLUDED_FILES:
+                continue
+            with open(path, 'rb') as f:
+                assets[rel] = hashlib.sha256(f.read()).hexdigest()[:10]
+    version = hashlib.sha256(json.dumps(assets, sort_keys=True).encode()).hexdigest()[:10]
+    return {'version': version, 'assets': assets}
+
+def write_asset_manifest(static_dir):
+    manifest = build_asset_manifest(static_dir)
+    with open(os.path.join(static_dir, ASSET_MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2, sort_keys=True)
+    return manifest
+
+def load_asset_manifest(static_dir):
+    """빌드 시 만든 매니페스트를 읽고, 없으면(개발 환경) 직접 계산. 프로세스당 한 번만 읽음."""
+    if static_dir not in _manifest_cache:
+        try:
+            with open(os.path.join(static_dir, ASSET_MANIFEST_FILE), 'r', encoding='utf-8') as f:
+                _manifest_cache[static_dir] = json.load(f)
+        except (FileNotFoundError, ValueError):
+            _manifest_cache[static_dir] = build_asset_manifest(static_dir)
+    return _manifest_cache[static_dir]
+
+def asset_url(static_dir, filename, static_url='/static/'):
+    """콘텐츠 해시가 붙은 정적 파일 URL (내용이 바뀌면 URL도 바뀜)"""
+    digest = load_asset_manifest(static_dir)['assets'].get(filename)
+    url = static_url + filename
+    return f'{url}?v={digest}' if digest else url
+
+def render_service_worker(static_dir, static_url='/static/'):
+    """sw.js 앞에 사전 캐시 목록을 붙여 반환 - 자산이 바뀌면 워커 바이트도 바뀌어 브라우저가 갱신"""
+    manifest = load_asset_manifest(static_dir)
+    precache = [f'{static_url}{rel}?v={digest}' for rel, digest in sorted(manifest['assets'].items())]
+    with open(os.path.join(static_dir, 'sw.js'), 'r', encoding='utf-8') as f:
+        source = f.read()
+    header = (f"const ASSET_VERSION = {json.dumps(manifest['version'])};\n"
+              f"const PRECACHE_URLS = {json.dumps(precache, ensure_ascii=False)};\n")
+    return header + source
@@ -0,0 +1,65 @@
+# bench_compression.py - 응답 압축 전후 전송 바이트 / 응답당 CPU 시간 비교
+# 실행: python benchmarks/bench_compression.py [반복횟수]
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from compression import CompressionMiddleware, brotli
+from utils import COMPRESSION_POLICY
+
+def sample_bodies(seed=42):
+    """대시보드 HTML / 노무비 CSV / API JSON과 비슷한 한글 위주 본문"""
+    rnd = random.Random(seed)
+    rows = [{'project_name': f'프로젝트{i:04d}', 'work_type': f'공종{rnd.randint(0, 11):02d}',
+             'company': f'업체{rnd.randint(1, 30)}', 'today_workers': rnd.randint(0, 80),
+             'cumulative_workers': rnd.randint(100, 20000), 'status': rnd.choice(['정상', '주의', '위험'])}
+            for i in range(300)]
+    html = ''.join(
+        f'<div class="project-row" data-project="{r["project_name"]}"><span data-field="today_workers">'
+        f'{r["today_workers"]}명</span><span data-field="status">{r["status"]}</span></div>\n' for r in rows)
+    csv = '프로젝트,공종,업체,금일 인원,누적 인원,상태\n' + ''.join(
+        f'{r["project_name"]},{r["work_type"]},{r["company"]},{r["today_workers"]},{r["cumulative_workers"]},{r["status"]}\n'
+        for r in rows)
+    api = json.dumps({'items': rows}, ensure_ascii=False, separators=(',', ':'))
+    return {
+        'html': ('text/html; charset=utf-8', html.encode('utf-8')),
+        'csv': ('text/csv; charset=utf-8', csv.encode('utf-8')),
+        'json': ('application/json', api.encode('utf-8')),
+    }
+
+def measure(content_type, body, accept, repeat):
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', content_type), ('Content-Length', str(len(body)))])
+        return [body]
+
+    middleware = CompressionMiddleware(app)
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/', 'HTTP_ACCEPT_ENCODING': accept}
+    wire = 0
+    start = time.process_time()
+    for _ in range(repeat):
+        wire = len(b''.join(middleware(environ, lambda status, headers, exc_info=None: None)))
+    return wire, (time.process_time() - start) / repeat * 1000
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    variants = [('원본', 'identity', None)] + [(f'gzip {lv}', 'gzip', lv) for lv in (1, 6, 9)]
+    if brotli is not None:
+        variants.append((f"brotli q{COMPRESSION_POLICY['brotli_quality']}", 'br', None))
+    original_level = COMPRESSION_POLICY['level']
+    try:
+        for name, (content_type, body) in sample_bodies().items():
+            print(f"\n[{name}] {len(body):,} bytes")
+            for label, accept, level in variants:
+                if level is not None:
+                    COMPRESSION_POLICY['level'] = level
+                wire, ms = measure(content_type, body, accept, repeat)
+                print(f"  {label:<12} {wire:>9,} bytes ({wire / len(body):6.1%})  {ms:7.3f} ms/응답")
+    finally:
+        COMPRESSION_POLICY['level'] = original_level
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# bench_dashboard_parallel.py - 대시보드 계산 직렬 vs 프로세스 풀 벤치마크
+# 실행: python benchmarks/bench_dashboard_parallel.py [반복횟수]
+import os
+import sys
+import time
+import random
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from calculations import build_dashboard, shutdown_process_pool
+from utils import PARALLEL_POLICY
+
+WORK_TYPES = [f'공종{i:02d}' for i in range(12)]
+DAYS = 30
+
+def make_portfolio(n_projects, seed=42):
+    """합성 프로젝트 데이터 생성 (DB 조회 결과와 같은 구조)"""
+    rnd = random.Random(seed)
+    labor_costs = {wt: {'day': rnd.randint(120, 250) * 1000, 'night': 0, 'midnight': 0} for wt in WORK_TYPES}
+    start = date(2025, 1, 1)
+    projects = {}
+    for p in range(n_projects):
+        wts = rnd.sample(WORK_TYPES, 8)
+        daily = {}
+        for d in range(DAYS):
+            key = str(start + timedelta(days=d))
+            daily[key] = {}
+            for wt in wts:
+                day, night, midnight = rnd.randint(0, 20), rnd.randint(0, 5), rnd.randint(0, 2)
+                daily[key][wt] = {'day': day, 'night': night, 'midnight': midnight,
+                                  'total': day + night + midnight, 'progress': rnd.random() * 100}
+        projects[f'프로젝트{p:04d}'] = {
+            'status': 'active', 'created_date': '2025-01-01', 'work_types': wts,
+            'contracts': {wt: rnd.randint(50, 500) * 1000000 for wt in wts},
+            'companies': {wt: f'업체{rnd.randint(1, 30)}' for wt in wts},
+            'daily_data': daily,
+        }
+    return projects, labor_costs
+
+def best_of(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    PARALLEL_POLICY['min_projects'] = 0  # 크로스오버 측정을 위해 직렬 전환 비활성화
+    print(f"CPU {os.cpu_count()}개, 프로젝트당 공종 8개 x {DAYS}일")
+    print(f"{'프로젝트':>8} {'직렬(ms)':>10} {'병렬(ms)':>10} {'배율':>6}")
+
+    # 풀 기동 비용은 워커 수명 동안 1회이므로 측정에서 제외
+    warm_projects, warm_costs = make_portfolio(4)
+    build_dashboard(warm_projects, warm_costs, parallel=True)
+
+    crossover = None
+    for n in (5, 10, 20, 40, 80, 160, 320, 640):
+        projects, labor_costs = make_portfolio(n)
+        serial = best_of(lambda: build_dashboard(projects, labor_costs, parallel=False), repeat)
+        parallel = best_of(lambda: build_dashboard(projects, labor_costs, parallel=True), repeat)
+        assert build_dashboard(projects, labor_costs, parallel=False) == build_dashboard(projects, labor_costs, parallel=True)
+        speedup = serial / parallel if parallel else 0.0
+        if crossover is None and speedup > 1.0:
+            crossover = n
+        print(f"{n:>8} {serial * 1000:>10.1f} {parallel * 1000:>10.1f} {speedup:>5.2f}x")
+
+    shutdown_process_pool()
+    if crossover:
+        print(f"크로스오버: 약 {crossover}개 프로젝트 이상에서 병렬이 유리 (DASHBOARD_PARALLEL_MIN_PROJECTS 참고)")
+    else:
+        print("측정 범위 내에서 병렬이 유리한 구간 없음")
+
+if __name__ == '__main__':
+    main()
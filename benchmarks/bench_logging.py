@@ -0,0 +1,108 @@
+# bench_logging.py - 요청 스레드의 로그 비용: print vs 동기 로그 핸들러 vs 큐 + 기록 스레드 (app_logging)
+# 실행: python benchmarks/bench_logging.py [메시지 수] [스레드 수]
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import app_logging
+from app_logging import JsonFormatter
+
+def run_threads(n_threads, per_thread, emit):
+    """스레드마다 per_thread번 emit 호출, 호출 1회당 시간(µs) 목록 반환"""
+    samples = []
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        for i in range(per_thread):
+            start = time.perf_counter()
+            emit(i)
+            local.append((time.perf_counter() - start) * 1e6)
+        with lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(n_threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples
+
+def report(label, samples, elapsed, total):
+    samples.sort()
+    print(f"{label}: {total / elapsed:,.0f} 건/초, 호출당 평균 {sum(samples) / len(samples):.1f} µs, "
+          f"p99 {samples[int(len(samples) * 0.99)]:.1f} µs")
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    n_threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    per_thread = total // n_threads
+    total = per_thread * n_threads
+    # 컨테이너 stdout(PYTHONUNBUFFERED, 파이프)처럼 줄마다 write 시스템 호출이 일어나도록 줄 단위 버퍼
+    fd, path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+    out = open(path, 'w', buffering=1, encoding='utf-8')
+    real_stdout = sys.stdout
+
+    # 1) 기존 방식: 쓰기 경로마다 print (stdout에 바로 기록)
+    sys.stdout = out
+    start = time.perf_counter()
+    samples = run_threads(n_threads, per_thread,
+                          lambda i: print(f"✅ 일일 데이터 저장 성공: 현장{i % 50} - 형틀목공 - 2024-05-{i % 28 + 1:02d}"))
+    out.flush()
+    elapsed = time.perf_counter() - start
+    sys.stdout = real_stdout
+    report('print (동기 stdout)', samples, elapsed, total)
+
+    # 2) 로그 모듈 + 동기 핸들러 (요청 스레드에서 JSON 직렬화와 기록)
+    logger = logging.getLogger('bench.sync')
+    logger.propagate = False
+    handler = logging.StreamHandler(out)
+    handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    start = time.perf_counter()
+    samples = run_threads(n_threads, per_thread, lambda i: logger.info(
+        "일일 데이터 저장: %s - %s - %s", f"현장{i % 50}", '형틀목공', f"2024-05-{i % 28 + 1:02d}"))
+    out.flush()
+    elapsed = time.perf_counter() - start
+    report('logging 동기 JSON 핸들러', samples, elapsed, total)
+
+    # 3) app_logging: 요청 스레드는 큐에 넣기만, 기록 스레드가 JSON 직렬화/출력
+    sys.stdout = out
+    app_logging.LOG_POLICY['queue_size'] = total + 1  # 측정 중 버리는 로그가 없도록
+    app_logging.LOG_POLICY['format'] = 'json'
+    app_logging.start()
+    sys.stdout = real_stdout
+    log = app_logging.get_logger('bench')
+    start = time.perf_counter()
+    samples = run_threads(n_threads, per_thread, lambda i: log.info(
+        "일일 데이터 저장: %s - %s - %s", f"현장{i % 50}", '형틀목공', f"2024-05-{i % 28 + 1:02d}"))
+    caller_elapsed = time.perf_counter() - start
+    app_logging.stop()  # 큐가 빌 때까지 기록
+    out.flush()
+    drained = time.perf_counter() - start
+    report('app_logging 큐 (요청 스레드 기준)', samples, caller_elapsed, total)
+    print(f"  기록 스레드가 모두 쓰기까지: {drained:.2f} 초 ({total / drained:,.0f} 건/초), "
+          f"버린 로그 {app_logging.stats()['dropped']}건")
+
+    # 4) 성공 메시지를 debug로 내린 경우 (기본 INFO 레벨에서는 조립조차 안 함)
+    app_logging.start()
+    start = time.perf_counter()
+    samples = run_threads(n_threads, per_thread, lambda i: log.debug(
+        "일일 데이터 저장: %s - %s - %s", f"현장{i % 50}", '형틀목공', f"2024-05-{i % 28 + 1:02d}"))
+    elapsed = time.perf_counter() - start
+    app_logging.stop()
+    report('app_logging debug (비활성)', samples, elapsed, total)
+
+    out.close()
+    print(f"출력 크기: {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+    os.remove(path)
+
+if __name__ == '__main__':
+    main()
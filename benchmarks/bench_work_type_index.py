@@ -0,0 +1,54 @@
+# bench_work_type_index.py - 공종명 유사도 검색: 단순 스캔 vs 자모 n-gram 색인
+# 실행: python benchmarks/bench_work_type_index.py [공종 수]
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from work_type_index import WorkTypeIndex
+
+SUFFIXES = ['공', '목공', '인부', '기능공', '조공', '설비공', '반장', '기사']
+
+def make_names(n, seed=42):
+    """실제 공종명처럼 몇 가지 접미사를 공유하는 합성 이름"""
+    rnd = random.Random(seed)
+    syllables = [chr(0xAC00 + rnd.randrange(11172)) for _ in range(400)]
+    names = set()
+    while len(names) < n:
+        names.add(''.join(rnd.choice(syllables) for _ in range(rnd.randint(1, 3))) + rnd.choice(SUFFIXES))
+    return sorted(names)
+
+def naive_scan(names, query):
+    """기존 방식: 매 호출마다 전체 목록 부분 문자열 검사"""
+    return [n for n in names if (query in n or n in query) and query.lower() != n.lower()]
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    names = make_names(n)
+    rnd = random.Random(7)
+    # 입력 중 상태(앞부분), 띄어쓰기 변형, 한 글자 오타
+    queries = []
+    for name in rnd.sample(names, 300):
+        queries.append(name[:max(1, len(name) - 1)])
+        queries.append(name[:1] + ' ' + name[1:])
+        queries.append(name[:-1] + chr(ord(name[-1]) + 1) if '가' <= name[-1] < '힣' else name)
+
+    index = WorkTypeIndex()
+    start = time.perf_counter()
+    index.build(names)
+    print(f"공종 {n}개 색인 생성: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    for label, fn in (('단순 스캔(DB 조회 제외)', lambda q: naive_scan(names, q)), ('색인 검색', index.search)):
+        timings = []
+        for q in queries:
+            start = time.perf_counter()
+            fn(q)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"{label}: 평균 {sum(timings) / len(timings):.3f} ms, "
+              f"p50 {timings[len(timings) // 2]:.3f} ms, p99 {timings[int(len(timings) * 0.99)]:.3f} ms")
+
+if __name__ == '__main__':
+    main()
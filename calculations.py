@@ -1,5 +1,64 @@
 # calculations.py - 계산 관련 로직들 (PostgreSQL 버전)
-from utils import HEALTH_POLICY, parse_int, parse_float, get_data_manager
+import atexit
+import os
+import multiprocessing
+from bisect import bisect_right
+import threading
+from collections import deque
+from datetime import date, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from utils import HEALTH_POLICY, PARALLEL_POLICY, parse_int, parse_float, get_data_manager
+from anomaly import detector as anomaly_detector
+from singleflight import single_flight
+from change_tracker import ChangeTracker, ProjectVersions
+from http_cache import policy_fingerprint
+from server_timing import timed
+from app_logging import get_logger
+
+log = get_logger('calculations')
+
+class LaborRateTable:
+    """적용일자별 노무단가 조회 테이블.
+
+    공종마다 적용일(오름차순) 목록과 단가 목록을 두고 bisect로 해당 날짜에
+    유효한 단가를 찾는다. 이력이 없는 공종은 현재 단가(labor_costs)를 쓰고,
+    최초 적용일 이전 날짜는 최초 단가로 계산한다.
+    """
+
+    def __init__(self, history, labor_costs=None):
+        self._dates = {}
+        self._rates = {}
+        for work_type, entries in (history or {}).items():
+            entries = sorted(entries, key=lambda e: e['effective_date'])
+            self._dates[work_type] = [e['effective_date'] for e in entries]
+            self._rates[work_type] = [
+                {'day': e.get('day', 0) or 0, 'night': e.get('night', 0) or 0, 'midnight': e.get('midnight', 0) or 0}
+                for e in entries
+            ]
+        self._current = labor_costs or {}
+
+    def rate_on(self, work_type, date_key):
+        """date_key('YYYY-MM-DD')에 유효한 {'day', 'night', 'midnight'} 단가"""
+        dates = self._dates.get(work_type)
+        if not dates:
+            return self._current.get(work_type, {}) or {}
+        i = bisect_right(dates, date_key) - 1
+        return self._rates[work_type][max(i, 0)]
+
+    def daily_cost(self, work_type, date_key, work_data):
+        """일일 데이터 1건의 노무비 (주간/야간/심야 인원 x 해당일 단가)"""
+        rate = self.rate_on(work_type, date_key)
+        return (parse_int(work_data.get('day', 0), 0) * (rate.get('day', 0) or 0)
+                + parse_int(work_data.get('night', 0), 0) * (rate.get('night', 0) or 0)
+                + parse_int(work_data.get('midnight', 0), 0) * (rate.get('midnight', 0) or 0))
+
+def load_labor_rate_table(labor_costs=None):
+    """DB의 노무단가 이력으로 LaborRateTable 생성"""
+    dm = get_data_manager()
+    if labor_costs is None:
+        labor_costs = dm.get_labor_costs()
+    return LaborRateTable(dm.get_labor_cost_history(), labor_costs)
 
 def _avg_progress(project_data):
     """전체 일자·공종의 progress 평균(입력된 값만). 없으면 0."""
@@ -50,6 +109,71 @@ def _today_vs_recent_workers(project_data):
 
     return delta_ratio, today_total, recent_avg
 
+def _classify_health(cost_ratio, progress_diff, delta_ratio, policy=None):
+    """지표값을 신호등(flag)과 종합 상태로 변환 (status, color, flags). policy 생략 시 HEALTH_POLICY."""
+    policy = policy or HEALTH_POLICY
+
+    cost_flag = 'good'
+    if cost_ratio >= policy["COST_DANGER_RATIO"]:
+        cost_flag = 'bad'
+    elif cost_ratio >= policy["COST_WARN_RATIO"]:
+        cost_flag = 'warn'
+
+    sched_flag = 'good'
+    if progress_diff >= policy["PROGRESS_DANGER_DIFF"]:
+        sched_flag = 'bad'
+    elif progress_diff >= policy["PROGRESS_WARN_DIFF"]:
+        sched_flag = 'warn'
+
+    workers_flag = 'good'
+    if delta_ratio <= policy["WORKERS_DANGER_DROP"] or delta_ratio >= policy["WORKERS_DANGER_SURGE"]:
+        workers_flag = 'bad'
+    elif delta_ratio <= policy["WORKERS_WARN_DROP"] or delta_ratio >= policy["WORKERS_WARN_SURGE"]:
+        workers_flag = 'warn'
+
+    # 종합 상태 결정 (3개 신호등의 평균)
+    flag_scores = {'good': 0, 'warn': 1, 'bad': 2}
+    avg_score = (flag_scores[cost_flag] + flag_scores[sched_flag] + flag_scores[workers_flag]) / 3
+
+    if avg_score >= 1.5:
+        status, color = '위험', 'danger'
+    elif avg_score >= 0.5:
+        status, color = '경고', 'warning'
+    else:
+        status, color = '양호', 'success'
+
+    return status, color, {
+        'cost': cost_flag,
+        'schedule': sched_flag,
+        'workers': workers_flag,
+    }
+
+def _health_result(cost_ratio, progress_rate, schedule_rate, delta_ratio, today_workers,
+                   recent_avg_workers, policy=None):
+    """determine_health 반환 형식 (status, color, meta) 구성"""
+    progress_diff = abs(progress_rate - schedule_rate) / 100.0  # 퍼센트를 소수로 변환
+    status, color, flags = _classify_health(cost_ratio, progress_diff, delta_ratio, policy)
+    return status, color, {
+        'cost_ratio': round(cost_ratio, 2),
+        'progress_rate': round(progress_rate, 1),
+        'schedule_rate': round(schedule_rate, 1),
+        'progress_diff': round(progress_diff * 100, 1),
+        'today_workers': int(today_workers),
+        'recent_avg_workers': float(recent_avg_workers),
+        'flags': flags
+    }
+
+def _contract_workers(work_types, contracts, labor_costs):
+    """총 계약인원 (계약금 / 주간 노무단가 합)"""
+    total = 0
+    for wt in work_types:
+        contract_amount = int(contracts.get(wt, 0) or 0)
+        rate = (labor_costs.get(wt, {}) or {}).get('day', 0) or 0
+        if rate > 0:
+            total += contract_amount / rate
+    return total
+
+@timed('calc.determine_health')
 def determine_health(project_data, labor_costs):
     """새로운 위험도 알고리즘에 따른 상태 산정"""
     
@@ -58,17 +182,10 @@ def determine_health(project_data, labor_costs):
     work_types = project_data.get('work_types', []) or []
 
     # 1. 비용 위험도 계산: 투입인원/계약인원 비율
-    total_contract_workers = 0
+    total_contract_workers = _contract_workers(work_types, contracts, labor_costs)
     total_invested_workers = 0
     
     for wt in work_types:
-        contract_amount = int(contracts.get(wt, 0) or 0)
-        rate = (labor_costs.get(wt, {}) or {}).get('day', 0) or 0
-        
-        # 계약인원
-        if rate > 0:
-            total_contract_workers += contract_amount / rate
-        
         # 투입인원 (누계)
         for date_data in daily_data.values():
             if wt in date_data:
@@ -76,12 +193,6 @@ def determine_health(project_data, labor_costs):
                 total_invested_workers += int(wd.get('total', 0) or 0)
 
     cost_ratio = total_invested_workers / total_contract_workers if total_contract_workers > 0 else 0
-    
-    cost_flag = 'good'
-    if cost_ratio >= HEALTH_POLICY["COST_DANGER_RATIO"]:
-        cost_flag = 'bad'
-    elif cost_ratio >= HEALTH_POLICY["COST_WARN_RATIO"]:
-        cost_flag = 'warn'
 
     # 2. 공정 위험도 계산: |진행율 - 공정율| 차이
     progress_rate = (total_invested_workers / total_contract_workers * 100) if total_contract_workers > 0 else 0
@@ -100,130 +211,334 @@ def determine_health(project_data, labor_costs):
     
     if schedule_count > 0:
         schedule_rate = schedule_rate / schedule_count
-    
-    progress_diff = abs(progress_rate - schedule_rate) / 100.0  # 퍼센트를 소수로 변환
-    
-    sched_flag = 'good'
-    if progress_diff >= HEALTH_POLICY["PROGRESS_DANGER_DIFF"]:
-        sched_flag = 'bad'
-    elif progress_diff >= HEALTH_POLICY["PROGRESS_WARN_DIFF"]:
-        sched_flag = 'warn'
 
     # 3. 인력 급변 (기존 로직 유지)
     delta_ratio, today_workers, recent_avg_workers = _today_vs_recent_workers(project_data)
 
-    workers_flag = 'good'
-    if delta_ratio <= HEALTH_POLICY["WORKERS_DANGER_DROP"] or delta_ratio >= HEALTH_POLICY["WORKERS_DANGER_SURGE"]:
-        workers_flag = 'bad'
-    elif delta_ratio <= HEALTH_POLICY["WORKERS_WARN_DROP"] or delta_ratio >= HEALTH_POLICY["WORKERS_WARN_SURGE"]:
-        workers_flag = 'warn'
+    # 4. 종합 상태 결정
+    return _health_result(cost_ratio, progress_rate, schedule_rate, delta_ratio,
+                          today_workers, recent_avg_workers)
 
-    # 4. 종합 상태 결정 (3개 신호등의 평균)
-    flag_scores = {'good': 0, 'warn': 1, 'bad': 2}
-    avg_score = (flag_scores[cost_flag] + flag_scores[sched_flag] + flag_scores[workers_flag]) / 3
-    
-    if avg_score >= 1.5:
-        status, color = '위험', 'danger'
-    elif avg_score >= 0.5:
-        status, color = '경고', 'warning' 
-    else:
-        status, color = '양호', 'success'
+def calculate_health_history(project_data, labor_costs, start_date=None, end_date=None):
+    """일자별 위험도 이력 계산 (start_date ~ end_date, 'YYYY-MM-DD').
 
-    return status, color, {
-        'cost_ratio': round(cost_ratio, 2),
-        'progress_rate': round(progress_rate, 1),
-        'schedule_rate': round(schedule_rate, 1),
-        'progress_diff': round(progress_diff * 100, 1),
-        'today_workers': int(today_workers),
-        'recent_avg_workers': float(recent_avg_workers),
-        'flags': {
-            'cost': cost_flag,
-            'schedule': sched_flag,
-            'workers': workers_flag,
-        }
-    }
+    각 날짜의 결과는 그 날짜까지의 데이터만으로 determine_health를 호출한 것과 같다.
+    날짜순으로 한 번만 순회하며 누계 투입인원은 누적합, 최근 N일 평균은
+    슬라이딩 윈도우 합으로 갱신한다. 데이터가 없는 날은 직전 입력일 상태를 이어 쓴다.
+    """
+    contracts = project_data.get('contracts', {}) or {}
+    daily_data = project_data.get('daily_data', {}) or {}
+    work_types = project_data.get('work_types', []) or []
 
-def calculate_dashboard_data():
-    """관리자 대시보드용 데이터 계산 (회사 기준 상태 포함)"""
-    # PostgreSQL 방식으로 데이터 조회
+    dates = sorted(daily_data.keys())
+    if not dates:
+        return []  # 입력이 없으면 이력 없음 (기간을 줘도 빈 목록)
+    start_date = start_date or dates[0]
+    end_date = end_date or dates[-1]
+    if start_date > end_date:
+        return []
+
+    total_contract_workers = _contract_workers(work_types, contracts, labor_costs)
+    window_days = HEALTH_POLICY.get("WORKERS_WINDOW_DAYS", 7)
+    window = deque()
+    window_sum = 0
+    cumulative = 0
+
+    history = []
+    current = _health_result(0, 0, 0.0, 0.0, 0, 0.0)  # 입력 전 상태
+    day = date.fromisoformat(start_date)
+    last_day = date.fromisoformat(end_date)
+    idx = 0
+    while day <= last_day:
+        day_key = day.isoformat()
+        # day_key까지의 입력일을 순서대로 반영
+        while idx < len(dates) and dates[idx] <= day_key:
+            date_data = daily_data[dates[idx]]
+            day_total = 0
+            schedule_rate = 0.0
+            schedule_count = 0
+            for wt, wd in date_data.items():
+                day_total += int(wd.get('total', 0) or 0)
+            for wt in work_types:
+                if wt in date_data:
+                    cumulative += int(date_data[wt].get('total', 0) or 0)
+                    schedule_rate += date_data[wt].get('progress', 0)
+                    schedule_count += 1
+            if schedule_count > 0:
+                schedule_rate = schedule_rate / schedule_count
+
+            recent_avg = (window_sum / len(window)) if window else 0.0
+            delta_ratio = (day_total - recent_avg) / recent_avg if recent_avg > 0 else 0.0
+
+            if total_contract_workers > 0:
+                cost_ratio = cumulative / total_contract_workers
+                progress_rate = cumulative / total_contract_workers * 100
+            else:
+                cost_ratio, progress_rate = 0, 0
+            current = _health_result(cost_ratio, progress_rate, schedule_rate, delta_ratio,
+                                     day_total, recent_avg)
+
+            # 오늘 합계를 다음 날짜의 비교 윈도우에 추가
+            window.append(day_total)
+            window_sum += day_total
+            if len(window) > window_days:
+                window_sum -= window.popleft()
+            idx += 1
+
+        status, color, meta = current
+        history.append({
+            'date': day_key,
+            'has_data': day_key in daily_data,
+            'status': status,
+            'status_color': color,
+            'health_meta': meta,
+        })
+        day += timedelta(days=1)
+    return history
+
+@timed('calc.health_history')
+def calculate_portfolio_health_history(start_date, end_date, project_name=None):
+    """전체(또는 단일) 프로젝트의 일자별 위험도 이력 {프로젝트명: [...]}"""
     dm = get_data_manager()
     projects_data = dm.get_projects()
     labor_costs = dm.get_labor_costs()
-    
-    dashboard = []
-    for project_name, project_data in projects_data.items():
-        work_types = project_data.get('work_types', [])
-        daily_data = project_data.get('daily_data', {})
-        contracts = project_data.get('contracts', {})
+    if project_name is not None:
+        projects_data = {project_name: projects_data[project_name]} if project_name in projects_data else {}
+
+    # 누계가 정확하도록 end_date까지의 전체 일일 데이터를 한 번에 조회
+    history_data = dm.get_daily_data_until(end_date, project_name)
+    result = {}
+    for name, project_data in projects_data.items():
+        project_data = dict(project_data, daily_data=history_data.get(name, {}))
+        result[name] = calculate_health_history(project_data, labor_costs, start_date, end_date)
+    return result
 
-        # 최근 날짜
+def _dashboard_row(project_name, project_data, labor_costs):
+    """프로젝트 1개의 대시보드 행 계산"""
+    work_types = project_data.get('work_types', [])
+    daily_data = project_data.get('daily_data', {})
+    contracts = project_data.get('contracts', {})
+
+    # 최근 날짜
+    recent_date = None
+    try:
+        if daily_data:
+            recent_date = max(daily_data.keys())
+    except:
         recent_date = None
-        try:
-            if daily_data:
-                recent_date = max(daily_data.keys())
-        except:
-            recent_date = None
-        
-        # 오늘 총투입
-        total_workers_today = 0
-        if recent_date and recent_date in daily_data:
-            today_pack = daily_data.get(recent_date, {})
-            for work_type in work_types:
-                today_data = today_pack.get(work_type, {})
-                total_workers_today += parse_int(today_data.get('total', 0), 0)
-
-        # 누계 인원 계산
-        cumulative_workers = 0
-        for date_data in daily_data.values():
-            for work_type in work_types:
-                if work_type in date_data:
-                    cumulative_workers += date_data[work_type].get('total', 0)
 
-        # 총 계약인원 계산 (계약금 / 노무단가)
-        total_contract_workers = 0
+    # 오늘 총투입
+    total_workers_today = 0
+    if recent_date and recent_date in daily_data:
+        today_pack = daily_data.get(recent_date, {})
         for work_type in work_types:
-            contract_amount = contracts.get(work_type, 0)
-            labor_rate = labor_costs.get(work_type, {}).get('day', 0)
-            if labor_rate > 0:
-                total_contract_workers += contract_amount / labor_rate
-
-        # 진행률 = 누계인원 / 계약인원 * 100
-        progress_rate = 0.0
-        if total_contract_workers > 0:
-            progress_rate = (cumulative_workers / total_contract_workers) * 100
-            progress_rate = min(100, progress_rate)  # 100% 초과 방지
-
-        # 공정률 = 누계 공정률 (각 공종 최신 공정률 평균)
-        schedule_rate = 0.0
-        progress_count = 0
-        if recent_date and recent_date in daily_data:
-            for work_type in work_types:
-                if work_type in daily_data[recent_date]:
-                    progress_val = daily_data[recent_date][work_type].get('progress', 0)
-                    schedule_rate += progress_val
-                    progress_count += 1
-        
-        if progress_count > 0:
-            schedule_rate = schedule_rate / progress_count
-
-        # 회사 기준 상태 판단
-        status, status_color, meta = determine_health(project_data, labor_costs)
-
-        dashboard.append({
-            'project_name': project_name,
-            'recent_date': recent_date or '데이터 없음',
-            'today_workers': total_workers_today,
-            'contract_workers': int(total_contract_workers),
-            'cumulative_workers': cumulative_workers,
-            'schedule_rate': schedule_rate,
-            'avg_progress': progress_rate,
-            'work_count': len(work_types),
-            'status': status,
-            'status_color': status_color,
-            'health_meta': meta
-        })
-    return dashboard
+            today_data = today_pack.get(work_type, {})
+            total_workers_today += parse_int(today_data.get('total', 0), 0)
+
+    # 누계 인원 계산
+    cumulative_workers = 0
+    for date_data in daily_data.values():
+        for work_type in work_types:
+            if work_type in date_data:
+                cumulative_workers += date_data[work_type].get('total', 0)
+
+    # 총 계약인원 계산 (계약금 / 노무단가)
+    total_contract_workers = 0
+    for work_type in work_types:
+        contract_amount = contracts.get(work_type, 0)
+        labor_rate = labor_costs.get(work_type, {}).get('day', 0)
+        if labor_rate > 0:
+            total_contract_workers += contract_amount / labor_rate
+
+    # 진행률 = 누계인원 / 계약인원 * 100
+    progress_rate = 0.0
+    if total_contract_workers > 0:
+        progress_rate = (cumulative_workers / total_contract_workers) * 100
+        progress_rate = min(100, progress_rate)  # 100% 초과 방지
+
+    # 공정률 = 누계 공정률 (각 공종 최신 공정률 평균)
+    schedule_rate = 0.0
+    progress_count = 0
+    if recent_date and recent_date in daily_data:
+        for work_type in work_types:
+            if work_type in daily_data[recent_date]:
+                progress_val = daily_data[recent_date][work_type].get('progress', 0)
+                schedule_rate += progress_val
+                progress_count += 1
+
+    if progress_count > 0:
+        schedule_rate = schedule_rate / progress_count
+
+    # 회사 기준 상태 판단
+    status, status_color, meta = determine_health(project_data, labor_costs)
 
+    return {
+        'project_name': project_name,
+        'recent_date': recent_date or '데이터 없음',
+        'today_workers': total_workers_today,
+        'contract_workers': int(total_contract_workers),
+        'cumulative_workers': cumulative_workers,
+        'schedule_rate': schedule_rate,
+        'avg_progress': progress_rate,
+        'work_count': len(work_types),
+        'status': status,
+        'status_color': status_color,
+        'health_meta': meta
+    }
+
+# ===== 병렬 계산 (프로세스 풀) =====
+_process_pool = None
+_process_pool_lock = threading.Lock()
+
+def _pool_context():
+    """풀 자식 프로세스 시작 방식.
+
+    요청 스레드(gthread)나 gevent 워커에서 fork로 자식을 만들면 다른 스레드가 잡고 있던 잠금
+    (로그 큐, DB 연결 잠금 등)이 잠긴 채 복사되어 교착될 수 있으므로, 깨끗한 프로세스에서 시작하는
+    forkserver(없으면 spawn)를 쓴다. forkserver는 계산 모듈을 미리 import해 자식 시작 비용을 줄인다.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def _get_process_pool():
+    """워커 프로세스 수명 동안 유지되는 프로세스 풀을 반환 (최초 호출 시 생성)"""
+    global _process_pool
+    if _process_pool is None:
+        with _process_pool_lock:
+            if _process_pool is None:
+                _process_pool = ProcessPoolExecutor(max_workers=PARALLEL_POLICY.get('max_workers'),
+                                                    mp_context=_pool_context())
+                atexit.register(shutdown_process_pool)
+    return _process_pool
+
+def shutdown_process_pool():
+    """프로세스 풀 종료 (워커 종료 시 호출)"""
+    global _process_pool
+    with _process_pool_lock:
+        pool, _process_pool = _process_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _compact_project(project_name, project_data, labor_costs):
+    """프로세스 간 전달용 최소 페이로드 (업체/상태 등 계산에 불필요한 필드 제외)"""
+    work_types = tuple(project_data.get('work_types', []) or [])
+    contracts = project_data.get('contracts', {}) or {}
+    days = tuple(
+        (date_key, tuple((wt, wd.get('total', 0), wd.get('progress', 0)) for wt, wd in date_data.items()))
+        for date_key, date_data in (project_data.get('daily_data', {}) or {}).items()
+    )
+    return (
+        project_name,
+        work_types,
+        tuple(contracts.get(wt, 0) for wt in work_types),
+        tuple((labor_costs.get(wt, {}) or {}).get('day', 0) for wt in work_types),
+        days,
+    )
+
+def _expand_project(payload):
+    """_compact_project 페이로드를 계산용 project_data / labor_costs로 복원"""
+    project_name, work_types, contract_values, rates, days = payload
+    project_data = {
+        'work_types': list(work_types),
+        'contracts': dict(zip(work_types, contract_values)),
+        'daily_data': {
+            date_key: {wt: {'total': total, 'progress': progress} for wt, total, progress in rows}
+            for date_key, rows in days
+        },
+    }
+    labor_costs = {wt: {'day': rate} for wt, rate in zip(work_types, rates)}
+    return project_name, project_data, labor_costs
+
+def _evaluate_chunk(policy, payloads):
+    """프로세스 풀 작업 단위: 상위 프로세스의 정책으로 프로젝트 묶음을 계산"""
+    HEALTH_POLICY.update(policy)
+    return [_dashboard_row(*_expand_project(p)) for p in payloads]
+
+@timed('calc.build_dashboard')
+def build_dashboard(projects_data, labor_costs, parallel=None):
+    """대시보드 행 목록 계산. parallel이 None이면 PARALLEL_POLICY 설정을 따름.
+
+    병렬 모드에서는 프로젝트를 워커 수만큼 연속 구간으로 나눠 프로세스 풀에 보내고,
+    결과는 입력 순서대로 합친다. 프로젝트 수가 min_projects 미만이면 직렬로 계산한다.
+    """
+    items = list(projects_data.items())
+    if parallel is None:
+        parallel = PARALLEL_POLICY.get('enabled', False)
+    if not parallel or len(items) < PARALLEL_POLICY.get('min_projects', 40):
+        return [_dashboard_row(name, data, labor_costs) for name, data in items]
+
+    try:
+        pool = _get_process_pool()
+        n_chunks = min(len(items), PARALLEL_POLICY.get('max_workers') or os.cpu_count() or 1)
+        size = -(-len(items) // n_chunks)
+        chunks = [
+            [_compact_project(name, data, labor_costs) for name, data in items[i:i + size]]
+            for i in range(0, len(items), size)
+        ]
+        policy = dict(HEALTH_POLICY)
+        dashboard = []
+        for rows in pool.map(_evaluate_chunk, [policy] * len(chunks), chunks):
+            dashboard.extend(rows)
+        return dashboard
+    except BrokenProcessPool as e:
+        log.error("병렬 계산 실패, 직렬로 전환: %s", e)
+        shutdown_process_pool()
+        return [_dashboard_row(name, data, labor_costs) for name, data in items]
+
+_dashboard_rows = {}  # {프로젝트명: (캐시 키, 대시보드 행)}
+_dashboard_lock = threading.Lock()
+dashboard_versions = ProjectVersions()  # 쓰기 리스너로 등록 (app.py)
+
+def dashboard_row_key(project_name, fingerprint, today):
+    """대시보드 행 캐시 키: (프로젝트, 변경 버전, 위험도 설정, 날짜). 행 조각 캐시도 같은 키를 쓴다."""
+    return (project_name, *dashboard_versions.version(project_name), fingerprint, today)
+
+@timed('calc.dashboard')
+@single_flight('dashboard')
+def calculate_dashboard_rows():
+    """관리자 대시보드용 (캐시 키, 행) 목록 (회사 기준 상태 포함).
+
+    키가 그대로인 프로젝트는 이전에 계산한 행을 쓰고, 바뀐 프로젝트만 일일 데이터를 조회해 다시 계산한다.
+    """
+    dm = get_data_manager()
+    with _dashboard_lock:
+        dashboard_versions.sync(dm)
+        snapshot = dm.snapshot.current() if dm.snapshot is not None else None
+        projects = dm.get_projects(include_daily_data=False)
+        fingerprint, today = policy_fingerprint(), date.today().isoformat()
+        keys = {name: dashboard_row_key(name, fingerprint, today) for name in projects}
+        for name in list(_dashboard_rows):
+            if name not in projects:
+                del _dashboard_rows[name]
+
+        stale = [name for name in projects if name not in _dashboard_rows or _dashboard_rows[name][0] != keys[name]]
+        if stale:
+            if len(stale) == len(projects):
+                projects_data = dm.get_projects()
+            else:
+                projects_data = {name: dm.get_project(name) for name in stale}
+                projects_data = {name: data for name, data in projects_data.items() if data is not None}
+            labor_costs = dm.get_labor_costs()
+            # 공종별 출역 이상치 (저장 시 갱신되는 이동 통계 기준, 다른 워커 입력은 변경 로그로 반영)
+            anomaly_detector.sync(dm)
+            for row in build_dashboard(projects_data, labor_costs):
+                row['anomalies'] = anomaly_detector.project_anomalies(row['project_name'])
+                _dashboard_rows[row['project_name']] = (keys[row['project_name']], row)
+            if snapshot is not None:
+                # 스냅샷이 아직 반영하지 않은 변경은 다음 호출 때 해당 행을 다시 계산
+                dashboard_versions.rewind(snapshot.seq)
+        return [(_dashboard_rows[name][0], dict(_dashboard_rows[name][1]))
+                for name in projects if name in _dashboard_rows]
+
+def calculate_dashboard_data():
+    """관리자 대시보드용 데이터 계산 (회사 기준 상태 포함)"""
+    return [row for _, row in calculate_dashboard_rows()]
+
+@timed('calc.project_summary')
+@single_flight('project_summary')
 def calculate_project_summary(project_name, current_date):
     # PostgreSQL 방식으로 데이터 조회
     dm = get_data_manager()
@@ -329,6 +644,7 @@ def calculate_project_summary(project_name, current_date):
     return summary, totals
 
 
+@timed('calc.project_work_summary')
 def calculate_project_work_summary(project_name):
     """프로젝트별 공종 현황 계산 (엑셀 테이블용)"""
     # PostgreSQL 방식으로 데이터 조회
@@ -342,20 +658,23 @@ def calculate_project_work_summary(project_name):
     contracts = project_data.get('contracts', {})
     companies = project_data.get('companies', {})
     
+    rate_table = load_labor_rate_table(labor_costs)
+    
     summary = []
     for work_type in work_types:
-        # 투입인원 누계 계산
+        # 투입인원 누계 및 투입노무비 (일자별 적용 단가 기준)
         total_workers = 0
-        for date_data in daily_data.values():
+        total_labor_cost = 0
+        for date_key, date_data in daily_data.items():
             if work_type in date_data:
-                total_workers += date_data[work_type].get('total', 0)
+                workers = date_data[work_type].get('total', 0)
+                total_workers += workers
+                total_labor_cost += workers * parse_int(rate_table.rate_on(work_type, date_key).get('day', 0), 0)
         
-        # 노무단가
+        # 노무단가 (현재)
         labor_rate = (labor_costs.get(work_type, {}) or {}).get('day', 0)
         # 계약노무비
         contract_amount = contracts.get(work_type, 0)
-        # 투입노무비
-        total_labor_cost = total_workers * parse_int(labor_rate, 0)
         # 잔액
         balance = contract_amount - total_labor_cost
         
@@ -368,4 +687,361 @@ def calculate_project_work_summary(project_name):
             'total_labor_cost': total_labor_cost,
             'balance': balance
         })
-    return summary
\ No newline at end of file
+    return summary
+
+# ===== 업체(협력사)별 집계 =====
+UNASSIGNED_COMPANY = '(미지정)'
+_company_rollup_cache = {'key': None, 'rows': None}
+_company_rollup_changes = ChangeTracker()  # 다른 워커의 쓰기 감지
+_company_rollup_lock = threading.Lock()
+
+def calculate_company_rollups(projects_data, labor_costs, pair_totals):
+    """업체별 계약금·투입인원·투입노무비·잔액·최악 신호등 집계.
+
+    pair_totals는 (프로젝트, 공종)별로 미리 집계된 합계(get_work_type_totals)이며,
+    프로젝트의 공종 목록을 한 번 순회하므로 비용은 (프로젝트, 공종) 쌍 수에 비례한다.
+    신호등은 공종별 투입인원/계약인원 비율에 비용 임계값을 적용한 것 중 가장 나쁜 값.
+    """
+    flag_scores = {'good': 0, 'warn': 1, 'bad': 2}
+    companies = {}
+    for project_name, project_data in projects_data.items():
+        contracts = project_data.get('contracts', {}) or {}
+        company_map = project_data.get('companies', {}) or {}
+        for wt in project_data.get('work_types', []) or []:
+            company = (company_map.get(wt) or '').strip() or UNASSIGNED_COMPANY
+            contract_amount = int(contracts.get(wt, 0) or 0)
+            rate = (labor_costs.get(wt, {}) or {}).get('day', 0) or 0
+            totals = pair_totals.get((project_name, wt), {})
+            workers = totals.get('total_workers', 0)
+            cost = totals.get('labor_cost')
+            if cost is None:
+                cost = workers * parse_int(rate, 0)
+
+            contract_workers = contract_amount / rate if rate > 0 else 0
+            cost_ratio = workers / contract_workers if contract_workers > 0 else 0
+            flag = 'good'
+            if cost_ratio >= HEALTH_POLICY["COST_DANGER_RATIO"]:
+                flag = 'bad'
+            elif cost_ratio >= HEALTH_POLICY["COST_WARN_RATIO"]:
+                flag = 'warn'
+
+            row = companies.get(company)
+            if row is None:
+                row = companies[company] = {
+                    'company': company,
+                    'projects': set(),
+                    'work_type_count': 0,
+                    'contract_amount': 0,
+                    'contract_workers': 0.0,
+                    'total_workers': 0,
+                    'total_labor_cost': 0,
+                    'worst_flag': 'good',
+                    'flag_counts': {'good': 0, 'warn': 0, 'bad': 0},
+                }
+            row['projects'].add(project_name)
+            row['work_type_count'] += 1
+            row['contract_amount'] += contract_amount
+            row['contract_workers'] += contract_workers
+            row['total_workers'] += workers
+            row['total_labor_cost'] += cost
+            row['flag_counts'][flag] += 1
+            if flag_scores[flag] > flag_scores[row['worst_flag']]:
+                row['worst_flag'] = flag
+
+    result = []
+    for row in companies.values():
+        row['project_count'] = len(row['projects'])
+        row['projects'] = sorted(row['projects'])
+        row['contract_workers'] = int(row['contract_workers'])
+        row['balance'] = row['contract_amount'] - row['total_labor_cost']
+        result.append(row)
+    result.sort(key=lambda r: (-flag_scores[r['worst_flag']], r['company']))
+    return result
+
+@timed('calc.company_rollups')
+def get_company_rollups():
+    """업체별 집계 (데이터와 비용 임계값이 그대로면 캐시).
+
+    이 워커의 쓰기는 쓰기 리스너(invalidate_company_rollups)로, 다른 워커의 쓰기는 변경 로그로 감지한다.
+    """
+    key = (HEALTH_POLICY["COST_WARN_RATIO"], HEALTH_POLICY["COST_DANGER_RATIO"])
+    cache = _company_rollup_cache
+    dm = get_data_manager()
+    with _company_rollup_lock:
+        try:
+            changes = _company_rollup_changes.poll(dm)
+        except Exception as e:
+            log.warning("변경 로그 확인 실패 - 업체별 집계 재계산: %s", e)
+            changes = None
+        if changes is None or changes:
+            cache['rows'] = None
+        if cache['rows'] is not None and cache['key'] == key:
+            return cache['rows']
+        snapshot = dm.snapshot.current() if dm.snapshot is not None else None
+        rows = calculate_company_rollups(dm.get_projects(include_daily_data=False),
+                                         dm.get_labor_costs(),
+                                         dm.get_work_type_totals())
+        cache.update(key=key, rows=rows)
+        if snapshot is not None:
+            # 스냅샷이 아직 반영하지 않은 변경이 있으면 다음 호출에서 다시 계산
+            _company_rollup_changes.rewind(snapshot.seq)
+        return rows
+
+def invalidate_company_rollups(table=None, action=None, data=None):
+    """업체별 집계 캐시 무효화 (쓰기 리스너: 프로젝트/출역/단가 변경 시)"""
+    if table != 'users':
+        _company_rollup_cache['rows'] = None
+
+
+# ===== 완료일/예산 소진 예측 =====
+FORECAST_WINDOW_DAYS = 14  # 추세 계산에 쓰는 최근 입력일 수
+FORECAST_MIN_POINTS = 3    # 추세를 내기 위한 최소 입력일 수
+PROJECT_TOTAL_KEY = '__total__'
+_forecast_state = {}  # {프로젝트명: {공종 또는 PROJECT_TOTAL_KEY: _TrendWindow}}
+_forecast_rows = {}   # {프로젝트명: 예측 행} (바뀐 프로젝트만 다시 계산)
+_forecast_dirty = set()  # 다시 계산할 프로젝트
+_forecast_all_dirty = True  # 최초/단가 변경/변경 로그 유실 시 전체 재계산
+_forecast_changes = ChangeTracker()  # 다른 워커의 쓰기 감지
+_forecast_lock = threading.Lock()
+
+class _TrendWindow:
+    """최근 입력일의 (일자, 투입인원, 공정률) 선형회귀 누적합. 점 추가/제거는 O(1)."""
+
+    def __init__(self, anchor):
+        self.anchor = anchor  # x 기준일 (ordinal), 정밀도 유지를 위해 고정
+        self.points = deque()  # (date_key, x, workers, progress)
+        self.n = 0
+        self.sx = self.sxx = 0.0
+        self.sw = self.sxw = 0.0
+        self.sp = self.sxp = 0.0
+
+    def add(self, date_key, workers, progress):
+        x = date.fromisoformat(date_key).toordinal() - self.anchor
+        self.points.append((date_key, x, workers, progress))
+        self._apply(x, workers, progress, 1)
+        if len(self.points) > FORECAST_WINDOW_DAYS:
+            _, ox, ow, op = self.points.popleft()
+            self._apply(ox, ow, op, -1)
+
+    def _apply(self, x, workers, progress, sign):
+        self.n += sign
+        self.sx += sign * x
+        self.sxx += sign * x * x
+        self.sw += sign * workers
+        self.sxw += sign * x * workers
+        self.sp += sign * progress
+        self.sxp += sign * x * progress
+
+    @property
+    def last_date(self):
+        return self.points[-1][0] if self.points else None
+
+    def fit(self):
+        """(투입인원 기울기, 최근일 추정 투입인원, 공정률 기울기/일) 또는 None"""
+        if self.n < FORECAST_MIN_POINTS:
+            return None
+        denom = self.n * self.sxx - self.sx * self.sx
+        if denom == 0:
+            return None
+        w_slope = (self.n * self.sxw - self.sx * self.sw) / denom
+        w_level = (self.sw - w_slope * self.sx) / self.n + w_slope * self.points[-1][1]
+        p_slope = (self.n * self.sxp - self.sx * self.sp) / denom
+        return w_slope, w_level, p_slope
+
+def _series_points(daily_data, work_types):
+    """날짜순 {키: [(날짜, 투입인원, 공정률)]} (공종별 + 프로젝트 합계)"""
+    series = {}
+    for date_key in sorted(daily_data.keys()):
+        date_data = daily_data[date_key]
+        total_workers = 0
+        progress_sum = 0.0
+        progress_count = 0
+        for wt in work_types:
+            if wt in date_data:
+                wd = date_data[wt]
+                workers = int(wd.get('total', 0) or 0)
+                progress = parse_float(wd.get('progress', 0))
+                series.setdefault(wt, []).append((date_key, workers, progress))
+                total_workers += workers
+                progress_sum += progress
+                progress_count += 1
+        if progress_count:
+            series.setdefault(PROJECT_TOTAL_KEY, []).append(
+                (date_key, total_workers, progress_sum / progress_count))
+    return series
+
+def _refresh_trends(project_name, daily_data, work_types):
+    """프로젝트의 추세 누적합 갱신. 새 날짜만 추가하고, 기존 창의 값이 바뀌었으면 다시 계산."""
+    series = _series_points(daily_data, work_types)
+    state = _forecast_state.get(project_name, {})
+    new_state = {}
+    for key, points in series.items():
+        window = state.get(key)
+        if window is not None and window.points:
+            last = window.last_date
+            first = window.points[0][0]
+            full = len(window.points) >= FORECAST_WINDOW_DAYS
+            # 창 안의 기존 값이 그대로이고, 창 범위에 늦게 들어온 날짜가 없는지 확인
+            # (창이 덜 찼으면 첫 점보다 이른 날짜도 창에 들어가야 하므로 변경으로 본다)
+            current = {d: (w, p) for d, w, p in points if d <= last}
+            in_window = {d for d, _, _, _ in window.points}
+            unchanged = (all(current.get(d) == (w, p) for d, _, w, p in window.points)
+                         and not any(d not in in_window and (d >= first or not full) for d in current))
+            if unchanged:
+                for d, w, p in points:
+                    if d > last:
+                        window.add(d, w, p)
+                new_state[key] = window
+                continue
+        window = _TrendWindow(date.fromisoformat(points[0][0]).toordinal())
+        for d, w, p in points[-FORECAST_WINDOW_DAYS:]:
+            window.add(d, w, p)
+        new_state[key] = window
+    _forecast_state[project_name] = new_state
+    return new_state
+
+def _project_forecast(window, contract_amount, rate, labor_cost):
+    """추세 1개로 완료일/예산 소진일/완료 시점 잔액 예측"""
+    remaining_budget = contract_amount - labor_cost
+    result = {
+        'last_date': window.last_date if window else None,
+        'current_progress': round(window.points[-1][3], 1) if window and window.points else 0.0,
+        'workers_per_day': None,
+        'workers_trend': None,
+        'progress_per_day': None,
+        'completion_date': None,
+        'budget_exhausted_date': None,
+        'remaining_budget': remaining_budget,
+        'projected_balance': None,
+        'overrun': False,
+    }
+    fit = window.fit() if window else None
+    if fit is None:
+        return result
+
+    w_slope, w_level, p_slope = fit
+    w_level = max(w_level, 0.0)
+    last_day = date.fromisoformat(window.last_date)
+    daily_burn = w_level * rate
+    result.update(workers_per_day=round(w_level, 1), workers_trend=round(w_slope, 2),
+                  progress_per_day=round(p_slope, 2))
+
+    days_to_complete = None
+    if result['current_progress'] >= 100:
+        days_to_complete = 0
+    elif p_slope > 0:
+        days_to_complete = (100 - result['current_progress']) / p_slope
+        result['completion_date'] = (last_day + timedelta(days=int(days_to_complete + 0.999))).isoformat()
+
+    if daily_burn > 0:
+        days_to_exhaust = max(remaining_budget, 0) / daily_burn
+        result['budget_exhausted_date'] = (last_day + timedelta(days=int(days_to_exhaust))).isoformat()
+        if days_to_complete is not None:
+            result['projected_balance'] = int(remaining_budget - daily_burn * days_to_complete)
+            result['overrun'] = days_to_exhaust < days_to_complete
+    return result
+
+def _forecast_project(project_name, project_data, labor_costs, pair_totals):
+    """프로젝트 1개의 예측 행 (추세 누적합 갱신 포함, _forecast_lock 안에서 호출)"""
+    work_types = project_data.get('work_types', []) or []
+    contracts = project_data.get('contracts', {}) or {}
+    windows = _refresh_trends(project_name, project_data.get('daily_data', {}) or {}, work_types)
+
+    rows = []
+    total_contract = total_cost = 0
+    burn_rate_sum = 0.0
+    for wt in work_types:
+        contract_amount = int(contracts.get(wt, 0) or 0)
+        rate = parse_int((labor_costs.get(wt, {}) or {}).get('day', 0), 0)
+        totals = pair_totals.get((project_name, wt), {})
+        cost = totals.get('labor_cost')
+        if cost is None:
+            cost = totals.get('total_workers', 0) * rate
+        row = _project_forecast(windows.get(wt), contract_amount, rate, cost)
+        row['work_type'] = wt
+        rows.append(row)
+        total_contract += contract_amount
+        total_cost += cost
+        if row['workers_per_day']:
+            burn_rate_sum += row['workers_per_day'] * rate
+
+    # 프로젝트 합계: 공정 추세는 공종 평균 공정률, 소진 속도는 공종별 단가 가중
+    total_window = windows.get(PROJECT_TOTAL_KEY)
+    total_fit = total_window.fit() if total_window else None
+    avg_rate = 0
+    if total_fit and total_fit[1] > 0:
+        avg_rate = burn_rate_sum / total_fit[1]
+    project_row = _project_forecast(total_window, total_contract, avg_rate, total_cost)
+    project_row.update(project_name=project_name, work_types=rows)
+    return project_row
+
+def calculate_forecasts(projects_data, labor_costs, pair_totals):
+    """전체 프로젝트·공종의 완료일과 예산 소진일 예측.
+
+    투입노무비 누계는 (프로젝트, 공종) 합계(pair_totals)를 쓰고, 추세는 최근
+    FORECAST_WINDOW_DAYS 입력일의 선형회귀로 구한다. 추세 누적합은 프로젝트별로
+    보관되어 새 입력일만 반영하므로 요청마다 전체를 다시 적합하지 않는다.
+    """
+    forecasts = []
+    with _forecast_lock:
+        for project_name in list(_forecast_state):
+            if project_name not in projects_data:
+                del _forecast_state[project_name]
+
+        for project_name, project_data in projects_data.items():
+            forecasts.append(_forecast_project(project_name, project_data, labor_costs, pair_totals))
+    return forecasts
+
+def mark_forecast_dirty(table, action, data):
+    """쓰기 리스너: 바뀐 프로젝트만 다음 예측 때 다시 계산 (단가 변경은 전체)"""
+    global _forecast_all_dirty
+    if table in ('daily_data', 'projects') and data.get('project_name'):
+        _forecast_dirty.add(data['project_name'])
+    elif table == 'labor_costs':
+        _forecast_all_dirty = True
+
+@timed('calc.forecasts')
+def get_forecasts():
+    """현재 DB 데이터 기준 예측 (바뀐 프로젝트만 다시 계산)"""
+    global _forecast_all_dirty
+    dm = get_data_manager()
+    with _forecast_lock:
+        try:
+            changes = _forecast_changes.poll(dm)
+        except Exception as e:
+            log.warning("변경 로그 확인 실패 - 예측 전체 재계산: %s", e)
+            changes = None
+        if changes is None:
+            _forecast_all_dirty = True
+        else:
+            for table, action, data in changes:
+                mark_forecast_dirty(table, action, data)
+
+        if _forecast_all_dirty:
+            _forecast_all_dirty = False
+            _forecast_dirty.clear()
+            _forecast_rows.clear()
+            # 스냅샷에서 읽으면 스냅샷이 아직 반영하지 않은 변경은 다음 호출 때 다시 받도록 커서를 되돌림
+            snapshot = dm.snapshot.current() if dm.snapshot is not None else None
+            projects_data = dm.get_projects()
+            labor_costs = dm.get_labor_costs()
+            pair_totals = dm.get_work_type_totals()
+            for project_name in list(_forecast_state):
+                if project_name not in projects_data:
+                    del _forecast_state[project_name]
+            for project_name, project_data in projects_data.items():
+                _forecast_rows[project_name] = _forecast_project(project_name, project_data, labor_costs, pair_totals)
+            if snapshot is not None:
+                _forecast_changes.rewind(snapshot.seq)
+        elif _forecast_dirty:
+            labor_costs = dm.get_labor_costs()
+            while _forecast_dirty:
+                project_name = _forecast_dirty.pop()
+                project_data = dm.get_project(project_name, fresh=True)
+                if project_data is None:
+                    _forecast_rows.pop(project_name, None)
+                    _forecast_state.pop(project_name, None)
+                    continue
+                _forecast_rows[project_name] = _forecast_project(
+                    project_name, project_data, labor_costs, dm.get_work_type_totals(project_name))
+        return list(_forecast_rows.values())
@@ -0,0 +1,82 @@
+# change_tracker.py - 변경 로그(change_log)를 따라가며 다른 워커의 쓰기를 알아내는 커서
+import threading
+from utils import CHANGE_FEED_POLICY
+from app_logging import get_logger
+
+log = get_logger('change_tracker')
+
+class ChangeTracker:
+    """워커별 캐시가 다른 워커에서 일어난 쓰기를 알아내기 위한 변경 로그 커서.
+
+    쓰기 리스너(dm.add_write_listener)는 같은 워커의 쓰기만 받으므로, 캐시를 쓰기 전에
+    poll()로 마지막으로 반영한 번호 이후의 변경을 (table, action, data) 목록으로 받는다.
+    처음 호출이거나, 보관 기간 경과로 항목이 삭제됐거나, 밀린 항목이 limit 이상이면
+    개별 변경 대신 None을 돌려준다 (호출한 쪽은 전체를 다시 계산).
+    """
+
+    def __init__(self, limit=None):
+        self.limit = limit or CHANGE_FEED_POLICY['max_limit']
+        self.seq = None  # 마지막으로 반영한 변경 번호
+        self._lock = threading.Lock()
+
+    def poll(self, dm):
+        with self._lock:
+            since = self.seq
+            if since is None:
+                _, self.seq, _ = dm.get_changes(0, limit=0, include_users=False)
+                return None
+            rows, head, purged_through = dm.get_changes(since, limit=self.limit, include_users=False)
+            self.seq = max(since, head)
+            if purged_through > since or len(rows) >= self.limit:
+                return None
+            return [(row['table_name'], row['action'], row['data'] or {}) for row in rows]
+
+    def rewind(self, seq):
+        """seq 이후 변경을 다음 poll()에서 다시 받도록 커서를 되돌림 (읽은 데이터가 seq까지만 반영한 경우)"""
+        with self._lock:
+            if self.seq is not None and seq < self.seq:
+                self.seq = seq
+
+    def reset(self):
+        """다음 poll()에서 전체 재계산을 알리도록 커서 초기화"""
+        with self._lock:
+            self.seq = None
+
+class ProjectVersions:
+    """프로젝트별 변경 카운터 (캐시 키용, 워커 프로세스별).
+
+    이 워커의 쓰기는 쓰기 리스너(on_data_write)로, 다른 워커의 쓰기는 sync()에서 변경 로그로 센다.
+    노무단가 변경이나 변경 로그 유실처럼 모든 프로젝트에 영향을 주는 변경은 epoch를 올린다.
+    """
+
+    def __init__(self):
+        self.epoch = 0
+        self._versions = {}
+        self._changes = ChangeTracker()
+
+    def on_data_write(self, table, action, data):
+        if table in ('daily_data', 'projects') and data.get('project_name'):
+            name = data['project_name']
+            self._versions[name] = self._versions.get(name, 0) + 1
+        elif table == 'labor_costs':
+            self.epoch += 1
+
+    def sync(self, dm):
+        """다른 워커에서 일어난 변경 반영 (변경 로그를 못 읽으면 전체 무효화)"""
+        try:
+            changes = self._changes.poll(dm)
+        except Exception as e:
+            log.warning("변경 로그 확인 실패 - 전체 다시 계산: %s", e)
+            changes = None
+        if changes is None:
+            self.epoch += 1
+            return
+        for table, action, data in changes:
+            self.on_data_write(table, action, data)
+
+    def rewind(self, seq):
+        """읽은 데이터(스냅샷)가 seq까지만 반영했으면 이후 변경을 다음 sync()에서 다시 센다"""
+        self._changes.rewind(seq)
+
+    def version(self, project_name):
+        return self.epoch, self._versions.get(project_name, 0)
@@ -0,0 +1,228 @@
+# compression.py - 응답 압축 WSGI 미들웨어 (gzip/brotli) 및 사전 압축 정적 파일 제공
+import os
+import zlib
+import mimetypes
+from utils import COMPRESSION_POLICY
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+# 사전 압축 파일 확장자 (선호 순)
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+
+def _accepted_encodings(environ):
+    """Accept-Encoding에서 q=0이 아닌 인코딩 집합"""
+    accepted = set()
+    for part in environ.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = params.strip()
+        if q.startswith('q='):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.add(name)
+    if '*' in accepted:
+        accepted |= {'gzip', 'br'}
+    return accepted
+
+def choose_encoding(environ):
+    accepted = _accepted_encodings(environ)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+class _Compressor:
+    def __init__(self, encoding, level):
+        if encoding == 'br':
+            self._obj = brotli.Compressor(quality=COMPRESSION_POLICY.get('brotli_quality', 5))
+            self.compress, self._flush, self._finish = self._obj.process, self._obj.flush, self._obj.finish
+        else:
+            self._obj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)  # gzip 헤더
+            self.compress = self._obj.compress
+            self._flush = lambda: self._obj.flush(zlib.Z_SYNC_FLUSH)
+            self._finish = self._obj.flush
+
+    def flush(self):
+        return self._flush()
+
+    def finish(self):
+        return self._finish()
+
+def _set_header(headers, name, value):
+    lname = name.lower()
+    headers[:] = [(k, v) for k, v in headers if k.lower() != lname]
+    if value is not None:
+        headers.append((name, value))
+
+def _get_header(headers, name):
+    lname = name.lower()
+    for k, v in headers:
+        if k.lower() == lname:
+            return v
+    return None
+
+class CompressionMiddleware:
+    """Accept-Encoding 협상으로 응답을 압축. 최소 크기와 Content-Type 허용 목록을 적용하고,
+    스트리밍 응답은 조각 단위로 압축해 흘려보낸다. /static/ 아래 파일은 빌드 시 만든
+    .br/.gz 사본이 있으면 그대로 보낸다 (scripts/precompress_static.py).
+    """
+
+    def __init__(self, app, static_dir=None, static_url='/static/'):
+        self.app = app
+        self.static_dir = static_dir
+        self.static_url = static_url
+
+    def __call__(self, environ, start_response):
+        if not COMPRESSION_POLICY.get('enabled', True):
+            return self.app(environ, start_response)
+        encoding = choose_encoding(environ)
+        if encoding is None:
+            return self.app(environ, start_response)
+
+        if self.static_dir and environ.get('REQUEST_METHOD') in ('GET', 'HEAD'):
+            served = self._serve_precompressed(environ, start_response)
+            if served is not None:
+                return served
+
+        captured = {}
+
+        def capture_start_response(status, headers, exc_info=None):
+            captured['status'], captured['headers'], captured['exc_info'] = status, list(headers), exc_info
+            return lambda data: captured.setdefault('written', []).append(data)
+
+        body = self.app(environ, capture_start_response)
+        if 'status' not in captured:
+            # start_response를 첫 조각에서 호출하는 앱 대응
+            iterator = iter(body)
+            first = next(iterator, b'')
+            captured.setdefault('written', []).insert(0, first)
+            body = _chain([], iterator) if not hasattr(body, 'close') else _Closing(iterator, body)
+        return self._compress_body(body, captured, encoding, start_response, environ)
+
+    def _compressible(self, status, headers):
+        if not status.startswith('200'):
+            return False
+        if _get_header(headers, 'Content-Encoding'):
+            return False
+        if 'no-transform' in (_get_header(headers, 'Cache-Control') or ''):
+            return False
+        content_type = (_get_header(headers, 'Content-Type') or '').split(';')[0].strip().lower()
+        return content_type in COMPRESSION_POLICY.get('content_types', ())
+
+    def _compress_body(self, body, captured, encoding, start_response, environ):
+        status, headers = captured['status'], captured['headers']
+        if not self._compressible(status, headers) or environ.get('REQUEST_METHOD') == 'HEAD':
+            start_response(status, headers, captured.get('exc_info'))
+            return _chain(captured.pop('written', []), body)
+
+        min_size = COMPRESSION_POLICY.get('min_size', 500)
+        length = _get_header(headers, 'Content-Length')
+        if length is not None and int(length) < min_size:
+            start_response(status, headers, captured.get('exc_info'))
+            return _chain(captured.pop('written', []), body)
+        return self._stream(body, captured, encoding, start_response, min_size)
+
+    def _stream(self, body, captured, encoding, start_response, min_size):
+        status, headers = captured['status'], captured['headers']
+        iterator = iter(_chain(captured.pop('written', []), body))
+        try:
+            # 크기를 모르는 응답은 최소 크기만큼 모아본 뒤 압축 여부 결정
+            buffered, size = [], 0
+            for chunk in iterator:
+                if chunk:
+                    buffered.append(chunk)
+                    size += len(chunk)
+                if size >= min_size:
+                    break
+            else:
+                start_response(status, headers, captured.get('exc_info'))
+                yield b''.join(buffered)
+                return
+
+            _set_header(headers, 'Content-Encoding', encoding)
+            _set_header(headers, 'Content-Length', None)
+            vary = _get_header(headers, 'Vary')
+            if not vary or 'accept-encoding' not in vary.lower():
+                _set_header(headers, 'Vary', f'{vary}, Accept-Encoding' if vary else 'Accept-Encoding')
+            etag = _get_header(headers, 'ETag')
+            if etag and not etag.startswith('W/'):
+                _set_header(headers, 'ETag', 'W/' + etag)  # 압축 표현은 바이트가 다르므로 약한 ETag
+            start_response(status, headers, captured.get('exc_info'))
+
+            compressor = _Compressor(encoding, COMPRESSION_POLICY.get('level', 6))
+            out = compressor.compress(b''.join(buffered))
+            for chunk in iterator:
+                # 스트리밍 응답이 압축 버퍼에 묶이지 않도록 조각마다 flush
+                yield out + compressor.compress(chunk) + compressor.flush()
+                out = b''
+            yield out + compressor.finish()
+        finally:
+            if hasattr(body, 'close'):
+                body.close()
+
+    def _serve_precompressed(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if not path.startswith(self.static_url):
+            return None
+        rel = os.path.normpath(path[len(self.static_url):]).lstrip(os.sep)
+        if rel.startswith('..'):
+            return None
+        source = os.path.join(self.static_dir, rel)
+        if not os.path.isfile(source):
+            return None
+        accepted = _accepted_encodings(environ)
+        for encoding, ext in PRECOMPRESSED:
+            if encoding not in accepted:
+                continue
+            candidate = source + ext
+            try:
+                if os.path.getmtime(candidate) < os.path.getmtime(source):
+                    continue  # 원본이 더 새로우면 사본 무시
+                with open(candidate, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                continue
+            content_type = mimetypes.guess_type(source)[0] or 'application/octet-stream'
+            if content_type.startswith('text/') or content_type in ('application/javascript', 'application/json'):
+                content_type += '; charset=utf-8'
+            start_response('200 OK', [
+                ('Content-Type', content_type),
+                ('Content-Encoding', encoding),
+                ('Content-Length', str(len(data))),
+                ('Vary', 'Accept-Encoding'),
+                ('Cache-Control', 'public, max-age=43200'),
+            ])
+            return [b''] if environ.get('REQUEST_METHOD') == 'HEAD' else [data]
+        return None
+
+def _chain(first, body):
+    for chunk in first:
+        yield chunk
+    try:
+        for chunk in body:
+            yield chunk
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+
+class _Closing:
+    """이미 시작한 이터레이터를 이어서 돌려주면서 원래 응답의 close()를 보존"""
+
+    def __init__(self, iterator, body):
+        self._iterator = iterator
+        self._body = body
+
+    def __iter__(self):
+        return self._iterator
+
+    def close(self):
+        self._body.close()
@@ -1,14 +1,67 @@
 # database.py - Supabase PostgreSQL 연결 (안정화 버전)
 import os
+import sys
 import psycopg2
 import json
 import time
+import threading
 from datetime import datetime, date
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 from psycopg2 import OperationalError, DatabaseError
+from metrics import registry as metrics, db_operation, count_cache
+from utils import SNAPSHOT_POLICY, CHANGE_FEED_POLICY, DAILY_DATA_WINDOW_DAYS
+import server_timing
+from app_logging import get_logger
+
+log = get_logger('database')
+
+# 준비 상태 점검(/readyz) 연결/쿼리 타임아웃 (초)
+PING_TIMEOUT = 2
+
+# 오프라인 제출 ID 보관 기간 (이보다 오래 밀린 재전송은 새 제출로 처리)
+SUBMISSION_RETENTION_DAYS = 30
+
+# 변경 로그 항목의 엔터티 키 (같은 키의 이전 항목은 압축 대상)
+CHANGE_KEYS = {
+    'users': ('username',),
+    'projects': ('project_name',),
+    'daily_data': ('project_name', 'work_date', 'work_type'),
+    'labor_costs': ('work_type',),
+}
+
+class _ConnectionLock:
+    """연결 잠금 (RLock) + 대기/사용 중 상태 (지표용)"""
 
-class DatabaseManager:
     def __init__(self):
+        self._lock = threading.RLock()
+        self._count_lock = threading.Lock()
+        self._depth = 0     # 잡고 있는 스레드의 재진입 깊이
+        self.waiting = 0
+
+    @property
+    def in_use(self):
+        return 1 if self._depth else 0
+
+    def __enter__(self):
+        if not self._lock.acquire(blocking=False):
+            with self._count_lock:
+                self.waiting += 1
+            start = time.perf_counter()
+            self._lock.acquire()
+            with self._count_lock:
+                self.waiting -= 1
+            waited = time.perf_counter() - start
+            metrics.observe('laborapp_db_lock_wait_seconds', waited)
+            server_timing.record('db.lock_wait', waited)
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        self._lock.release()
+
+class DatabaseManager:
+    def __init__(self, lazy=False):
         # Supabase 연결 정보
         self.database_url = os.environ.get('DATABASE_URL')
         if not self.database_url:
@@ -18,11 +71,248 @@ class DatabaseManager:
         self.conn = None
         self.max_retries = 3
         self.retry_delay = 1  # 초
-        self.connect()
+        self._write_listeners = []  # 쓰기 후 호출되는 콜백 (table, action, data)
+        self._lock = _ConnectionLock()  # 연결 1개를 스레드/그린렛이 나눠 쓰므로 쿼리 단위 직렬화
+        self.snapshot = None  # 스냅샷 모드일 때 SnapshotStore (조회를 메모리에서 처리)
+        self._pid = os.getpid()
+        self._inherited_conns = []  # 포크 전에 열린 연결 (닫으면 부모 세션까지 끊기므로 참조만 유지)
+        self._schema_ready = False
+        self._compactor = None  # 변경 로그 정리 스레드 (워커별)
+        # lazy=True면 첫 쿼리 때 연결 (DB가 잠시 느려도 앱 기동은 바로 끝남)
+        if not lazy:
+            self.connect()
+
+    def after_fork(self):
+        """포크된 워커에서 호출: 부모와 공유하던 연결/잠금을 버리고 다음 쿼리에서 새로 연결"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        self._lock = _ConnectionLock()
+        if self.conn is not None and not self.conn.closed:
+            # 자식에서 close()하면 종료 메시지가 부모 세션으로 전송되므로 닫지 않고 보관만 한다
+            self._inherited_conns.append(self.conn)
+        self.conn = None
+
+    def _read_snapshot(self):
+        """스냅샷 모드면 조회에 쓸 현재 스냅샷 (없으면 None → DB 조회)"""
+        if self.snapshot is None:
+            return None
+        snapshot = self.snapshot.current()
+        if SNAPSHOT_POLICY.get('enabled') and not self.snapshot.is_refresher():
+            count_cache('snapshot', snapshot is not None)
+        return snapshot
+
+    def _raise_read_errors(self):
+        """스냅샷 갱신 스레드의 조회 오류는 빈 결과 대신 예외로 (빈 스냅샷으로 교체되지 않도록)"""
+        return self.snapshot is not None and self.snapshot.is_refresher()
+
+    def ping(self, timeout=PING_TIMEOUT):
+        """DB 응답 확인 (준비 상태 점검용).
+
+        공유 연결과 잠금을 쓰지 않고 짧은 타임아웃의 점검용 연결을 따로 열어 1회 확인 후 닫는다
+        (DB가 느려도 요청 스레드가 점검을 기다리며 막히지 않음).
+        """
+        conn = None
+        try:
+            conn = psycopg2.connect(
+                self.database_url,
+                connect_timeout=timeout,
+                application_name='LaborApp-ping',
+                options=f'-c statement_timeout={int(timeout * 1000)}'
+            )
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            return True
+        except (OperationalError, DatabaseError) as e:
+            log.warning("DB 응답 확인 실패: %s", e)
+            return False
+        finally:
+            if conn is not None:
+                conn.close()
+
+    def lock_stats(self):
+        """(사용 중 연결 수, 대기 중 스레드 수)"""
+        return self._lock.in_use, self._lock.waiting
+
+    def add_write_listener(self, callback):
+        """쓰기 성공 후 호출될 콜백 등록: callback(table, action, data)
+
+        일괄 저장은 프로젝트마다 한 번 action='upsert_batch', data={'project_name', 'rows': [행 data, ...]}로 호출.
+        """
+        self._write_listeners.append(callback)
+
+    def _write(self, statements, table, action, **data):
+        """쓰기 쿼리 [(query, params)]와 변경 로그를 한 트랜잭션에서 실행 후 등록된 콜백 호출.
+
+        변경 로그 기록이 실패하면 쓰기도 롤백된다 (변경 피드에서 빠지는 쓰기가 없도록).
+        콜백 오류는 쓰기 결과에 영향을 주지 않음.
+        """
+        def run(cur):
+            for query, params in statements:
+                cur.execute(query, params)
+            return [(table, action, data)], None
+
+        self._transaction(run, db_operation(statements[0][0]), sys._getframe(1).f_code.co_name)
+        self._call_listeners(table, action, data)
+
+    def _transaction(self, fn, operation, timing_name=None):
+        """fn(cur) -> (변경 목록 [(table, action, data)], 결과)를 변경 로그와 한 트랜잭션에서 실행하고 결과 반환.
+
+        끊긴 연결(OperationalError)은 롤백 후 새 연결로 한 번 더 실행하므로 fn은 다시 실행해도 같은
+        결과가 나와야 한다. 콜백 호출은 호출한 쪽에서 커밋 후에 한다.
+        """
+        max_attempts = 2
+        for attempt in range(max_attempts):
+            try:
+                with self._lock:
+                    conn = self.get_connection()
+                    start = time.perf_counter()
+                    try:
+                        with conn.cursor() as cur:
+                            changes, result = fn(cur)
+                            if changes:
+                                self._record_changes(changes, cur)
+                        conn.commit()
+                    except Exception:
+                        self._rollback(conn)
+                        raise
+                    elapsed = time.perf_counter() - start
+                    metrics.observe('laborapp_db_query_duration_seconds', elapsed, {'operation': operation})
+                    if timing_name and server_timing.active():
+                        server_timing.record(f'db.{timing_name}', elapsed)
+                return result
+            except OperationalError as e:
+                # 끊긴 연결: 롤백되었으므로 새 연결로 한 번 더
+                metrics.inc('laborapp_db_query_errors_total', {'operation': operation})
+                log.warning("쓰기 실패 (시도 %s): %s", attempt + 1, e)
+                if attempt < max_attempts - 1:
+                    self._discard_connection()
+                    time.sleep(0.5)
+                else:
+                    raise
+
+    @staticmethod
+    def _rollback(conn):
+        """실패한 트랜잭션 정리 (끊긴 연결이면 롤백 오류는 무시)"""
+        try:
+            if not conn.closed:
+                conn.rollback()
+        except (OperationalError, DatabaseError, psycopg2.InterfaceError):
+            pass
+
+    def _discard_connection(self):
+        """쓸 수 없게 된 연결을 닫고 버림 (다음 쿼리에서 새로 연결)"""
+        conn, self.conn = self.conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    def _call_listeners(self, table, action, data):
+        for callback in self._write_listeners:
+            try:
+                callback(table, action, data)
+            except Exception as e:
+                log.error("쓰기 알림 처리 실패 (%s/%s): %s", table, action, e)
+
+    def _record_changes(self, changes, cur=None):
+        """변경 로그에 [(table, action, data)] 기록. cur를 주면 그 트랜잭션 안에서 실행.
+
+        번호는 change_log_seq 행을 잠그고 증가시키므로, 커밋 순서와 번호 순서가 같다
+        (커서 이후 번호가 나중에 끼어들지 않음).
+        """
+        items = []
+        for table, action, data in changes:
+            key_fields = CHANGE_KEYS[table]
+            if table == 'users' and data.get('new_username'):
+                key_fields = ('new_username',)  # 이름 변경은 새 이름 기준으로 기록
+            items.append({'table': table, 'action': action,
+                          'key': '|'.join(str(data.get(f, '')) for f in key_fields), 'data': data})
+        query = """
+            WITH s AS (
+                UPDATE public.change_log_seq SET seq = seq + %s WHERE id = 1 RETURNING seq
+            )
+            INSERT INTO public.change_log (seq, table_name, action, entity_key, data)
+            SELECT s.seq - %s + v.ord, v.item->>'table', v.item->>'action', v.item->>'key', v.item->'data'
+            FROM s, jsonb_array_elements(%s::jsonb) WITH ORDINALITY AS v(item, ord)
+        """
+        params = (len(items), len(items), json.dumps(items, ensure_ascii=False, default=str))
+        if cur is not None:
+            cur.execute(query, params)
+        else:
+            self.execute_query(query, params)
+
+    def ensure_schema(self):
+        """앱이 추가로 사용하는 테이블 생성 (없을 때만)"""
+        try:
+            self.execute_query("""
+                CREATE TABLE IF NOT EXISTS public.labor_cost_history (
+                    work_type VARCHAR NOT NULL,
+                    effective_date DATE NOT NULL,
+                    day_cost INTEGER NOT NULL DEFAULT 0,
+                    night_cost INTEGER NOT NULL DEFAULT 0,
+                    midnight_cost INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT NOW(),
+                    PRIMARY KEY (work_type, effective_date)
+                )
+            """)
+            # 이력이 없는 공종은 현재 단가를 최초 적용 단가로 등록 (기존 데이터 단가 유지)
+            self.execute_query("""
+                INSERT INTO public.labor_cost_history
+                    (work_type, effective_date, day_cost, night_cost, midnight_cost)
+                SELECT lc.work_type, DATE '1900-01-01', lc.day_cost, lc.night_cost, lc.midnight_cost
+                FROM public.labor_costs lc
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM public.labor_cost_history h WHERE h.work_type = lc.work_type
+                )
+            """)
+            # 오프라인 일괄 전송의 제출 ID (같은 제출을 다시 보내도 한 번만 반영)
+            self.execute_query("""
+                CREATE TABLE IF NOT EXISTS public.attendance_submissions (
+                    submission_id VARCHAR PRIMARY KEY,
+                    username VARCHAR,
+                    project_name VARCHAR NOT NULL,
+                    work_date DATE NOT NULL,
+                    entry_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+            self.execute_query(f"""
+                DELETE FROM public.attendance_submissions
+                WHERE created_at < NOW() - INTERVAL '{SUBMISSION_RETENTION_DAYS} days'
+            """)
+            # 증분 동기화용 변경 로그 (번호는 단일 행 카운터로 발급)
+            self.execute_query("""
+                CREATE TABLE IF NOT EXISTS public.change_log_seq (
+                    id INTEGER PRIMARY KEY,
+                    seq BIGINT NOT NULL DEFAULT 0,
+                    purged_through BIGINT NOT NULL DEFAULT 0
+                )
+            """)
+            self.execute_query("INSERT INTO public.change_log_seq (id) VALUES (1) ON CONFLICT DO NOTHING")
+            self.execute_query("""
+                CREATE TABLE IF NOT EXISTS public.change_log (
+                    seq BIGINT PRIMARY KEY,
+                    table_name VARCHAR NOT NULL,
+                    action VARCHAR NOT NULL,
+                    entity_key VARCHAR NOT NULL,
+                    data JSONB,
+                    created_at TIMESTAMP DEFAULT NOW()
+                )
+            """)
+            self.execute_query("""
+                CREATE INDEX IF NOT EXISTS change_log_entity_idx
+                ON public.change_log (table_name, entity_key, seq)
+            """)
+        except Exception as e:
+            log.error("스키마 확인 실패: %s", e)
     
-    def connect(self):
-        """데이터베이스 연결 (재시도 로직 포함)"""
-        for attempt in range(self.max_retries):
+    def connect(self, max_attempts=None):
+        """데이터베이스 연결 (재시도 로직 포함). 프로세스에서 처음 연결되면 스키마 확인."""
+        max_attempts = max_attempts or self.max_retries
+        retry_delay = self.retry_delay
+        for attempt in range(max_attempts):
             try:
                 # 기존 연결 정리
                 if self.conn and not self.conn.closed:
@@ -44,16 +334,19 @@ class DatabaseManager:
                     cur.execute("SELECT 1")  # 연결 테스트
                     self.conn.commit()
                 
-                print(f"✅ Supabase PostgreSQL 연결 성공 (시도 {attempt + 1})")
-                return
+                log.debug("Supabase PostgreSQL 연결 성공 (시도 %s)", attempt + 1)
+                break
                 
             except Exception as e:
-                print(f"❌ 연결 시도 {attempt + 1} 실패: {e}")
-                if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay)
-                    self.retry_delay *= 2  # 지수 백오프
+                log.warning("연결 시도 %s 실패: %s", attempt + 1, e)
+                if attempt < max_attempts - 1:
+                    time.sleep(retry_delay)
+                    retry_delay *= 2  # 지수 백오프
                 else:
                     raise ConnectionError(f"데이터베이스 연결 최종 실패: {e}")
+        if not self._schema_ready:
+            self._schema_ready = True
+            self.ensure_schema()
     
     def get_connection(self):
         """안전한 연결 확인 및 반환 (최적화)"""
@@ -72,27 +365,42 @@ class DatabaseManager:
         max_attempts = 2
         for attempt in range(max_attempts):
             try:
-                conn = self.get_connection()
-                with conn.cursor() as cur:
-                    cur.execute(query, params)
-                    
-                    if fetch:
-                        if fetch == 'all':
-                            result = cur.fetchall()
-                        elif fetch == 'one':
-                            result = cur.fetchone()
-                        else:
-                            result = cur.fetchmany(fetch)
-                    else:
-                        result = None
-                    
-                    conn.commit()
+                with self._lock:
+                    conn = self.get_connection()
+                    start = time.perf_counter()
+                    try:
+                        with conn.cursor() as cur:
+                            cur.execute(query, params)
+
+                            if fetch:
+                                if fetch == 'all':
+                                    result = cur.fetchall()
+                                elif fetch == 'one':
+                                    result = cur.fetchone()
+                                else:
+                                    result = cur.fetchmany(fetch)
+                            else:
+                                result = None
+
+                            conn.commit()
+                    except Exception:
+                        # 실패한 트랜잭션이 공유 연결에 남아 다음 쿼리를 막지 않도록 잠금 안에서 롤백
+                        self._rollback(conn)
+                        raise
+                    elapsed = time.perf_counter() - start
+                    metrics.observe('laborapp_db_query_duration_seconds', elapsed, {'operation': db_operation(query)})
+                    if server_timing.active():
+                        # 호출한 조회 메서드 이름으로 기록 (db.get_projects 등)
+                        server_timing.record(f'db.{sys._getframe(1).f_code.co_name}', elapsed)
                     return result
                     
             except (OperationalError, DatabaseError) as e:
-                print(f"쿼리 실행 실패 (시도 {attempt + 1}): {e}")
+                metrics.inc('laborapp_db_query_errors_total', {'operation': db_operation(query)})
+                log.warning("쿼리 실행 실패 (시도 %s): %s", attempt + 1, e)
+                if not isinstance(e, OperationalError):
+                    raise  # 잘못된 값/쿼리 (DataError 등): 연결은 정상이므로 재시도하지 않음
                 if attempt < max_attempts - 1:
-                    self.conn = None
+                    self._discard_connection()  # 끊긴 연결은 닫고 새로 연결
                     time.sleep(0.5)
                 else:
                     raise
@@ -118,19 +426,19 @@ class DatabaseManager:
             return users_data
             
         except Exception as e:
-            print(f"❌ 사용자 조회 실패: {e}")
+            log.error("사용자 조회 실패: %s", e)
             return {}
     
     def create_user(self, username, password, role='user', projects=None, status='active'):
         """사용자 생성"""
         try:
-            self.execute_query("""
+            self._write([("""
                 INSERT INTO public.users (username, password, role, projects, status)
                 VALUES (%s, %s, %s, %s, %s)
-            """, (username, password, role, projects or [], status))
-            print(f"✅ 사용자 생성 성공: {username}")
+            """, (username, password, role, projects or [], status))], 'users', 'create', username=username)
+            log.debug("사용자 생성 성공: %s", username)
         except Exception as e:
-            print(f"❌ 사용자 생성 실패: {e}")
+            log.error("사용자 생성 실패: %s", e)
             raise
     
     def update_user(self, old_username, new_username=None, password=None, 
@@ -159,25 +467,30 @@ class DatabaseManager:
             if updates:
                 query = f"UPDATE public.users SET {', '.join(updates)} WHERE username = %s"
                 values.append(old_username)
-                self.execute_query(query, values)
-                print(f"✅ 사용자 업데이트 성공: {old_username}")
+                self._write([(query, values)], 'users', 'update', username=old_username,
+                            new_username=new_username or old_username)
+                log.debug("사용자 업데이트 성공: %s", old_username)
                 
         except Exception as e:
-            print(f"❌ 사용자 업데이트 실패: {e}")
+            log.error("사용자 업데이트 실패: %s", e)
             raise
     
     def delete_user(self, username):
         """사용자 삭제"""
         try:
-            self.execute_query("DELETE FROM public.users WHERE username = %s", (username,))
-            print(f"✅ 사용자 삭제 성공: {username}")
+            self._write([("DELETE FROM public.users WHERE username = %s", (username,))],
+                        'users', 'delete', username=username)
+            log.debug("사용자 삭제 성공: %s", username)
         except Exception as e:
-            print(f"❌ 사용자 삭제 실패: {e}")
+            log.error("사용자 삭제 실패: %s", e)
             raise
     
     # ===== 프로젝트 관리 =====
-    def get_projects(self):
-        """모든 프로젝트 조회"""
+    def get_projects(self, include_daily_data=True):
+        """모든 프로젝트 조회 (include_daily_data=False면 일일 데이터 조회 생략)"""
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            return snapshot.get_projects(include_daily_data)
         try:
             rows = self.execute_query("""
                 SELECT project_name, status, created_date, work_types, contracts, companies
@@ -192,14 +505,48 @@ class DatabaseManager:
                     'work_types': row['work_types'] or [],
                     'contracts': row['contracts'] or {},
                     'companies': row['companies'] or {},
-                    'daily_data': self._get_project_daily_data(row['project_name'])
+                    'daily_data': self._get_project_daily_data(row['project_name']) if include_daily_data else {}
                 }
             return projects_data
             
         except Exception as e:
-            print(f"❌ 프로젝트 조회 실패: {e}")
+            log.error("프로젝트 조회 실패: %s", e)
+            if self._raise_read_errors():
+                raise
             return {}
     
+    def get_project(self, project_name, fresh=False):
+        """프로젝트 1개 조회 (없으면 None). fresh=True면 스냅샷을 건너뛰고 DB에서 조회"""
+        snapshot = None if fresh else self._read_snapshot()
+        if snapshot is not None:
+            return snapshot.get_project(project_name)
+        try:
+            row = self.execute_query("""
+                SELECT project_name, status, created_date, work_types, contracts, companies
+                FROM public.projects
+                WHERE project_name = %s
+            """, (project_name,), fetch='one')
+            if not row:
+                return None
+            return {
+                'status': row['status'],
+                'created_date': str(row['created_date']) if row['created_date'] else '',
+                'work_types': row['work_types'] or [],
+                'contracts': row['contracts'] or {},
+                'companies': row['companies'] or {},
+                'daily_data': self._get_project_daily_data(project_name)
+            }
+
+        except Exception as e:
+            log.error("프로젝트 조회 실패 (%s): %s", project_name, e)
+            if self._raise_read_errors():
+                raise
+            return None
+
+    def notify(self, channel, payload):
+        """PostgreSQL NOTIFY 발행 (다른 워커/인스턴스에 변경 알림)"""
+        self.execute_query("SELECT pg_notify(%s, %s)", (channel, payload))
+
     def _get_project_daily_data(self, project_name):
         """프로젝트의 일일 데이터 조회 (인덱스 최적화)"""
         try:
@@ -209,9 +556,9 @@ class DatabaseManager:
                        midnight_workers, total_workers, progress
                 FROM public.daily_data 
                 WHERE project_name = %s 
-                  AND work_date >= CURRENT_DATE - INTERVAL '30 days'
+                  AND work_date >= CURRENT_DATE - %s
                 ORDER BY work_date DESC, work_type
-            """, (project_name,), fetch='all')
+            """, (project_name, DAILY_DATA_WINDOW_DAYS), fetch='all')
             
             daily_data = {}
             for row in rows or []:
@@ -227,25 +574,151 @@ class DatabaseManager:
                     'progress': float(row['progress']) if row['progress'] else 0.0
                 }
             return daily_data
-            
+
         except Exception as e:
-            print(f"❌ 일일 데이터 조회 실패 ({project_name}): {e}")
+            log.error("일일 데이터 조회 실패 (%s): %s", project_name, e)
+            if self._raise_read_errors():
+                raise
             return {}
-    
+
+    def get_daily_data_until(self, end_date, project_name=None, start_date=None):
+        """end_date까지의 전체 일일 데이터를 한 번에 조회 {프로젝트명: {날짜: {공종: {...}}}}.
+        start_date를 주면 그 날짜부터."""
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            return snapshot.get_daily_data_until(end_date, project_name, start_date)
+        try:
+            query = """
+                SELECT project_name, work_date, work_type, day_workers, night_workers,
+                       midnight_workers, total_workers, progress
+                FROM public.daily_data
+                WHERE work_date <= %s
+            """
+            params = [end_date]
+            if start_date is not None:
+                query += " AND work_date >= %s"
+                params.append(start_date)
+            if project_name is not None:
+                query += " AND project_name = %s"
+                params.append(project_name)
+            query += " ORDER BY project_name, work_date"
+            rows = self.execute_query(query, params, fetch='all')
+
+            result = {}
+            for row in rows or []:
+                daily_data = result.setdefault(row['project_name'], {})
+                daily_data.setdefault(str(row['work_date']), {})[row['work_type']] = {
+                    'day': row['day_workers'],
+                    'night': row['night_workers'],
+                    'midnight': row['midnight_workers'],
+                    'total': row['total_workers'],
+                    'progress': float(row['progress']) if row['progress'] else 0.0
+                }
+            return result
+
+        except Exception as e:
+            log.error("일일 데이터 이력 조회 실패: %s", e)
+            if self._raise_read_errors():
+                raise
+            return {}
+
+    def get_daily_rows(self, project_name, start_date=None, end_date=None, after=None, limit=100):
+        """프로젝트 일일 데이터 행 목록 (날짜, 공종 순). after=(날짜, 공종) 이후부터 limit건 (키셋 페이지)"""
+        try:
+            query = """
+                SELECT work_date, work_type, day_workers, night_workers,
+                       midnight_workers, total_workers, progress
+                FROM public.daily_data
+                WHERE project_name = %s
+            """
+            params = [project_name]
+            if start_date:
+                query += " AND work_date >= %s"
+                params.append(start_date)
+            if end_date:
+                query += " AND work_date <= %s"
+                params.append(end_date)
+            if after:
+                query += " AND (work_date, work_type) > (%s, %s)"
+                params.extend(after)
+            query += " ORDER BY work_date, work_type LIMIT %s"
+            params.append(limit)
+            rows = self.execute_query(query, params, fetch='all')
+
+            return [{
+                'date': str(row['work_date']),
+                'work_type': row['work_type'],
+                'day': row['day_workers'],
+                'night': row['night_workers'],
+                'midnight': row['midnight_workers'],
+                'total': row['total_workers'],
+                'progress': float(row['progress']) if row['progress'] else 0.0
+            } for row in rows or []]
+
+        except Exception as e:
+            log.error("일일 데이터 행 조회 실패 (%s): %s", project_name, e)
+            return []
+
+    def get_work_type_totals(self, project_name=None):
+        """(프로젝트, 공종)별 전체 기간 투입인원 합계와 일자별 적용 단가 기준 투입노무비.
+
+        단가 이력을 적용 구간(effective_date ~ 다음 적용일, 첫 구간은 시작 제한 없음)으로 범위 조인해 DB에서 집계한다.
+        단가 이력이 없는 공종은 labor_cost가 None. project_name을 주면 그 프로젝트만 집계.
+        """
+        snapshot = self._read_snapshot()
+        if snapshot is not None and project_name is None:
+            return snapshot.get_work_type_totals()
+        try:
+            rows = self.execute_query("""
+                WITH rates AS (
+                    -- 첫 구간은 왼쪽으로 열린 구간 (첫 적용일 이전 출역도 첫 단가, LaborRateTable.rate_on과 같음)
+                    SELECT work_type, day_cost,
+                           CASE WHEN ROW_NUMBER() OVER w = 1 THEN '-infinity'::date
+                                ELSE effective_date END AS effective_date,
+                           LEAD(effective_date) OVER w AS next_date
+                    FROM public.labor_cost_history
+                    WINDOW w AS (PARTITION BY work_type ORDER BY effective_date)
+                )
+                SELECT d.project_name, d.work_type,
+                       SUM(d.total_workers) AS total_workers,
+                       SUM(d.total_workers * r.day_cost) AS labor_cost
+                FROM public.daily_data d
+                LEFT JOIN rates r
+                  ON r.work_type = d.work_type
+                 AND d.work_date >= r.effective_date
+                 AND (r.next_date IS NULL OR d.work_date < r.next_date)
+                WHERE %s IS NULL OR d.project_name = %s
+                GROUP BY d.project_name, d.work_type
+            """, (project_name, project_name), fetch='all')
+
+            totals = {}
+            for row in rows or []:
+                totals[(row['project_name'], row['work_type'])] = {
+                    'total_workers': int(row['total_workers'] or 0),
+                    'labor_cost': int(row['labor_cost']) if row['labor_cost'] is not None else None
+                }
+            return totals
+
+        except Exception as e:
+            log.error("공종별 합계 조회 실패: %s", e)
+            if self._raise_read_errors():
+                raise
+            return {}
+
     def create_project(self, project_name, work_types, contracts=None, 
                       companies=None, status='active'):
         """프로젝트 생성"""
         try:
-            self.execute_query("""
+            self._write([("""
                 INSERT INTO public.projects (project_name, work_types, contracts, companies, status)
                 VALUES (%s, %s, %s, %s, %s)
             """, (project_name, work_types, 
                   json.dumps(contracts or {}), 
                   json.dumps(companies or {}), 
-                  status))
-            print(f"✅ 프로젝트 생성 성공: {project_name}")
+                  status))], 'projects', 'create', project_name=project_name)
+            log.debug("프로젝트 생성 성공: %s", project_name)
         except Exception as e:
-            print(f"❌ 프로젝트 생성 실패: {e}")
+            log.error("프로젝트 생성 실패: %s", e)
             raise
     
     def update_project(self, project_name, **kwargs):
@@ -265,23 +738,24 @@ class DatabaseManager:
             if updates:
                 query = f"UPDATE public.projects SET {', '.join(updates)} WHERE project_name = %s"
                 values.append(project_name)
-                self.execute_query(query, values)
-                print(f"✅ 프로젝트 업데이트 성공: {project_name}")
+                self._write([(query, values)], 'projects', 'update', project_name=project_name, fields=sorted(kwargs))
+                log.debug("프로젝트 업데이트 성공: %s", project_name)
                 
         except Exception as e:
-            print(f"❌ 프로젝트 업데이트 실패: {e}")
+            log.error("프로젝트 업데이트 실패: %s", e)
             raise
     
     def delete_project(self, project_name):
         """프로젝트 및 관련 일일 데이터 삭제"""
         try:
-            # 일일 데이터 먼저 삭제
-            self.execute_query("DELETE FROM public.daily_data WHERE project_name = %s", (project_name,))
-            # 프로젝트 삭제
-            self.execute_query("DELETE FROM public.projects WHERE project_name = %s", (project_name,))
-            print(f"✅ 프로젝트 삭제 성공: {project_name}")
+            # 일일 데이터 먼저 삭제 후 프로젝트 삭제
+            self._write([
+                ("DELETE FROM public.daily_data WHERE project_name = %s", (project_name,)),
+                ("DELETE FROM public.projects WHERE project_name = %s", (project_name,)),
+            ], 'projects', 'delete', project_name=project_name)
+            log.debug("프로젝트 삭제 성공: %s", project_name)
         except Exception as e:
-            print(f"❌ 프로젝트 삭제 실패: {e}")
+            log.error("프로젝트 삭제 실패: %s", e)
             raise
     
     # ===== 일일 데이터 관리 =====
@@ -291,7 +765,7 @@ class DatabaseManager:
         try:
             total_workers = day_workers + night_workers + midnight_workers
             
-            self.execute_query("""
+            self._write([("""
                 INSERT INTO public.daily_data 
                 (project_name, work_date, work_type, day_workers, night_workers, 
                  midnight_workers, total_workers, progress, updated_at)
@@ -305,17 +779,165 @@ class DatabaseManager:
                     progress = EXCLUDED.progress,
                     updated_at = NOW()
             """, (project_name, work_date, work_type, day_workers, 
-                  night_workers, midnight_workers, total_workers, progress))
-            
-            print(f"✅ 일일 데이터 저장 성공: {project_name} - {work_type} - {work_date}")
+                  night_workers, midnight_workers, total_workers, progress))],
+                'daily_data', 'upsert', project_name=project_name, work_date=str(work_date),
+                work_type=work_type, day=day_workers, night=night_workers,
+                midnight=midnight_workers, total=total_workers, progress=progress)
+            log.debug("일일 데이터 저장 성공: %s - %s - %s", project_name, work_type, work_date)
             
         except Exception as e:
-            print(f"❌ 일일 데이터 저장 실패: {e}")
+            log.error("일일 데이터 저장 실패: %s", e)
             raise
     
+    @server_timing.timed('db.save_daily_data_batch')
+    def save_daily_data_batch(self, submissions, username=None):
+        """여러 제출분의 일일 출역을 한 트랜잭션에서 일괄 upsert.
+
+        submissions: [{'submission_id', 'project_name', 'work_date', 'entries': [{'work_type', 'day',
+        'night', 'midnight', 'progress'}]}]. 이미 기록된 submission_id는 건너뛰며, 건너뛴 ID 집합을 반환.
+        """
+        if not submissions:
+            return set()
+        try:
+            def run(cur):
+                # 제출 ID 선점: 새로 들어간 ID만 반영 (동시 재전송은 PK 잠금으로 한쪽만 성공)
+                inserted = execute_values(cur, """
+                    INSERT INTO public.attendance_submissions
+                        (submission_id, username, project_name, work_date, entry_count)
+                    VALUES %s
+                    ON CONFLICT (submission_id) DO NOTHING
+                    RETURNING submission_id
+                """, [(s['submission_id'], username, s['project_name'], s['work_date'], len(s['entries']))
+                      for s in submissions], fetch=True)
+                applied = {row['submission_id'] for row in inserted}
+
+                # 같은 (프로젝트, 날짜, 공종)이 여러 번 오면 나중 값 사용
+                rows = {}
+                for s in submissions:
+                    if s['submission_id'] not in applied:
+                        continue
+                    for e in s['entries']:
+                        total = e['day'] + e['night'] + e['midnight']
+                        rows[(s['project_name'], s['work_date'], e['work_type'])] = (
+                            e['day'], e['night'], e['midnight'], total, e['progress'])
+                if rows:
+                    execute_values(cur, """
+                        INSERT INTO public.daily_data
+                        (project_name, work_date, work_type, day_workers, night_workers,
+                         midnight_workers, total_workers, progress, updated_at)
+                        VALUES %s
+                        ON CONFLICT (project_name, work_date, work_type)
+                        DO UPDATE SET
+                            day_workers = EXCLUDED.day_workers,
+                            night_workers = EXCLUDED.night_workers,
+                            midnight_workers = EXCLUDED.midnight_workers,
+                            total_workers = EXCLUDED.total_workers,
+                            progress = EXCLUDED.progress,
+                            updated_at = NOW()
+                    """, [key + values for key, values in rows.items()],
+                        template='(%s, %s, %s, %s, %s, %s, %s, %s, NOW())')
+                # 변경 로그도 같은 트랜잭션에서 한 번에 기록
+                changes = [
+                    ('daily_data', 'upsert', {
+                        'project_name': project_name, 'work_date': str(work_date), 'work_type': work_type,
+                        'day': day, 'night': night, 'midnight': midnight, 'total': total, 'progress': progress,
+                    })
+                    for (project_name, work_date, work_type), (day, night, midnight, total, progress)
+                    in rows.items()
+                ]
+                return changes, (changes, applied, len(rows))
+
+            # 제출 ID로 중복이 걸러지므로 연결이 끊겨 다시 실행해도 같은 결과 (재시도 안전)
+            changes, applied, row_count = self._transaction(run, 'INSERT')
+
+            # 콜백(NOTIFY, 데이터 버전 증가, 스냅샷 깨우기)은 행마다가 아니라 프로젝트마다 한 번
+            by_project = {}
+            for table, action, data in changes:
+                by_project.setdefault(data['project_name'], []).append(data)
+            for project_name, project_rows in by_project.items():
+                self._call_listeners('daily_data', 'upsert_batch', {'project_name': project_name, 'rows': project_rows})
+            log.debug("일일 데이터 일괄 저장: 제출 %s건, %s행 (중복 %s건)",
+                      len(applied), row_count, len(submissions) - len(applied))
+            return {s['submission_id'] for s in submissions} - applied
+
+        except Exception as e:
+            log.error("일일 데이터 일괄 저장 실패: %s", e)
+            raise
+
+    # ===== 변경 로그 =====
+    @server_timing.timed('db.get_changes')
+    def get_changes(self, since, limit=500, project_names=None, include_users=True):
+        """since 이후 변경 (번호 순). project_names를 주면 그 프로젝트 항목만 (노무단가는 공통).
+
+        반환: (항목 목록, 현재 마지막 번호, 보관 기간 경과로 삭제된 마지막 번호)
+        """
+        try:
+            head = self.execute_query(
+                "SELECT seq, purged_through FROM public.change_log_seq WHERE id = 1", fetch='one')
+            if limit <= 0:
+                return [], head['seq'], head['purged_through']
+            query = """
+                SELECT seq, table_name, action, entity_key, data, created_at
+                FROM public.change_log
+                WHERE seq > %s AND seq <= %s
+            """
+            params = [since, head['seq']]
+            if not include_users:
+                query += " AND table_name <> 'users'"
+            if project_names is not None:
+                query += " AND (table_name = 'labor_costs' OR data->>'project_name' = ANY(%s))"
+                params.append(list(project_names))
+            query += " ORDER BY seq LIMIT %s"
+            params.append(limit)
+            rows = self.execute_query(query, params, fetch='all')
+            return [dict(row) for row in rows or []], head['seq'], head['purged_through']
+        except Exception as e:
+            log.error("변경 로그 조회 실패: %s", e)
+            raise
+
+    def compact_change_log(self, retention_days=30, compact_after_hours=24):
+        """오래된 변경 로그 정리: 같은 엔터티의 최신 항목만 남기고, 보관 기간이 지난 항목은 삭제"""
+        try:
+            self.execute_query("""
+                DELETE FROM public.change_log c
+                WHERE c.created_at < NOW() - make_interval(hours => %s)
+                  AND EXISTS (
+                      SELECT 1 FROM public.change_log n
+                      WHERE n.table_name = c.table_name AND n.entity_key = c.entity_key AND n.seq > c.seq
+                  )
+            """, (compact_after_hours,))
+            # 보관 기간 경과 삭제 번호를 기록해 그 이전 커서는 전체 재동기화하도록 안내
+            self.execute_query("""
+                WITH purged AS (
+                    DELETE FROM public.change_log
+                    WHERE created_at < NOW() - make_interval(days => %s)
+                    RETURNING seq
+                )
+                UPDATE public.change_log_seq
+                SET purged_through = GREATEST(purged_through, COALESCE((SELECT MAX(seq) FROM purged), 0))
+                WHERE id = 1
+            """, (retention_days,))
+        except Exception as e:
+            log.error("변경 로그 정리 실패: %s", e)
+
+    def start_compaction(self):
+        """워커에서 변경 로그 정리 스레드 시작 (요청 경로 밖에서 compact_interval마다 실행, 포크 후 호출)"""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        self._compactor = threading.Thread(target=self._compact_loop, name='change-log-compactor', daemon=True)
+        self._compactor.start()
+
+    def _compact_loop(self):
+        while True:
+            time.sleep(CHANGE_FEED_POLICY['compact_interval'])
+            self.compact_change_log(CHANGE_FEED_POLICY['retention_days'], CHANGE_FEED_POLICY['compact_after_hours'])
+
     # ===== 노무단가 관리 =====
     def get_labor_costs(self):
         """모든 노무단가 조회"""
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            return snapshot.get_labor_costs()
         try:
             rows = self.execute_query("""
                 SELECT work_type, day_cost, night_cost, midnight_cost, locked
@@ -333,34 +955,113 @@ class DatabaseManager:
             return labor_costs
             
         except Exception as e:
-            print(f"❌ 노무단가 조회 실패: {e}")
+            log.error("노무단가 조회 실패: %s", e)
+            if self._raise_read_errors():
+                raise
             return {}
     
-    def save_labor_cost(self, work_type, day_cost, night_cost, midnight_cost, locked=False):
-        """노무단가 저장/업데이트"""
+    def save_labor_cost(self, work_type, day_cost, night_cost, midnight_cost, locked=False,
+                        effective_date=None):
+        """노무단가 저장/업데이트 (effective_date부터 적용되는 단가 이력도 함께 기록, 기본 오늘).
+
+        labor_costs(현재 단가)는 오늘 기준으로 적용 중인 구간의 단가로 맞춘다
+        (미래 적용일이나 과거 구간 수정은 현재 단가를 바꾸지 않음). 한 트랜잭션에서 실행.
+        """
         try:
-            self.execute_query("""
-                INSERT INTO public.labor_costs (work_type, day_cost, night_cost, midnight_cost, locked)
-                VALUES (%s, %s, %s, %s, %s)
-                ON CONFLICT (work_type)
-                DO UPDATE SET
-                    day_cost = EXCLUDED.day_cost,
-                    night_cost = EXCLUDED.night_cost,
-                    midnight_cost = EXCLUDED.midnight_cost,
-                    locked = EXCLUDED.locked
-            """, (work_type, day_cost, night_cost, midnight_cost, locked))
-            print(f"✅ 노무단가 저장 성공: {work_type}")
+            # 적용일 기본값과 현재 단가 구간 판단에 같은 날짜 사용 (DB CURRENT_DATE와 섞지 않음)
+            today = date.today()
+            effective_date = effective_date or today
+            change = {'work_type': work_type, 'day': day_cost, 'night': night_cost, 'midnight': midnight_cost,
+                      'locked': locked, 'effective_date': str(effective_date)}
+            statements = [
+                ("""
+                    INSERT INTO public.labor_cost_history
+                        (work_type, effective_date, day_cost, night_cost, midnight_cost)
+                    VALUES (%s, %s, %s, %s, %s)
+                    ON CONFLICT (work_type, effective_date)
+                    DO UPDATE SET
+                        day_cost = EXCLUDED.day_cost,
+                        night_cost = EXCLUDED.night_cost,
+                        midnight_cost = EXCLUDED.midnight_cost
+                """, (work_type, effective_date, day_cost, night_cost, midnight_cost)),
+                # 직전 적용 단가와 같으면 불필요한 구간이므로 제거
+                ("""
+                    DELETE FROM public.labor_cost_history h
+                    WHERE h.work_type = %s AND h.effective_date = %s
+                      AND EXISTS (
+                          SELECT 1 FROM (
+                              SELECT day_cost, night_cost, midnight_cost
+                              FROM public.labor_cost_history
+                              WHERE work_type = %s AND effective_date < %s
+                              ORDER BY effective_date DESC LIMIT 1
+                          ) prev
+                          WHERE prev.day_cost = h.day_cost
+                            AND prev.night_cost = h.night_cost
+                            AND prev.midnight_cost = h.midnight_cost
+                      )
+                """, (work_type, effective_date, work_type, effective_date)),
+                # 현재 단가: 오늘 이전 마지막 구간 (모두 미래면 첫 구간, LaborRateTable.rate_on과 같음)
+                ("""
+                    INSERT INTO public.labor_costs (work_type, day_cost, night_cost, midnight_cost, locked)
+                    SELECT work_type, day_cost, night_cost, midnight_cost, %s
+                    FROM public.labor_cost_history
+                    WHERE work_type = %s
+                    ORDER BY effective_date <= %s DESC,
+                             CASE WHEN effective_date <= %s THEN effective_date END DESC,
+                             effective_date
+                    LIMIT 1
+                    ON CONFLICT (work_type)
+                    DO UPDATE SET
+                        day_cost = EXCLUDED.day_cost,
+                        night_cost = EXCLUDED.night_cost,
+                        midnight_cost = EXCLUDED.midnight_cost,
+                        locked = EXCLUDED.locked
+                """, (locked, work_type, today, today)),
+            ]
+            self._write(statements, 'labor_costs', 'upsert', **change)
+            log.debug("노무단가 저장 성공: %s", work_type)
         except Exception as e:
-            print(f"❌ 노무단가 저장 실패: {e}")
+            log.error("노무단가 저장 실패: %s", e)
             raise
+
+    def get_labor_cost_history(self):
+        """공종별 노무단가 이력 조회 {공종: [{'effective_date', 'day', 'night', 'midnight'}, ...]} (적용일 오름차순)"""
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            return snapshot.get_labor_cost_history()
+        try:
+            rows = self.execute_query("""
+                SELECT work_type, effective_date, day_cost, night_cost, midnight_cost
+                FROM public.labor_cost_history
+                ORDER BY work_type, effective_date
+            """, fetch='all')
+
+            history = {}
+            for row in rows or []:
+                history.setdefault(row['work_type'], []).append({
+                    'effective_date': str(row['effective_date']),
+                    'day': row['day_cost'],
+                    'night': row['night_cost'],
+                    'midnight': row['midnight_cost']
+                })
+            return history
+
+        except Exception as e:
+            log.error("노무단가 이력 조회 실패: %s", e)
+            if self._raise_read_errors():
+                raise
+            return {}
     
     def delete_labor_cost(self, work_type):
         """노무단가 삭제"""
         try:
-            self.execute_query("DELETE FROM public.labor_costs WHERE work_type = %s", (work_type,))
-            print(f"✅ 노무단가 삭제 성공: {work_type}")
+            self._write([
+                ("DELETE FROM public.labor_cost_history WHERE work_type = %s", (work_type,)),
+                ("DELETE FROM public.labor_costs WHERE work_type = %s", (work_type,)),
+            ], 'labor_costs', 'delete', work_type=work_type)
+            log.debug("노무단가 삭제 성공: %s", work_type)
         except Exception as e:
-            print(f"❌ 노무단가 삭제 실패: {e}")
+            log.error("노무단가 삭제 실패: %s", e)
             raise
     
     def close(self):
@@ -368,6 +1069,6 @@ class DatabaseManager:
         try:
             if self.conn and not self.conn.closed:
                 self.conn.close()
-                print("✅ 데이터베이스 연결 종료")
+                log.debug("데이터베이스 연결 종료")
         except Exception as e:
-            print(f"연결 종료 중 오류: {e}")
\ No newline at end of file
+            log.warning("연결 종료 중 오류: %s", e)
\ No newline at end of file
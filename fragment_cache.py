@@ -0,0 +1,102 @@
+# fragment_cache.py - 관리자 대시보드 프로젝트 행 조각 캐시
+import time
+import threading
+from collections import OrderedDict
+from utils import FRAGMENT_POLICY
+from metrics import count_cache
+from server_timing import timer
+
+PROJECT_ROW_TEMPLATE = '_dashboard_project_row.html'
+
+class FragmentCache:
+    """렌더링된 HTML 조각 LRU 캐시 (워커 프로세스별)"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_render(self, key, render):
+        with self._lock:
+            html = self._items.get(key)
+            if html is not None:
+                self._items.move_to_end(key)
+                self.hits += 1
+                count_cache('fragments', True)
+                return html
+            self.misses += 1
+        count_cache('fragments', False)
+        html = render()
+        with self._lock:
+            self._items[key] = html
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return html
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self):
+        return len(self._items)
+
+fragments = FragmentCache(FRAGMENT_POLICY.get('max_entries', 2000))
+
+# 페이지 렌더링 시간 통계 (캐시 사용/미사용 구분)
+_render_stats = {'cached': [0, 0.0, 0.0], 'uncached': [0, 0.0, 0.0]}  # [횟수, 합계, 최대] (초)
+_render_lock = threading.Lock()
+
+def render_project_rows(keyed_rows):
+    """프로젝트 행 HTML 목록. 키(프로젝트, 변경 버전, 위험도 설정, 날짜)가 그대로인 행은 캐시된 조각을 쓴다."""
+    from flask import current_app
+    from markupsafe import Markup
+
+    template = current_app.jinja_env.get_template(PROJECT_ROW_TEMPLATE)
+    rows = []
+    for key, row in keyed_rows:
+        if FRAGMENT_POLICY.get('enabled', True):
+            html = fragments.get_or_render(key, lambda: template.render(project=row))
+        else:
+            html = template.render(project=row)
+        rows.append(Markup(html))
+    return rows
+
+def render_dashboard(template_name, keyed_rows, **context):
+    """조각을 이어 붙여 대시보드 페이지 렌더링 (렌더링 시간 기록). keyed_rows: calculate_dashboard_rows() 결과"""
+    from flask import render_template
+
+    mode = 'cached' if FRAGMENT_POLICY.get('enabled', True) else 'uncached'
+    started = time.perf_counter()
+    with timer('render.rows'):
+        project_rows = render_project_rows(keyed_rows)
+    dashboard_data = [row for _, row in keyed_rows]
+    html = render_template(template_name, dashboard_data=dashboard_data, project_rows=project_rows, **context)
+    elapsed = time.perf_counter() - started
+    with _render_lock:
+        stat = _render_stats[mode]
+        stat[0] += 1
+        stat[1] += elapsed
+        stat[2] = max(stat[2], elapsed)
+    return html
+
+def get_fragment_stats():
+    with _render_lock:
+        timing = {
+            mode: {
+                'renders': count,
+                'avg_ms': round(total / count * 1000, 2) if count else 0.0,
+                'max_ms': round(peak * 1000, 2),
+            }
+            for mode, (count, total, peak) in _render_stats.items()
+        }
+    lookups = fragments.hits + fragments.misses
+    return {
+        'enabled': FRAGMENT_POLICY.get('enabled', True),
+        'entries': len(fragments),
+        'hits': fragments.hits,
+        'misses': fragments.misses,
+        'hit_ratio': round(fragments.hits / lookups, 3) if lookups else 0.0,
+        'render_time': timing,
+    }
@@ -1,8 +1,68 @@
+import os
+import importlib.util
+
+# gevent + preload: 앱이 마스터에서 먼저 import되므로, gevent 워커가 포크 후에 패치하면
+# 모듈 수준 threading.local()(요청 ID, Server-Timing, 프로파일러)이 OS 스레드 단위로 남아
+# 그린렛(요청) 사이에 섞인다. 앱을 로드하기 전인 설정 파일 단계에서 마스터를 먼저 패치한다.
+# 지원 조합: gevent(preload 없음, 기본) / gevent + preload(아래 패치) / gthread(+ preload)
+if worker_class == "gevent" and preload_app:
+    from gevent import monkey
+    monkey.patch_all()
+
 import multiprocessing
 
-bind = "0.0.0.0:{}".format(__import__("os").environ.get("PORT", "8000"))
+bind = "0.0.0.0:{}".format(os.environ.get("PORT", "8000"))
 workers = 2
 threads = 4
 timeout = 120
 graceful_timeout = 30
 keepalive = 5
+
+
+# 워커 재시작 기준: 요청 수 (0이면 사용 안 함) / 상주 메모리(MB, 0이면 사용 안 함)
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0") or 0)
+max_requests_jitter = max_requests // 10
+MAX_WORKER_RSS_MB = int(os.environ.get("MAX_WORKER_RSS_MB", "0") or 0)
+RSS_CHECK_EVERY = 50  # 요청 수, 메모리 확인 간격
+
+def on_starting(server):
+    # 이전 실행의 워커 지표 파일 정리 (/metrics 카운터는 서버 시작부터 다시 셈)
+    from metrics import registry
+    registry.clear()
+
+def pre_fork(server, worker):
+    # preload 모드에서만 마스터에 앱이 로드되어 있음 (아니면 등록된 훅 없음)
+    import lifecycle
+    lifecycle.prepare_fork()
+
+def post_fork(server, worker):
+    if worker_class == "gevent":
+        # psycopg2 블로킹 호출이 다른 그린렛을 막지 않도록 대기 콜백 설치
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            server.log.warning("psycogreen 미설치: DB 호출이 gevent 루프를 블로킹합니다.")
+
+def post_worker_init(worker):
+    # 앱 로드 후, 요청을 받기 전에 연결/스레드 재초기화 (워밍업은 백그라운드, /readyz로 트래픽 차단)
+    import lifecycle
+    lifecycle.init_worker(server="gunicorn", worker_class=worker_class, preload=str(preload_app).lower())
+    worker._rss_requests = 0
+
+def post_request(worker, req, environ, resp):
+    if not MAX_WORKER_RSS_MB:
+        return
+    worker._rss_requests = getattr(worker, "_rss_requests", 0) + 1
+    if worker._rss_requests % RSS_CHECK_EVERY:
+        return
+    import lifecycle
+    rss_mb = lifecycle.rss_bytes() / (1024 * 1024)
+    if rss_mb > MAX_WORKER_RSS_MB and worker.alive:
+        # 처리 중인 요청을 마친 뒤 종료 → 마스터가 새 워커를 띄움
+        worker.log.info("워커 %s 메모리 %.0fMB > %dMB: 재시작", worker.pid, rss_mb, MAX_WORKER_RSS_MB)
+        worker.alive = False
+
+def worker_exit(server, worker):
+    import lifecycle
+    lifecycle.shutdown_worker()
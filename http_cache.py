@@ -0,0 +1,141 @@
+# http_cache.py - 데이터 버전 기반 ETag / 조건부 GET
+import os
+import json
+import uuid
+import hashlib
+import tempfile
+import threading
+from datetime import datetime, date, time, timezone
+from functools import wraps
+from utils import HEALTH_POLICY, ETAG_POLICY, get_data_manager
+from metrics import count_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+class DataVersion:
+    """워커 프로세스 간 공유되는 데이터 버전 카운터 (로컬 파일).
+
+    파일 내용은 '<토큰>:<카운터>'이며, 파일이 새로 만들어질 때마다 토큰이 바뀌므로
+    재시작 후 카운터가 0부터 다시 시작해도 이전 ETag와 겹치지 않는다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _locked(self, f, exclusive):
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+    def _read(self, f):
+        token, _, counter = f.read().strip().partition(':')
+        try:
+            return token, int(counter)
+        except ValueError:
+            return '', 0
+
+    def bump(self):
+        """데이터 변경 시 호출: 카운터 1 증가"""
+        with open(self.path, 'a+') as f:
+            self._locked(f, True)
+            f.seek(0)
+            token, counter = self._read(f)
+            f.seek(0)
+            f.truncate()
+            f.write(f"{token or uuid.uuid4().hex[:12]}:{counter + 1}")
+
+    def current(self):
+        """(버전 문자열, 마지막 변경 시각 UTC)"""
+        try:
+            with open(self.path, 'r') as f:
+                self._locked(f, False)
+                token, counter = self._read(f)
+                mtime = os.fstat(f.fileno()).st_mtime
+        except FileNotFoundError:
+            token, counter = '', 0
+        if not token:
+            self.bump()
+            return self.current()
+        return f"{token}:{counter}", datetime.fromtimestamp(int(mtime), tz=timezone.utc)
+
+def _default_version_path():
+    url_hash = hashlib.sha1((os.environ.get('DATABASE_URL') or '').encode()).hexdigest()[:10]
+    return os.environ.get('DATA_VERSION_FILE') or os.path.join(tempfile.gettempdir(), f'laborapp-data-version-{url_hash}')
+
+data_version = DataVersion(_default_version_path())
+
+# 엔드포인트별 조건부 GET 통계 (워커 프로세스별)
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _count(endpoint, field):
+    with _stats_lock:
+        row = _stats.setdefault(endpoint, {'requests': 0, 'not_modified': 0})
+        row[field] += 1
+
+def get_etag_stats():
+    """{엔드포인트: {'requests', 'not_modified', 'hit_ratio'}}"""
+    with _stats_lock:
+        return {
+            endpoint: dict(row, hit_ratio=round(row['not_modified'] / row['requests'], 3) if row['requests'] else 0.0)
+            for endpoint, row in _stats.items()
+        }
+
+def policy_fingerprint():
+    """위험도 설정이 바뀌면 화면 결과도 바뀌므로 ETag에 포함"""
+    return hashlib.sha1(json.dumps(HEALTH_POLICY, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+def snapshot_seq():
+    """읽기 스냅샷으로 응답하면 스냅샷이 반영한 변경 로그 번호 (DB 조회면 빈 문자열).
+
+    다른 워커의 쓰기로 버전 파일이 먼저 올라가도 이 워커의 스냅샷은 아직 이전 데이터일 수 있으므로,
+    반영 번호를 ETag에 넣어 이전 데이터가 새 버전의 ETag로 캐시되지 않게 한다.
+    """
+    dm = get_data_manager()
+    snapshot = dm.snapshot.current() if dm is not None and dm.snapshot is not None else None
+    return str(snapshot.seq) if snapshot is not None else ''
+
+def on_data_write(table, action, data):
+    """DatabaseManager 쓰기 알림 콜백"""
+    data_version.bump()
+
+def conditional_get(view):
+    """데이터 버전으로 ETag/Last-Modified를 붙이고, 변경이 없으면 DB 조회 전에 304 응답"""
+    from flask import request, session, make_response
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ETAG_POLICY.get('enabled', True) or request.method != 'GET':
+            return view(*args, **kwargs)
+
+        version, last_modified = data_version.current()
+        # 최근 30일 범위, 기본 날짜(오늘) 등 날짜에 따라 결과가 바뀌므로 날짜가 바뀌면 새 ETag / 수정 시각
+        today = date.today()
+        last_modified = max(last_modified, datetime.combine(today, time.min).astimezone(timezone.utc))
+        key = '|'.join([request.endpoint or '', request.query_string.decode('latin-1'),
+                        session.get('username', ''), version, snapshot_seq(), policy_fingerprint(),
+                        today.isoformat()])
+        etag = hashlib.sha1(key.encode('utf-8')).hexdigest()[:20]
+        _count(request.endpoint, 'requests')
+
+        if request.if_none_match:
+            # 압축 응답은 약한 ETag(W/)로 나가므로 약한 비교 사용
+            not_modified = request.if_none_match.contains_weak(etag)
+        else:
+            since = request.if_modified_since
+            not_modified = since is not None and last_modified <= since
+        count_cache('etag', not_modified)
+        if not_modified:
+            _count(request.endpoint, 'not_modified')
+            response = make_response('', 304)
+        else:
+            response = make_response(view(*args, **kwargs))
+            if response.status_code != 200:
+                return response
+        response.set_etag(etag)
+        response.last_modified = last_modified
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return wrapper
@@ -0,0 +1,195 @@
+# jobs.py - 무거운 리포트용 백그라운드 작업 실행기 (외부 브로커 없음)
+import os
+import json
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from utils import JOB_POLICY
+from app_logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+log = get_logger('jobs')
+
+# 작업 상태: queued → running → done | failed
+ACTIVE_STATUSES = ('queued', 'running')
+
+def _write_job(job_dir, job):
+    tmp = os.path.join(job_dir, f"{job['id']}.json.{os.getpid()}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(job, f, ensure_ascii=False)
+    os.replace(tmp, os.path.join(job_dir, f"{job['id']}.json"))
+
+def _run_job(job_dir, job, handler):
+    """작업 프로세스에서 실행: 상태/결과를 작업 디렉터리 파일로 기록"""
+    job.update(status='running', started_at=time.time(), pid=os.getpid())
+    _write_job(job_dir, job)
+    try:
+        data, mimetype, filename = handler(job['params'])
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        tmp = os.path.join(job_dir, f"{job['id']}.bin.{os.getpid()}.tmp")
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, os.path.join(job_dir, f"{job['id']}.bin"))
+        job.update(status='done', mimetype=mimetype, filename=filename, size=len(data))
+    except Exception as e:
+        log.error("작업 실패 (%s %s): %s", job['kind'], job['id'], e)
+        job.update(status='failed', error=str(e))
+    job['finished_at'] = time.time()
+    _write_job(job_dir, job)
+
+class JobRunner:
+    """별도 프로세스 풀에서 작업을 실행하고, 상태/결과는 로컬 디렉터리에 저장.
+
+    gevent 워커에서는 스레드도 그린렛이라 CPU를 오래 쓰는 리포트가 워커 전체를 막으므로
+    작업은 프로세스 풀(calculations와 같은 forkserver/spawn 방식)에서 실행한다.
+    핸들러와 파라미터는 자식 프로세스로 pickle되어 전달되고 결과는 파일로 돌려받는다.
+    상태 파일을 디렉터리에 두므로 다른 gunicorn 워커가 받은 작업도 조회/다운로드할 수 있다.
+    같은 종류·파라미터의 작업이 진행 중이면 새로 만들지 않고 그 작업을 돌려준다.
+    """
+
+    def __init__(self, job_dir, max_workers=2, retention=600):
+        self.job_dir = job_dir
+        self.max_workers = max_workers
+        self.retention = retention
+        self._handlers = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def register(self, kind, handler):
+        """handler(params) -> (결과 bytes, mimetype, 파일명)
+
+        자식 프로세스에서 실행되므로 handler는 모듈 최상위 함수여야 하고(람다/클로저 불가)
+        필요한 데이터는 params와 자식 프로세스 안에서 직접 조회한다.
+        """
+        self._handlers[kind] = handler
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                from calculations import _pool_context
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_pool_context())
+            return self._executor
+
+    def shutdown(self):
+        """워커 종료/포크 전 프로세스 풀 정리"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _path(self, job_id, ext='json'):
+        return os.path.join(self.job_dir, f'{job_id}.{ext}')
+
+    def _write(self, job):
+        _write_job(self.job_dir, job)
+
+    def get(self, job_id):
+        """작업 상태 조회 (없거나 만료되면 None)"""
+        if not job_id or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self._path(job_id), 'r', encoding='utf-8') as f:
+                job = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return self._check_alive(job)
+
+    def _check_alive(self, job):
+        """진행 중으로 남아 있지만 실행하던 프로세스가 사라진 작업은 실패 처리"""
+        if job['status'] in ACTIVE_STATUSES:
+            try:
+                os.kill(job['pid'], 0)
+            except ProcessLookupError:
+                job.update(status='failed', error='작업 프로세스가 종료되었습니다.', finished_at=time.time())
+                self._write(job)
+            except PermissionError:
+                pass
+        return job
+
+    def list(self):
+        jobs = []
+        for name in os.listdir(self.job_dir):
+            if name.endswith('.json'):
+                job = self.get(name[:-5])
+                if job:
+                    jobs.append(job)
+        jobs.sort(key=lambda j: j['submitted_at'], reverse=True)
+        return jobs
+
+    def result(self, job_id):
+        """(bytes, mimetype, 파일명) 또는 None"""
+        job = self.get(job_id)
+        if not job or job['status'] != 'done':
+            return None
+        try:
+            with open(self._path(job_id, 'bin'), 'rb') as f:
+                return f.read(), job['mimetype'], job['filename']
+        except FileNotFoundError:
+            return None
+
+    def cleanup(self):
+        """보관 기간이 지난 완료/실패 작업 삭제"""
+        now = time.time()
+        for job in self.list():
+            if job['status'] not in ACTIVE_STATUSES and now - (job.get('finished_at') or now) > self.retention:
+                for ext in ('json', 'bin'):
+                    try:
+                        os.remove(self._path(job['id'], ext))
+                    except FileNotFoundError:
+                        pass
+
+    def submit(self, kind, params=None, submitted_by=None):
+        """작업 등록. 같은 작업이 진행 중이면 그 작업을 반환 (deduplicated=True)"""
+        if kind not in self._handlers:
+            raise ValueError(f'알 수 없는 작업 종류: {kind}')
+        params = params or {}
+        key = hashlib.sha1(json.dumps([kind, params], sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+        self.cleanup()
+        # 다른 워커 프로세스와의 중복 등록 방지를 위해 디렉터리 잠금 파일 사용
+        with self._lock, open(os.path.join(self.job_dir, '.lock'), 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            for job in self.list():
+                if job['key'] == key and job['status'] in ACTIVE_STATUSES:
+                    return dict(job, deduplicated=True)
+
+            job = {
+                'id': uuid.uuid4().hex,
+                'key': key,
+                'kind': kind,
+                'params': params,
+                'status': 'queued',
+                'submitted_by': submitted_by,
+                'submitted_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'error': None,
+                'pid': os.getpid(),
+            }
+            self._write(job)
+        try:
+            self._get_executor().submit(_run_job, self.job_dir, job, self._handlers[kind])
+        except Exception as e:
+            log.error("작업 시작 실패 (%s %s): %s", kind, job['id'], e)
+            self.shutdown()  # 깨진 풀(BrokenProcessPool)은 버리고 다음 작업 때 새로 생성
+            job.update(status='failed', error=str(e), finished_at=time.time())
+            self._write(job)
+        return dict(job, deduplicated=False)
+
+def _default_job_dir():
+    path = JOB_POLICY.get('dir') or os.path.join(tempfile.gettempdir(), 'laborapp-jobs')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+job_runner = JobRunner(_default_job_dir(),
+                       max_workers=JOB_POLICY.get('max_workers', 2),
+                       retention=JOB_POLICY.get('retention', 600))
@@ -0,0 +1,91 @@
+# lifecycle.py - 워커 프로세스 수명 주기 훅 (gunicorn preload/포크 대응, 워밍업, 메모리 기준 재시작)
+import os
+import time
+import threading
+from app_logging import get_logger
+
+log = get_logger('lifecycle')
+
+# 단계별 등록 함수 목록
+#   pre_fork: 마스터에서 포크 직전 (공유하면 안 되는 자원 정리)
+#   worker_init: 워커 프로세스에서 앱 로드 후 1회 (연결/스레드/캐시 재초기화)
+#   warm_up: worker_init 이후 백그라운드 스레드에서 실행 (캐시 채우기, 끝나기 전에는 /readyz 503)
+#   worker_exit: 워커 종료 시
+_hooks = {'pre_fork': [], 'worker_init': [], 'warm_up': [], 'worker_exit': []}
+_initialized_pid = None
+_warm_pid = None      # 워밍업을 마친 프로세스
+_warm_failures = []   # 실패한 워밍업 함수 이름
+_warm_thread = None
+worker_identity = {}  # 지표용 워커 정보 (server, worker_class, preload)
+
+def register(stage, fn):
+    _hooks[stage].append(fn)
+    return fn
+
+def _run(stage, strict=False, failures=None):
+    timings = []
+    for fn in _hooks[stage]:
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception as e:
+            log.error("%s 단계 실패 (%s): %s", stage, fn.__name__, e)
+            if failures is not None:
+                failures.append(fn.__name__)
+            if strict:
+                raise
+        timings.append((fn.__name__, time.perf_counter() - start))
+    return timings
+
+def prepare_fork():
+    """마스터 프로세스에서 워커 포크 직전 호출"""
+    _run('pre_fork')
+
+def init_worker(**identity):
+    """워커 프로세스 초기화 (프로세스당 1회, 트래픽을 받기 전에 호출) + 백그라운드 워밍업 시작.
+
+    워밍업은 DB 재시도/연결 타임아웃으로 오래 걸릴 수 있어 워커 기동을 막지 않도록 별도 스레드에서 실행하고,
+    끝날 때까지는 /readyz가 503을 돌려 트래픽을 받지 않는다.
+    """
+    global _initialized_pid, _warm_thread
+    if _initialized_pid == os.getpid():
+        return
+    _initialized_pid = os.getpid()
+    worker_identity.update(identity)
+    _run('worker_init')
+    _warm_thread = threading.Thread(target=_warm_up, name='warm-up', daemon=True)
+    _warm_thread.start()
+
+def _warm_up():
+    global _warm_pid
+    # 워밍업 실패(DB 일시 장애 등)는 워커를 죽이지 않음 - 첫 요청에서 다시 조회
+    del _warm_failures[:]
+    timings = _run('warm_up', failures=_warm_failures)
+    _warm_pid = os.getpid()
+    if timings:
+        log.info("워커 %s 워밍업 완료", os.getpid(),
+                 extra={'timings_ms': {name: round(seconds * 1000) for name, seconds in timings}})
+
+def wait_warm(timeout=None):
+    """워밍업이 끝날 때까지 대기 (단독 실행용). 끝났으면 True"""
+    if _warm_thread is not None:
+        _warm_thread.join(timeout)
+    return _warm_pid == os.getpid()
+
+def warm_status():
+    """준비 상태 점검용: 이 프로세스의 워밍업 완료 여부, 진행 중 여부와 실패한 단계"""
+    return {'warm': _warm_pid == os.getpid(),
+            'warming': _warm_thread is not None and _warm_thread.is_alive(),
+            'failed': list(_warm_failures)}
+
+def shutdown_worker():
+    _run('worker_exit')
+
+def rss_bytes():
+    """현재 프로세스 상주 메모리 (리눅스 /proc 기준, 없으면 최대 사용량)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
@@ -0,0 +1,148 @@
+# live.py - 실시간 대시보드 변경 알림 (PostgreSQL LISTEN/NOTIFY → SSE)
+import os
+import sys
+import json
+import queue
+import select
+import threading
+import psycopg2
+from utils import SSE_POLICY, get_data_manager
+from calculations import _dashboard_row
+from app_logging import get_logger
+
+log = get_logger('live')
+
+# 알림을 보낼 쓰기 (다른 테이블 변경은 대시보드 행에 영향 없음)
+LIVE_TABLES = ('daily_data', 'projects')
+
+def is_async_worker():
+    """gevent 워커(몽키패치) 여부 - 유휴 연결이 스레드를 점유하지 않음"""
+    gevent_monkey = sys.modules.get('gevent.monkey')
+    return bool(gevent_monkey and gevent_monkey.is_module_patched('socket'))
+
+class LiveHub:
+    """워커 프로세스별 구독자 목록. LISTEN 스레드가 받은 변경을 프로젝트 행 변화량으로 만들어 전달."""
+
+    def __init__(self, channel):
+        self.channel = channel
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._last_status = {}  # 프로젝트별 마지막으로 보낸 상태
+
+    def after_fork(self):
+        """포크된 워커에서 호출: 부모의 LISTEN 스레드/구독자 상태를 물려받지 않음"""
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._listener = None
+        self._last_status = {}
+
+    @property
+    def max_streams(self):
+        return SSE_POLICY['max_streams_async'] if is_async_worker() else SSE_POLICY['max_streams']
+
+    def subscribe(self):
+        """구독 큐 반환 (동시 연결 한도를 넘으면 None)"""
+        with self._lock:
+            if len(self._subscribers) >= self.max_streams:
+                return None
+            q = queue.Queue(maxsize=100)
+            self._subscribers.add(q)
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name='live-listener', daemon=True)
+                self._listener.start()
+            return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    def publish(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                pass  # 느린 구독자는 건너뜀 (재접속 시 전체 화면 새로고침)
+
+    def project_delta(self, project_name):
+        """프로젝트 행의 현재 값 (삭제된 경우 removed 이벤트)"""
+        dm = get_data_manager()
+        # 알림은 커밋 직후 오므로 스냅샷(다른 워커의 쓰기는 다음 갱신 때 반영)이 아니라 DB에서 조회
+        project_data = dm.get_project(project_name, fresh=True)
+        if project_data is None:
+            self._last_status.pop(project_name, None)
+            return {'project_name': project_name, 'removed': True}
+        row = _dashboard_row(project_name, project_data, dm.get_labor_costs())
+        previous = self._last_status.get(project_name)
+        self._last_status[project_name] = row['status']
+        return {
+            'project_name': project_name,
+            'recent_date': row['recent_date'],
+            'today_workers': row['today_workers'],
+            'cumulative_workers': row['cumulative_workers'],
+            'status': row['status'],
+            'status_color': row['status_color'],
+            'flags': row['health_meta']['flags'],
+            'status_changed': previous is not None and previous != row['status'],
+        }
+
+    def _listen(self):
+        """LISTEN 전용 연결로 알림을 기다리다 구독자가 없으면 종료"""
+        conn = None
+        try:
+            conn = psycopg2.connect(os.environ.get('DATABASE_URL'), application_name='LaborApp-live')
+            conn.autocommit = True
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {self.channel}")
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._listener = None
+                        return
+                if select.select([conn], [], [], SSE_POLICY['heartbeat']) == ([], [], []):
+                    continue
+                conn.poll()
+                projects = set()
+                while conn.notifies:
+                    try:
+                        projects.add(json.loads(conn.notifies.pop(0).payload)['project_name'])
+                    except (ValueError, KeyError):
+                        pass
+                for project_name in projects:
+                    self.publish(self.project_delta(project_name))
+        except Exception as e:
+            log.error("실시간 알림 수신 실패: %s", e)
+        finally:
+            with self._lock:
+                if self._listener is threading.current_thread():
+                    self._listener = None
+            if conn is not None:
+                conn.close()
+
+    def on_data_write(self, table, action, data):
+        """DatabaseManager 쓰기 알림 콜백 - 다른 워커도 받도록 NOTIFY 발행"""
+        if table not in LIVE_TABLES or 'project_name' not in data:
+            return
+        get_data_manager().notify(self.channel, json.dumps(
+            {'table': table, 'action': action, 'project_name': data['project_name']}, ensure_ascii=False))
+
+hub = LiveHub(SSE_POLICY['channel'])
+
+def event_stream(q):
+    """SSE 응답 본문 생성기 (heartbeat 간격마다 주석으로 연결 유지)"""
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = q.get(timeout=SSE_POLICY['heartbeat'])
+            except queue.Empty:
+                yield ': ping\n\n'
+                continue
+            yield f"event: project\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+    finally:
+        hub.unsubscribe(q)
@@ -0,0 +1,363 @@
+# metrics.py - Prometheus 텍스트 형식 지표 (/metrics), 워커 프로세스 간 로컬 파일로 합산
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from utils import METRICS_POLICY
+from app_logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+log = get_logger('metrics')
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# 이름: (종류, 설명, 히스토그램 구간)
+DEFINITIONS = {
+    'laborapp_http_requests_total': ('counter', 'HTTP 요청 수', None),
+    'laborapp_http_request_duration_seconds': ('histogram', 'HTTP 요청 처리 시간', REQUEST_BUCKETS),
+    'laborapp_http_requests_in_flight': ('gauge', '처리 중인 요청 수', None),
+    'laborapp_db_query_duration_seconds': ('histogram', 'execute_query 실행 시간 (잠금 대기 제외)', DB_BUCKETS),
+    'laborapp_db_query_errors_total': ('counter', 'execute_query 실패 수', None),
+    'laborapp_db_lock_wait_seconds': ('histogram', 'DB 연결 잠금 대기 시간', DB_BUCKETS),
+    'laborapp_db_connections_in_use': ('gauge', '사용 중인 DB 연결 수', None),
+    'laborapp_db_connections_waiting': ('gauge', 'DB 연결을 기다리는 스레드 수', None),
+    'laborapp_cache_requests_total': ('counter', '캐시 조회 수 (result=hit|miss)', None),
+    'laborapp_cache_hit_ratio': ('gauge', '캐시 적중률 (전체 워커 합산)', None),
+    'laborapp_worker_info': ('gauge', '워커 프로세스 정보', None),
+    'laborapp_process_resident_memory_bytes': ('gauge', '워커 상주 메모리', None),
+    'laborapp_process_start_time_seconds': ('gauge', '워커 시작 시각 (유닉스 시간)', None),
+}
+
+DB_OPERATIONS = ('SELECT', 'INSERT', 'UPDATE', 'DELETE', 'WITH', 'CREATE', 'ALTER')
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(labels):
+    """{'a': 1} → 'a="1"' (정렬해서 같은 조합이 같은 키가 되도록)"""
+    if not labels:
+        return ''
+    return ','.join(f'{k}="{_escape(v)}"' for k, v in sorted(labels.items()))
+
+def _series(name, labels, suffix=''):
+    return f'{name}{suffix}{{{labels}}}' if labels else f'{name}{suffix}'
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+def db_operation(query):
+    """SQL 첫 단어로 쿼리 종류 구분 (라벨 수를 제한)"""
+    word = query.lstrip().split(None, 1)[0].upper() if query.strip() else ''
+    return word if word in DB_OPERATIONS else 'OTHER'
+
+def _default_dir():
+    url_hash = hashlib.sha1((os.environ.get('DATABASE_URL') or '').encode()).hexdigest()[:10]
+    return METRICS_POLICY.get('dir') or os.path.join(tempfile.gettempdir(), f'laborapp-metrics-{url_hash}')
+
+class MetricsRegistry:
+    """워커 프로세스의 지표 저장소.
+
+    카운터/히스토그램은 워커별 파일(worker-<pid>.json)로 주기적으로 기록하고, /metrics 요청 시 모든
+    워커 파일을 더해서 내보낸다. 종료된 워커의 값은 archive.json에 합쳐 두므로 카운터가 줄지 않는다.
+    게이지(연결 수, 메모리 등)는 수집 함수가 기록 시점에 채우며 pid 라벨을 붙여 워커별로 내보낸다.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or _default_dir()
+        self._collectors = []
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._counters = {}    # (이름, 라벨) → 값
+        self._histograms = {}  # (이름, 라벨) → [구간별 개수..., +Inf 개수, 합계]
+        self._thread = None
+        self._stop = threading.Event()
+        self.started_at = time.time()
+
+    # ===== 기록 =====
+    def inc(self, name, labels=None, value=1):
+        if not METRICS_POLICY.get('enabled', True):
+            return
+        key = (name, _labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        if not METRICS_POLICY.get('enabled', True):
+            return
+        buckets = DEFINITIONS[name][2]
+        key = (name, _labels(labels))
+        with self._lock:
+            row = self._histograms.get(key)
+            if row is None:
+                row = self._histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(buckets)] += 1
+            row[-1] += value
+
+    def add_collector(self, fn):
+        """fn() → [(이름, 라벨 dict, 값), ...] 게이지 수집 함수 등록"""
+        self._collectors.append(fn)
+        return fn
+
+    # ===== 워커 파일 =====
+    def _path(self, pid):
+        return os.path.join(self.directory, f'worker-{pid}.json')
+
+    def _gauges(self):
+        gauges = []
+        for fn in self._collectors:
+            try:
+                for name, labels, value in fn():
+                    gauges.append([name, _labels(dict(labels or {}, pid=self._pid)), value])
+            except Exception as e:
+                log.error("지표 수집 실패 (%s): %s", fn.__name__, e)
+        return gauges
+
+    def flush(self):
+        """이 워커의 현재 값을 파일로 기록 (임시 파일 → 교체라 읽는 쪽은 항상 완전한 파일을 봄)"""
+        if not METRICS_POLICY.get('enabled', True):
+            return
+        with self._lock:
+            state = {
+                'pid': self._pid,
+                'counters': [[n, l, v] for (n, l), v in self._counters.items()],
+                'histograms': [[n, l, list(v)] for (n, l), v in self._histograms.items()],
+            }
+        state['gauges'] = self._gauges()
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(self._pid)
+        tmp = f'{path}.{threading.get_ident()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp, path)
+
+    def start(self):
+        """워커에서 주기적 기록 스레드 시작 (포크 후 호출, 부모에서 센 값은 버림)"""
+        if self._pid != os.getpid():
+            self._reset()
+        if not METRICS_POLICY.get('enabled', True) or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(target=self._run, name='metrics-flusher', daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(METRICS_POLICY.get('flush_interval', 5)):
+            try:
+                self.flush()
+            except Exception as e:
+                log.error("지표 기록 실패: %s", e)
+
+    def shutdown(self):
+        """워커 종료 시 마지막 값을 기록 (다음 수집 때 archive.json으로 합쳐짐)"""
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception as e:
+            log.error("지표 기록 실패: %s", e)
+
+    def clear(self):
+        """서버 시작 시 이전 실행의 파일 삭제 (gunicorn on_starting)"""
+        if not os.path.isdir(self.directory):
+            return
+        for name in os.listdir(self.directory):
+            if name.startswith('worker-') or name == 'archive.json':
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+
+    # ===== 합산 =====
+    @staticmethod
+    def _alive(pid):
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    @staticmethod
+    def _merge(total, state):
+        for name, labels, value in state.get('counters', []):
+            key = (name, labels)
+            total['counters'][key] = total['counters'].get(key, 0) + value
+        for name, labels, row in state.get('histograms', []):
+            key = (name, labels)
+            current = total['histograms'].get(key)
+            total['histograms'][key] = row if current is None else [a + b for a, b in zip(current, row)]
+
+    @staticmethod
+    def _read(path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _archive_dead(self, dead):
+        """종료된 워커 파일을 archive.json에 합치고 삭제 (여러 워커가 동시에 수집해도 한 번만)"""
+        with open(os.path.join(self.directory, '.lock'), 'a') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            archive_path = os.path.join(self.directory, 'archive.json')
+            archived = {'counters': {}, 'histograms': {}}
+            self._merge(archived, self._read(archive_path) or {})
+            merged = False
+            for path in dead:
+                state = self._read(path)
+                if state is None:
+                    continue  # 다른 워커가 이미 처리
+                self._merge(archived, state)
+                os.remove(path)
+                merged = True
+            if merged:
+                tmp = archive_path + '.tmp'
+                with open(tmp, 'w') as f:
+                    json.dump({
+                        'counters': [[n, l, v] for (n, l), v in archived['counters'].items()],
+                        'histograms': [[n, l, v] for (n, l), v in archived['histograms'].items()],
+                    }, f)
+                os.replace(tmp, archive_path)
+
+    def collect(self):
+        """모든 워커 값 합산: {'counters', 'histograms', 'gauges'}"""
+        self.flush()
+        total = {'counters': {}, 'histograms': {}, 'gauges': []}
+        dead = []
+        for name in sorted(os.listdir(self.directory)):
+            if not (name.startswith('worker-') and name.endswith('.json')):
+                continue
+            path = os.path.join(self.directory, name)
+            state = self._read(path)
+            if state is None:
+                continue
+            if not self._alive(state.get('pid', 0)):
+                dead.append(path)
+                continue
+            self._merge(total, state)
+            total['gauges'].extend(state.get('gauges', []))
+        if dead:
+            self._archive_dead(dead)
+        self._merge(total, self._read(os.path.join(self.directory, 'archive.json')) or {})
+        return total
+
+    def render(self):
+        """Prometheus 텍스트 형식 (text/plain; version=0.0.4)"""
+        total = self.collect()
+        by_name = {}
+        # 히스토그램 구간은 le 오름차순이어야 하므로 줄이 아니라 시계열 단위로 정렬
+        for (name, labels), value in sorted(total['counters'].items()):
+            by_name.setdefault(name, []).append(f'{_series(name, labels)} {_format_value(value)}')
+        for (name, labels), row in sorted(total['histograms'].items()):
+            buckets = DEFINITIONS[name][2]
+            lines, cumulative = by_name.setdefault(name, []), 0
+            for bound, count in zip(buckets + (float('inf'),), row):
+                cumulative += count
+                le = 'le="{}"'.format('+Inf' if bound == float('inf') else _format_value(float(bound)))
+                lines.append(f"{_series(name, f'{labels},{le}' if labels else le, '_bucket')} {cumulative}")
+            lines.append(f'{_series(name, labels, "_sum")} {_format_value(row[-1])}')
+            lines.append(f'{_series(name, labels, "_count")} {cumulative}')
+        for name, labels, value in sorted(total['gauges']):
+            by_name.setdefault(name, []).append(f'{_series(name, labels)} {_format_value(value)}')
+
+        # 캐시별 적중률 (전체 워커 합산 카운터 기준)
+        caches = {}
+        for (name, labels), value in total['counters'].items():
+            if name == 'laborapp_cache_requests_total':
+                parts = dict(part.split('=', 1) for part in labels.split(','))
+                row = caches.setdefault(parts['cache'], [0, 0])
+                row[0 if parts['result'] == '"hit"' else 1] += value
+        for cache, (hits, misses) in sorted(caches.items()):
+            ratio = hits / (hits + misses) if hits + misses else 0.0
+            by_name.setdefault('laborapp_cache_hit_ratio', []).append(
+                f'laborapp_cache_hit_ratio{{cache={cache}}} {round(ratio, 4)}')
+
+        out = []
+        for name, (kind, help_text, _) in DEFINITIONS.items():
+            if name not in by_name:
+                continue
+            out.append(f'# HELP {name} {help_text}')
+            out.append(f'# TYPE {name} {kind}')
+            out.extend(by_name[name])
+        return '\n'.join(out) + '\n'
+
+registry = MetricsRegistry()
+
+def count_cache(cache, hit):
+    """캐시 조회 결과 기록 (hit=True/False)"""
+    registry.inc('laborapp_cache_requests_total', {'cache': cache, 'result': 'hit' if hit else 'miss'})
+
+def _worker_gauges():
+    import lifecycle
+    identity = lifecycle.worker_identity
+    info = {'server': identity.get('server', 'flask'),
+            'worker_class': identity.get('worker_class', ''),
+            'preload': identity.get('preload', '')}
+    return [
+        ('laborapp_worker_info', info, 1),
+        ('laborapp_http_requests_in_flight', None, _in_flight[0]),
+        ('laborapp_process_resident_memory_bytes', None, lifecycle.rss_bytes()),
+        ('laborapp_process_start_time_seconds', None, round(registry.started_at, 3)),
+    ]
+
+_in_flight = [0]
+_in_flight_lock = threading.Lock()
+registry.add_collector(_worker_gauges)
+
+def register_metrics_routes(app, dm):
+    """요청 수/지연 시간 기록 훅과 /metrics 엔드포인트 등록"""
+    from flask import g, request, Response, abort
+
+    @registry.add_collector
+    def _db_gauges():
+        in_use, waiting = dm.lock_stats()
+        return [('laborapp_db_connections_in_use', None, in_use),
+                ('laborapp_db_connections_waiting', None, waiting)]
+
+    @app.before_request
+    def _start_request_timer():
+        g._metrics_start = time.perf_counter()
+        with _in_flight_lock:
+            _in_flight[0] += 1
+
+    @app.after_request
+    def _record_request(response):
+        start = g.pop('_metrics_start', None)
+        if start is None:
+            return response
+        with _in_flight_lock:
+            _in_flight[0] -= 1
+        endpoint = request.endpoint or 'unmatched'  # 404 등 라우트가 없는 요청은 하나로 묶음
+        registry.inc('laborapp_http_requests_total',
+                     {'endpoint': endpoint, 'method': request.method, 'status': response.status_code})
+        registry.observe('laborapp_http_request_duration_seconds', time.perf_counter() - start,
+                         {'endpoint': endpoint, 'method': request.method})
+        return response
+
+    @app.route('/metrics')
+    def metrics():
+        """Prometheus 수집용. METRICS_TOKEN이 설정되면 Authorization: Bearer <토큰> 필요"""
+        if not METRICS_POLICY.get('enabled', True):
+            abort(404)
+        token = METRICS_POLICY.get('token')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            abort(401)
+        return Response(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8',
+                        headers={'Cache-Control': 'no-store'})
@@ -0,0 +1,181 @@
+# profiler.py - 관리자 요청 단위 프로파일링 (?__profile=1 또는 X-Profile: 1) 및 저장된 프로파일 조회
+import os
+import re
+import time
+import pstats
+import cProfile
+import tempfile
+import threading
+from utils import PROFILE_POLICY, login_required
+from app_logging import get_logger
+
+log = get_logger('profiler')
+
+# cProfile은 스레드마다 따로 걸리지만 동시에 여러 개를 돌리면 서로의 측정 시간이 왜곡되므로 한 번에 하나만.
+# gevent 워커에서는 모든 그린렛(요청)이 OS 스레드 하나를 쓰므로 cProfile이 다른 요청까지 함께 측정한다.
+# 그래서 요청 프로파일은 gthread 워커에서만 수집하고, gevent 워커에서는 X-Profile: unsupported로 거절한다.
+_busy = threading.Lock()
+_local = threading.local()
+
+# 파일 이름: <시각>_<엔드포인트>_<pid>_<소요ms>ms.prof
+FILENAME_PATTERN = re.compile(r'^(\d{8}-\d{6}-\d{6})_([A-Za-z0-9_.]+)_(\d+)_(\d+)ms\.prof$')
+
+def profile_dir():
+    return PROFILE_POLICY.get('dir') or os.path.join(tempfile.gettempdir(), 'laborapp-profiles')
+
+def _requested(request, session):
+    """프로파일 요청 여부 (관리자 + /admin 경로 + 파라미터/헤더). 일반 요청은 여기서 바로 False"""
+    if request.args.get('__profile') != '1' and request.headers.get('X-Profile') != '1':
+        return False
+    return (PROFILE_POLICY.get('enabled', True) and request.path.startswith('/admin')
+            and session.get('role') == 'admin')
+
+def supported():
+    """요청 1건 단위 프로파일이 가능한 워커인지 (gevent 워커는 불가)"""
+    from live import is_async_worker
+    return not is_async_worker()
+
+def _prune(directory):
+    """보관 개수/기간을 넘는 오래된 프로파일 삭제"""
+    files = sorted(name for name in os.listdir(directory) if FILENAME_PATTERN.match(name))
+    cutoff = time.time() - PROFILE_POLICY['max_age_days'] * 86400
+    excess = len(files) - PROFILE_POLICY['max_files']
+    for i, name in enumerate(files):
+        path = os.path.join(directory, name)
+        try:
+            if i < excess or os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
+
+def save_profile(profiler, endpoint, elapsed):
+    directory = profile_dir()
+    os.makedirs(directory, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now)) + f'-{int(now % 1 * 1e6):06d}'
+    name = f"{stamp}_{re.sub(r'[^A-Za-z0-9_.]', '_', endpoint)}_{os.getpid()}_{elapsed * 1000:.0f}ms.prof"
+    profiler.dump_stats(os.path.join(directory, name))
+    _prune(directory)
+    return name
+
+def list_profiles():
+    """저장된 프로파일 (최신순): [{'name', 'created', 'endpoint', 'pid', 'elapsed_ms', 'size'}]"""
+    directory = profile_dir()
+    if not os.path.isdir(directory):
+        return []
+    profiles = []
+    for name in sorted(os.listdir(directory), reverse=True):
+        match = FILENAME_PATTERN.match(name)
+        if not match:
+            continue
+        stamp, endpoint, pid, elapsed_ms = match.groups()
+        try:
+            size = os.path.getsize(os.path.join(directory, name))
+        except OSError:
+            continue
+        profiles.append({
+            'name': name,
+            'created': f'{stamp[0:4]}-{stamp[4:6]}-{stamp[6:8]} {stamp[9:11]}:{stamp[11:13]}:{stamp[13:15]}',
+            'endpoint': endpoint,
+            'pid': int(pid),
+            'elapsed_ms': int(elapsed_ms),
+            'size': size,
+        })
+    return profiles
+
+def profile_path(name):
+    """목록에 있는 파일만 허용 (경로 조작 방지)"""
+    if not FILENAME_PATTERN.match(name or ''):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+def top_functions(path, sort='cumulative', limit=None):
+    """누적(또는 자체) 시간 기준 상위 함수 목록"""
+    stats = pstats.Stats(path)
+    stats.sort_stats(sort)
+    rows = []
+    for func in stats.fcn_list[:limit or PROFILE_POLICY['top_functions']]:
+        primitive_calls, calls, tottime, cumtime, _ = stats.stats[func]
+        filename, line, function = func
+        rows.append({
+            'function': function,
+            'location': f'{os.path.basename(filename)}:{line}' if line else filename,
+            'calls': calls if calls == primitive_calls else f'{calls}/{primitive_calls}',
+            'tottime_ms': round(tottime * 1000, 2),
+            'cumtime_ms': round(cumtime * 1000, 2),
+        })
+    return {'total_ms': round(stats.total_tt * 1000, 2), 'functions': rows}
+
+def register_profiling_routes(app):
+    """요청 프로파일링 훅과 /admin/profiles 조회 화면 등록"""
+    from flask import request, session, render_template, send_file, abort
+
+    @app.before_request
+    def _start_profile():
+        if not _requested(request, session):
+            return
+        if not supported():
+            _local.skipped = 'unsupported'  # 다른 그린렛의 실행까지 섞이므로 수집하지 않음
+            return
+        if not _busy.acquire(blocking=False):
+            _local.skipped = 'busy'  # 다른 요청을 프로파일하는 중
+            return
+        _local.started = time.perf_counter()
+        _local.profiler = cProfile.Profile()
+        _local.profiler.enable()
+
+    @app.after_request
+    def _finish_profile(response):
+        profiler = getattr(_local, 'profiler', None)
+        if profiler is None:
+            skipped = getattr(_local, 'skipped', False)
+            if skipped:
+                _local.skipped = False
+                response.headers['X-Profile'] = skipped
+            return response
+        profiler.disable()
+        _local.profiler = None
+        try:
+            name = save_profile(profiler, request.endpoint or 'unmatched', time.perf_counter() - _local.started)
+            response.headers['X-Profile'] = name
+            log.info("프로파일 저장: %s", name)
+        except Exception as e:
+            log.error("프로파일 저장 실패: %s", e)
+        finally:
+            _busy.release()
+        return response
+
+    @app.teardown_request
+    def _abort_profile(exc):
+        # after_request까지 가지 못한 경우 잠금 해제
+        profiler = getattr(_local, 'profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            _local.profiler = None
+            _busy.release()
+        _local.skipped = False
+
+    @app.route('/admin/profiles')
+    @app.route('/admin/profiles/<name>')
+    @login_required(role='admin')
+    def admin_profiles(name=None):
+        """저장된 요청 프로파일 목록 / 선택한 프로파일의 상위 함수 (?sort=cumulative|tottime)"""
+        detail = None
+        if name is not None:
+            path = profile_path(name)
+            if path is None:
+                abort(404)
+            sort = 'tottime' if request.args.get('sort') == 'tottime' else 'cumulative'
+            detail = dict(top_functions(path, sort), name=name, sort=sort)
+        return render_template('admin_profiles.html', profiles=list_profiles(), detail=detail,
+                               enabled=PROFILE_POLICY.get('enabled', True), supported=supported())
+
+    @app.route('/admin/profiles/<name>/download')
+    @login_required(role='admin')
+    def download_profile(name):
+        """원본 .prof 파일 (snakeviz 등으로 열기)"""
+        path = profile_path(name)
+        if path is None:
+            abort(404)
+        return send_file(path, mimetype='application/octet-stream', as_attachment=True, download_name=name)
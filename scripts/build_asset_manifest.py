@@ -0,0 +1,14 @@
+# build_asset_manifest.py - 빌드 시 static/asset-manifest.json 생성 (서비스 워커 사전 캐시 목록)
+# 실행: python scripts/build_asset_manifest.py [static 디렉터리]
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from assets import write_asset_manifest
+
+if __name__ == '__main__':
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base, 'static')
+    manifest = write_asset_manifest(static_dir)
+    print(f"✅ 자산 매니페스트 생성: {len(manifest['assets'])}개 파일 (버전 {manifest['version']})")
@@ -0,0 +1,43 @@
+# precompress_static.py - 빌드 시 static/ 파일의 .gz/.br 사본 생성
+# 실행: python scripts/precompress_static.py [static 디렉터리]
+import os
+import sys
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = ('.js', '.css', '.json', '.html', '.svg', '.txt', '.webmanifest')
+MIN_SIZE = 500
+
+def precompress(static_dir):
+    """압축 대상 파일마다 최고 압축률 사본 생성 (원본보다 작을 때만)"""
+    written = 0
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            if len(data) < MIN_SIZE:
+                continue
+            variants = [('.gz', gzip.compress(data, compresslevel=9, mtime=0))]
+            if brotli is not None:
+                variants.append(('.br', brotli.compress(data, quality=11)))
+            for ext, compressed in variants:
+                if len(compressed) >= len(data):
+                    continue
+                with open(path + ext, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+                print(f"{os.path.relpath(path + ext, static_dir)}: {len(data)} → {len(compressed)} bytes")
+    return written
+
+if __name__ == '__main__':
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(base, 'static')
+    count = precompress(static_dir)
+    print(f"✅ 사전 압축 파일 {count}개 생성 (brotli {'사용' if brotli else '미설치'})")
@@ -0,0 +1,116 @@
+# server_timing.py - 요청 단위 구간 시간 측정 (DB 조회, 계산 함수, 템플릿 렌더링) → Server-Timing 헤더
+import re
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from utils import SERVER_TIMING_POLICY
+from app_logging import get_logger
+
+log = get_logger('server_timing')
+
+# 요청 처리 중인 스레드(그린렛)만 기록. 요청 밖(백그라운드 스레드, 프로세스 풀)에서는 아무것도 안 함
+_local = threading.local()
+
+def _timings():
+    return getattr(_local, 'timings', None)
+
+def active():
+    """현재 스레드가 측정 중인 요청을 처리 중인지"""
+    return _timings() is not None
+
+def record(name, seconds):
+    """이름별 누적 시간과 횟수 기록"""
+    timings = _timings()
+    if timings is None:
+        return
+    row = timings.get(name)
+    if row is None:
+        timings[name] = [seconds, 1]
+    else:
+        row[0] += seconds
+        row[1] += 1
+
+@contextmanager
+def timer(name):
+    if _timings() is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+def timed(name):
+    """데코레이터: 요청 중 호출되면 실행 시간을 name으로 기록"""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if _timings() is None:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+_TOKEN_INVALID = re.compile(r'[^A-Za-z0-9!#$%&\'*+.^_`|~-]')
+
+def format_header(timings, total):
+    """Server-Timing 값: 'db.get_projects;dur=12.3;desc="3회", ..., total;dur=45.6'"""
+    parts = []
+    for name, (seconds, count) in sorted(timings.items(), key=lambda item: -item[1][0]):
+        part = f'{_TOKEN_INVALID.sub("_", name)};dur={seconds * 1000:.1f}'
+        if count > 1:
+            part += f';desc="{count}x"'
+        parts.append(part)
+    parts.append(f'total;dur={total * 1000:.1f}')
+    return ', '.join(parts)
+
+def register_timing_hooks(app):
+    """요청 시작/끝 훅과 템플릿 렌더링 시간 측정 등록"""
+    from flask import request, before_render_template, template_rendered
+
+    @app.before_request
+    def _start_timings():
+        if SERVER_TIMING_POLICY.get('enabled', True):
+            _local.timings = {}
+            _local.started = time.perf_counter()
+            _local.render_started = []
+
+    @app.after_request
+    def _emit_timings(response):
+        timings = _timings()
+        if timings is None:
+            return response
+        _local.timings = None
+        total = time.perf_counter() - _local.started
+        if SERVER_TIMING_POLICY.get('header', True):
+            response.headers['Server-Timing'] = format_header(timings, total)
+        if total * 1000 >= SERVER_TIMING_POLICY['slow_request_ms']:
+            log.warning("느린 요청 %s %s", request.method, request.path, extra={
+                'status': response.status_code,
+                'duration_ms': round(total * 1000, 1),
+                'timings': {name: {'ms': round(seconds * 1000, 1), 'count': count}
+                            for name, (seconds, count) in timings.items()},
+            })
+        return response
+
+    @app.teardown_request
+    def _clear_timings(exc):
+        _local.timings = None
+
+    def _before_render(sender, template, context, **extra):
+        if _timings() is not None:
+            _local.render_started.append(time.perf_counter())
+
+    def _after_render(sender, template, context, **extra):
+        if _timings() is not None and _local.render_started:
+            record('render', time.perf_counter() - _local.render_started.pop())
+
+    # 시그널은 기본이 약한 참조라 지역 함수가 사라지지 않도록 weak=False
+    before_render_template.connect(_before_render, app, weak=False)
+    template_rendered.connect(_after_render, app, weak=False)
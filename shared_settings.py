@@ -0,0 +1,88 @@
+# shared_settings.py - 관리 화면 설정(캐시 토글, 위험도 임계값)을 워커 프로세스 간 공유 (로컬 파일)
+import os
+import json
+import hashlib
+import tempfile
+import threading
+from utils import HEALTH_POLICY, ETAG_POLICY, FRAGMENT_POLICY, SNAPSHOT_POLICY, SINGLE_FLIGHT_POLICY
+from app_logging import get_logger
+
+try:
+    import fcntl
+except ImportError:  # Windows 개발 환경
+    fcntl = None
+
+log = get_logger('settings')
+
+class SharedSettings:
+    """관리 화면에서 바꾼 설정을 모든 워커가 같은 값으로 쓰도록 파일에 저장.
+
+    값은 기존 정책 dict(ETAG_POLICY 등)에 그대로 반영하므로 읽는 쪽 코드는 바뀌지 않는다.
+    refresh()는 요청마다 호출되며 파일이 바뀐 경우(inode/수정 시각)에만 다시 읽는다.
+    파일에는 바꾼 값만 들어 있고, 없는 값은 환경변수 기본값을 따른다.
+    """
+
+    def __init__(self, path, targets):
+        self.path = path
+        self._targets = targets  # {설정 이름: 정책 dict}
+        self._stamp = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            log.warning("공유 설정 파일을 읽지 못했습니다: %s", e)
+            return {}
+
+    def _apply(self, settings):
+        for name, values in settings.items():
+            target = self._targets.get(name)
+            if target is not None and isinstance(values, dict):
+                target.update({k: v for k, v in values.items() if k in target})
+
+    def refresh(self):
+        """파일이 바뀌었으면 다시 읽어 정책에 반영. 반영했으면 True"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return False
+        with self._lock:
+            if stamp == self._stamp:
+                return False
+            self._apply(self._load())
+            self._stamp = stamp
+        return True
+
+    def update(self, name, **values):
+        """설정 변경: 파일에 병합 저장(원자적 교체) 후 이 워커에 바로 반영"""
+        if name not in self._targets:
+            raise ValueError(f'알 수 없는 설정: {name}')
+        with open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            settings = self._load()
+            settings.setdefault(name, {}).update(values)
+            tmp = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(settings, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        self.refresh()
+
+def _default_settings_path():
+    url_hash = hashlib.sha1((os.environ.get('DATABASE_URL') or '').encode()).hexdigest()[:10]
+    return os.environ.get('SHARED_SETTINGS_FILE') or os.path.join(tempfile.gettempdir(), f'laborapp-settings-{url_hash}.json')
+
+shared_settings = SharedSettings(_default_settings_path(), {
+    'health': HEALTH_POLICY,
+    'etag': ETAG_POLICY,
+    'fragments': FRAGMENT_POLICY,
+    'snapshot': SNAPSHOT_POLICY,
+    'single_flight': SINGLE_FLIGHT_POLICY,
+})
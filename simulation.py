@@ -0,0 +1,176 @@
+# simulation.py - 노무단가/위험도 임계값 가정(what-if) 시뮬레이션
+import math
+from utils import HEALTH_POLICY, parse_float, policy_from_thresholds, get_data_manager
+from calculations import _health_result, _today_vs_recent_workers
+
+MAX_SCENARIOS = 50  # 요청당 최대 시나리오 수
+
+def prepare_simulation_base(projects_data, labor_costs):
+    """단가·임계값과 무관한 값을 한 번만 계산해 열(column) 형태로 보관.
+
+    (프로젝트, 공종) 쌍마다 계약금과 누계 투입인원을 나란히 두어 시나리오별로는
+    단가 열만 바꿔 한 번의 순회로 계약인원을 다시 계산한다.
+    """
+    names = []
+    invested = []
+    schedule_rates = []
+    workers = []  # (delta_ratio, today_workers, recent_avg)
+    pair_project = []
+    pair_work_type = []
+    pair_contract = []
+
+    for idx, (project_name, project_data) in enumerate(projects_data.items()):
+        contracts = project_data.get('contracts', {}) or {}
+        daily_data = project_data.get('daily_data', {}) or {}
+        work_types = project_data.get('work_types', []) or []
+
+        total_invested = 0
+        for wt in work_types:
+            for date_data in daily_data.values():
+                if wt in date_data:
+                    total_invested += int(date_data[wt].get('total', 0) or 0)
+            pair_project.append(idx)
+            pair_work_type.append(wt)
+            pair_contract.append(int(contracts.get(wt, 0) or 0))
+
+        schedule_rate = 0.0
+        schedule_count = 0
+        if daily_data:
+            latest_data = daily_data[max(daily_data.keys())]
+            for wt in work_types:
+                if wt in latest_data:
+                    schedule_rate += latest_data[wt].get('progress', 0)
+                    schedule_count += 1
+        if schedule_count > 0:
+            schedule_rate = schedule_rate / schedule_count
+
+        names.append(project_name)
+        invested.append(total_invested)
+        schedule_rates.append(schedule_rate)
+        workers.append(_today_vs_recent_workers(project_data))
+
+    return {
+        'names': names,
+        'invested': invested,
+        'schedule_rates': schedule_rates,
+        'workers': workers,
+        'pair_project': pair_project,
+        'pair_work_type': pair_work_type,
+        'pair_contract': pair_contract,
+        'labor_costs': labor_costs,
+    }
+
+def _number(value):
+    """숫자 또는 숫자 문자열 → 유한한 float (아니면 None)"""
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        return None
+    number = parse_float(value, None)
+    return number if number is not None and math.isfinite(number) else None
+
+def validate_scenario(scenario):
+    """시나리오 1개 형식 검사. 잘못되면 오류 메시지, 정상이면 None"""
+    if not isinstance(scenario, dict):
+        return '시나리오 형식이 올바르지 않습니다.'
+    name = scenario.get('name')
+    if name is not None and not isinstance(name, str):
+        return '시나리오 이름은 문자열이어야 합니다.'
+    labor_costs = scenario.get('labor_costs')
+    if labor_costs is not None:
+        if not isinstance(labor_costs, dict):
+            return 'labor_costs는 {공종: 단가} 형식이어야 합니다.'
+        for wt, value in labor_costs.items():
+            rate = _number(value.get('day', 0) if isinstance(value, dict) else value)
+            if rate is None or rate < 0:
+                return f'노무단가가 올바르지 않습니다: {wt}'
+    thresholds = scenario.get('thresholds')
+    if thresholds is not None:
+        if not isinstance(thresholds, dict):
+            return 'thresholds는 {항목: %} 형식이어야 합니다.'
+        for key, value in thresholds.items():
+            if value is not None and _number(value) is None:
+                return f'임계값이 올바르지 않습니다: {key}'
+    return None
+
+def _scenario_rate(value):
+    """시나리오 단가 값(숫자 또는 {'day': ...})을 주간 단가로 변환"""
+    if isinstance(value, dict):
+        value = value.get('day', 0)
+    return parse_float(value, 0.0)
+
+def _evaluate(base, rates=None, policy=None):
+    """한 시나리오의 프로젝트별 결과 목록 (rates/policy는 현재값에 덮어쓸 부분만)"""
+    labor_costs = base['labor_costs']
+    rates = rates or {}
+    rate_by_wt = {}
+    rate_col = []
+    for wt in base['pair_work_type']:
+        if wt not in rate_by_wt:
+            if wt in rates:
+                rate_by_wt[wt] = _scenario_rate(rates[wt])
+            else:
+                rate_by_wt[wt] = (labor_costs.get(wt, {}) or {}).get('day', 0) or 0
+        rate_col.append(rate_by_wt[wt])
+
+    contract_workers = [0.0] * len(base['names'])
+    for p, contract, rate in zip(base['pair_project'], base['pair_contract'], rate_col):
+        if rate > 0:
+            contract_workers[p] += contract / rate
+
+    policy = dict(HEALTH_POLICY, **(policy or {}))
+    results = []
+    for name, cw, inv, sched, (delta, today, recent) in zip(
+            base['names'], contract_workers, base['invested'], base['schedule_rates'], base['workers']):
+        cost_ratio = inv / cw if cw > 0 else 0
+        progress_rate = inv / cw * 100 if cw > 0 else 0
+        status, color, meta = _health_result(cost_ratio, progress_rate, sched, delta, today, recent, policy)
+        results.append({
+            'project_name': name,
+            'contract_workers': int(cw),
+            'status': status,
+            'status_color': color,
+            'cost_ratio': meta['cost_ratio'],
+            'progress_diff': meta['progress_diff'],
+            'flags': meta['flags'],
+        })
+    return results
+
+def _status_counts(results):
+    counts = {'양호': 0, '경고': 0, '위험': 0}
+    for r in results:
+        counts[r['status']] = counts.get(r['status'], 0) + 1
+    return counts
+
+def simulate_scenarios(base, scenarios):
+    """여러 시나리오를 평가해 현재 상태 대비 변경된 프로젝트만 반환.
+
+    scenario 형식: {'name': ..., 'labor_costs': {공종: 단가 또는 {'day': 단가}},
+                    'thresholds': 설정 화면과 같은 % 값 (일부 키만 가능)}
+    DB와 전역 HEALTH_POLICY는 변경하지 않는다.
+    """
+    current = _evaluate(base)
+    output = []
+    for i, scenario in enumerate(scenarios):
+        policy = policy_from_thresholds(scenario.get('thresholds') or {})
+        results = _evaluate(base, scenario.get('labor_costs') or {}, policy)
+        changed = []
+        for before, after in zip(current, results):
+            if (before['status'] != after['status'] or before['flags'] != after['flags']
+                    or before['contract_workers'] != after['contract_workers']):
+                changed.append({
+                    'project_name': after['project_name'],
+                    'before': {k: v for k, v in before.items() if k != 'project_name'},
+                    'after': {k: v for k, v in after.items() if k != 'project_name'},
+                })
+        output.append({
+            'name': scenario.get('name') or f'시나리오 {i + 1}',
+            'status_counts': {'before': _status_counts(current), 'after': _status_counts(results)},
+            'changed_count': len(changed),
+            'changed': changed,
+        })
+    return output
+
+def run_simulation(scenarios):
+    """현재 DB 데이터를 기준으로 시나리오 묶음을 평가"""
+    dm = get_data_manager()
+    base = prepare_simulation_base(dm.get_projects(), dm.get_labor_costs())
+    return simulate_scenarios(base, scenarios)
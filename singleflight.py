@@ -0,0 +1,112 @@
+# singleflight.py - 동시에 들어온 같은 계산을 한 번만 실행하고 결과를 나눠 쓰기 (워커 프로세스 내 스레드 간)
+import copy
+import time
+import threading
+from functools import wraps
+from utils import SINGLE_FLIGHT_POLICY
+from metrics import count_cache
+
+class _Call:
+    __slots__ = ('done', 'result', 'shared', 'error', 'waiters', 'duration')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.shared = None  # 기다린 스레드용 사본 (실행한 스레드가 결과를 고쳐도 영향 없음)
+        self.error = None
+        self.waiters = 0
+        self.duration = 0.0
+
+class SingleFlight:
+    """키별 진행 중 호출 표. 먼저 온 스레드가 실행하고, 그동안 같은 키로 온 스레드는 기다렸다가 결과를 받는다.
+
+    결과는 호출한 쪽에서 수정할 수 있으므로, 실행한 스레드가 결과를 돌려주기 전에 사본을 한 번 떠 두고
+    기다린 스레드는 그 사본에서 다시 깊은 복사해 받는다. 예외도 기다린 스레드 모두에게 그대로 전달된다.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def do(self, name, key, fn, copy_result=True):
+        with self._lock:
+            stats = self._stats.setdefault(name, {
+                'calls': 0, 'executions': 0, 'shared': 0, 'in_flight': 0,
+                'max_waiters': 0, 'total_seconds': 0.0, 'saved_seconds': 0.0,
+            })
+            stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                stats['in_flight'] += 1
+            else:
+                call.waiters += 1
+
+        count_cache('single_flight', not leader)
+        if not leader:
+            call.done.wait()
+            with self._lock:
+                stats['shared'] += 1
+                stats['saved_seconds'] += call.duration
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.shared) if copy_result else call.result
+
+        start = time.perf_counter()
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            call.duration = time.perf_counter() - start
+            with self._lock:
+                del self._calls[key]  # 이후로는 새로 기다리는 스레드가 없음
+                stats['in_flight'] -= 1
+                stats['executions'] += 1
+                stats['total_seconds'] += call.duration
+                stats['max_waiters'] = max(stats['max_waiters'], call.waiters)
+            if copy_result and call.waiters and call.error is None:
+                try:
+                    call.shared = copy.deepcopy(call.result)
+                except Exception as e:
+                    call.error = e
+            call.done.set()
+
+    def stats(self):
+        """{계산 이름: {'calls', 'executions', 'shared', 'in_flight', 'max_waiters', 'avg_ms', 'saved_seconds'}}"""
+        with self._lock:
+            return {
+                name: {
+                    'calls': row['calls'],
+                    'executions': row['executions'],
+                    'shared': row['shared'],
+                    'in_flight': row['in_flight'],
+                    'max_waiters': row['max_waiters'],
+                    'avg_ms': round(row['total_seconds'] / row['executions'] * 1000, 2) if row['executions'] else 0.0,
+                    'saved_seconds': round(row['saved_seconds'], 3),
+                }
+                for name, row in self._stats.items()
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+flights = SingleFlight()
+
+def single_flight(name, key=None, copy_result=True):
+    """데코레이터: 같은 인자의 동시 호출을 하나로 합침. key(*args, **kwargs)로 합칠 기준을 바꿀 수 있다.
+    copy_result=False면 기다린 스레드도 같은 결과 객체를 받는다 (읽기만 하는 큰 결과용)."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not SINGLE_FLIGHT_POLICY.get('enabled', True):
+                return fn(*args, **kwargs)
+            call_key = (name,) + ((key(*args, **kwargs),) if key else (args, tuple(sorted(kwargs.items()))))
+            return flights.do(name, call_key, lambda: fn(*args, **kwargs), copy_result)
+        return wrapper
+    return decorator
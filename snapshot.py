@@ -0,0 +1,249 @@
+# snapshot.py - 워커별 읽기 전용 데이터 스냅샷 (프로젝트/노무단가/집계) 및 백그라운드 갱신
+import time
+import pickle
+import threading
+from datetime import date, timedelta
+from utils import SNAPSHOT_POLICY, DAILY_DATA_WINDOW_DAYS
+from app_logging import get_logger
+
+log = get_logger('snapshot')
+
+def window_start():
+    """프로젝트 조회에 포함되는 첫 날짜 (DB 조회의 CURRENT_DATE - DAILY_DATA_WINDOW_DAYS와 같음)"""
+    return (date.today() - timedelta(days=DAILY_DATA_WINDOW_DAYS)).isoformat()
+
+def recent_daily_data(history, start):
+    """전체 일일 데이터(날짜 오름차순)에서 start 이후만, get_project()와 같은 순서 (날짜 내림차순, 공종 오름차순)"""
+    return {d: dict(sorted(rows.items())) for d, rows in sorted(history.items(), reverse=True) if d >= start}
+
+class DataSnapshot:
+    """한 시점의 읽기 데이터. 만든 뒤에는 수정하지 않고, 갱신 시 바뀐 부분만 새 객체로 교체한다.
+
+    projects의 daily_data는 DB 조회와 같은 최근 기간만, daily_history는 누계 계산용 전체 기간.
+    """
+
+    def __init__(self, projects, daily_history, labor_costs, labor_cost_history, work_type_totals, seq, window):
+        self.projects = projects
+        self.daily_history = daily_history
+        self.labor_costs = labor_costs
+        self.labor_cost_history = labor_cost_history
+        self.work_type_totals = work_type_totals
+        self.seq = seq  # 반영된 마지막 변경 로그 번호
+        self.window = window  # projects의 daily_data 시작 날짜
+        self.built_at = time.time()
+        # include_daily_data=False 조회용 (일일 데이터 제외 사본을 미리 만들어 둠)
+        self.projects_light = {name: dict(p, daily_data={}) for name, p in projects.items()}
+        self._size = None
+
+    # DatabaseManager 조회 메서드와 같은 형태로 반환 (최상위는 호출마다 새 dict)
+    def get_projects(self, include_daily_data=True):
+        return dict(self.projects if include_daily_data else self.projects_light)
+
+    def get_project(self, project_name):
+        project = self.projects.get(project_name)
+        return dict(project) if project is not None else None
+
+    def get_labor_costs(self):
+        return dict(self.labor_costs)
+
+    def get_labor_cost_history(self):
+        return dict(self.labor_cost_history)
+
+    def get_work_type_totals(self):
+        return dict(self.work_type_totals)
+
+    def get_daily_data_until(self, end_date, project_name=None, start_date=None):
+        end_key = str(end_date)
+        start_key = str(start_date) if start_date is not None else ''
+        names = [project_name] if project_name is not None else list(self.projects)
+        result = {}
+        for name in names:
+            if name not in self.projects:
+                continue
+            # 전체 기간은 DB 조회와 같은 오름차순으로 보관
+            daily = {d: v for d, v in self.daily_history.get(name, {}).items() if start_key <= d <= end_key}
+            if daily:
+                result[name] = daily
+        return result
+
+    def size(self):
+        """(일일 데이터 행 수, 대략적인 직렬화 바이트 수). 스냅샷마다 한 번만 계산"""
+        if self._size is None:
+            self._size = (
+                sum(len(rows) for history in self.daily_history.values() for rows in history.values()),
+                len(pickle.dumps((self.projects, self.daily_history, self.labor_costs,
+                                  self.labor_cost_history, self.work_type_totals))),
+            )
+        return self._size
+
+    def replace(self, projects=None, daily_history=None, labor_costs=None, labor_cost_history=None,
+                work_type_totals=None, seq=None):
+        """일부만 바꾼 새 스냅샷 (나머지는 공유)"""
+        return DataSnapshot(
+            self.projects if projects is None else projects,
+            self.daily_history if daily_history is None else daily_history,
+            self.labor_costs if labor_costs is None else labor_costs,
+            self.labor_cost_history if labor_cost_history is None else labor_cost_history,
+            self.work_type_totals if work_type_totals is None else work_type_totals,
+            self.seq if seq is None else seq,
+            self.window,
+        )
+
+class SnapshotStore:
+    """워커 프로세스의 현재 스냅샷과 갱신 스레드.
+
+    - 갱신 스레드는 변경 로그(change_log)를 짧은 주기로 읽어 바뀐 프로젝트/노무단가만 다시 조회해 교체
+      (다른 워커의 쓰기도 반영). 주기적으로 전체를 다시 만든다.
+    - 이 워커에서 쓰기가 일어나면 갱신이 끝날 때까지 조회를 DB로 돌려 방금 쓴 값이 바로 보이게 한다.
+    """
+
+    def __init__(self, dm):
+        self.dm = dm
+        self._snapshot = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._write_gen = 0     # 이 워커의 쓰기 횟수
+        self._applied_gen = 0   # 스냅샷에 반영된 쓰기 횟수
+        self._last_full = 0.0
+        self.full_refreshes = 0
+        self.partial_refreshes = 0
+        self.last_error = None
+
+    def current(self):
+        """조회에 쓸 스냅샷 (비활성, 미준비, 반영 전 쓰기가 있으면 None → DB 조회)"""
+        if not SNAPSHOT_POLICY.get('enabled') or self.is_refresher():
+            return None
+        if self._applied_gen != self._write_gen:
+            return None
+        return self._snapshot
+
+    def is_refresher(self):
+        return threading.current_thread() is self._thread
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='snapshot-refresher', daemon=True)
+            self._thread.start()
+
+    def wait_ready(self, timeout):
+        """첫 스냅샷이 만들어질 때까지 대기 (워밍업용). 준비되면 True"""
+        deadline = time.monotonic() + timeout
+        while self._snapshot is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return self._snapshot is not None
+
+    def on_data_write(self, table, action, data):
+        """DatabaseManager 쓰기 알림 콜백 - 즉시 갱신하도록 깨움"""
+        if table == 'users':
+            return
+        self._write_gen += 1
+        self._wake.set()
+
+    def request_full_refresh(self):
+        self._last_full = 0.0
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            if not SNAPSHOT_POLICY.get('enabled'):
+                self._wake.wait(SNAPSHOT_POLICY['poll_interval'])
+                self._wake.clear()
+                continue
+            try:
+                gen = self._write_gen
+                full_due = time.monotonic() - self._last_full > SNAPSHOT_POLICY['full_refresh_interval']
+                # 날짜가 바뀌면 최근 기간도 바뀌므로 전체 재생성
+                if self._snapshot is None or full_due or self._snapshot.window != window_start():
+                    self._full_refresh()
+                else:
+                    self._apply_changes()
+                self._applied_gen = gen
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                log.error("스냅샷 갱신 실패: %s", e)
+            self._wake.wait(SNAPSHOT_POLICY['poll_interval'])
+            self._wake.clear()
+
+    def _full_refresh(self):
+        # 변경 로그 번호를 먼저 읽어, 조회 중에 들어온 변경은 다음 주기에 다시 반영
+        _, seq, _ = self.dm.get_changes(0, 0)
+        start = window_start()
+        projects = self.dm.get_projects(include_daily_data=False)
+        daily = self.dm.get_daily_data_until('9999-12-31')
+        history = {name: daily.get(name, {}) for name in projects}
+        for name, project in projects.items():
+            project['daily_data'] = recent_daily_data(history[name], start)
+        self._snapshot = DataSnapshot(projects, history, self.dm.get_labor_costs(), self.dm.get_labor_cost_history(),
+                                      self.dm.get_work_type_totals(), seq, start)
+        self._last_full = time.monotonic()
+        self.full_refreshes += 1
+
+    def _apply_changes(self):
+        snapshot = self._snapshot
+        rows, head, purged_through = self.dm.get_changes(snapshot.seq, SNAPSHOT_POLICY['max_changes'] + 1)
+        if snapshot.seq < purged_through or snapshot.seq > head or len(rows) > SNAPSHOT_POLICY['max_changes']:
+            self._full_refresh()  # 밀린 변경이 너무 많으면 전체 재생성이 더 쌈
+            return
+        if not rows:
+            if head != snapshot.seq:
+                self._snapshot = snapshot.replace(seq=head)
+            return
+
+        changed_projects = {r['data'].get('project_name') for r in rows
+                            if r['table_name'] in ('projects', 'daily_data') and r['data']}
+        changed_projects.discard(None)
+        labor_changed = any(r['table_name'] == 'labor_costs' for r in rows)
+
+        # 전체 재생성과 같은 방식으로: 프로젝트 정보 + 전체 일일 데이터 → 같은 기간의 daily_data
+        projects = dict(snapshot.projects)
+        history = dict(snapshot.daily_history)
+        current = self.dm.get_projects(include_daily_data=False) if changed_projects else {}
+        for name in changed_projects:
+            project = current.get(name)
+            if project is None:
+                projects.pop(name, None)
+                history.pop(name, None)
+                continue
+            history[name] = self.dm.get_daily_data_until('9999-12-31', project_name=name).get(name, {})
+            project['daily_data'] = recent_daily_data(history[name], snapshot.window)
+            projects[name] = project
+
+        updates = {'projects': projects, 'daily_history': history, 'seq': head}
+        if labor_changed:
+            updates['labor_costs'] = self.dm.get_labor_costs()
+            updates['labor_cost_history'] = self.dm.get_labor_cost_history()
+            updates['work_type_totals'] = self.dm.get_work_type_totals()
+        elif changed_projects:
+            totals = {k: v for k, v in snapshot.work_type_totals.items() if k[0] not in changed_projects}
+            for name in changed_projects:
+                totals.update(self.dm.get_work_type_totals(project_name=name))
+            updates['work_type_totals'] = totals
+        self._snapshot = snapshot.replace(**updates)
+        self.partial_refreshes += 1
+
+    def stats(self):
+        snapshot = self._snapshot
+        result = {
+            'enabled': SNAPSHOT_POLICY.get('enabled', False),
+            'ready': snapshot is not None,
+            'serving': self.current() is not None,
+            'full_refreshes': self.full_refreshes,
+            'partial_refreshes': self.partial_refreshes,
+            'last_error': self.last_error,
+        }
+        if snapshot is not None:
+            daily_rows, approx_bytes = snapshot.size()
+            result.update(
+                seq=snapshot.seq,
+                age_seconds=round(time.time() - snapshot.built_at, 1),
+                window_start=snapshot.window,
+                projects=len(snapshot.projects),
+                daily_rows=daily_rows,
+                labor_costs=len(snapshot.labor_costs),
+                approx_bytes=approx_bytes,  # 대략적인 크기 (직렬화 바이트 수)
+            )
+        return result
@@ -0,0 +1,242 @@
+// attendance-queue.js - 오프라인 출역 입력 대기열 (IndexedDB) 및 일괄 전송
+// 화면과 서비스 워커(importScripts) 양쪽에서 사용
+(function (global) {
+  const DB_NAME = 'kiyeno-labor-offline';
+  const STORE = 'attendance';
+  const REJECTED_STORE = 'rejected';  // 서버가 거부한 제출 (사용자 확인 후 삭제)
+  const ENDPOINT = '/api/v1/attendance/batch';
+  const SYNC_TAG = 'attendance-sync';
+  const REJECTED_EVENT = 'attendance-queue:rejected';
+  // 서버 MAX_BATCH_SUBMISSIONS / MAX_BATCH_ENTRIES와 동일
+  const MAX_SUBMISSIONS = 200;
+  const MAX_ENTRIES = 2000;
+
+  let flushing = null;
+
+  function openDb() {
+    return new Promise((resolve, reject) => {
+      const request = indexedDB.open(DB_NAME, 2);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        if (!db.objectStoreNames.contains(STORE)) {
+          db.createObjectStore(STORE, { keyPath: 'submission_id' });
+        }
+        if (!db.objectStoreNames.contains(REJECTED_STORE)) {
+          db.createObjectStore(REJECTED_STORE, { keyPath: 'submission_id' });
+        }
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+
+  function withStore(mode, fn, storeName) {
+    const name = storeName || STORE;
+    return openDb().then(db => new Promise((resolve, reject) => {
+      const tx = db.transaction(name, mode);
+      const result = fn(tx.objectStore(name));
+      tx.oncomplete = () => { db.close(); resolve(result && 'result' in result ? result.result : undefined); };
+      tx.onerror = () => { db.close(); reject(tx.error); };
+    }));
+  }
+
+  function newSubmissionId() {
+    if (global.crypto && global.crypto.randomUUID) {
+      return global.crypto.randomUUID();
+    }
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2, 12);
+  }
+
+  function entryCount(submission) {
+    return (submission.entries || []).length;
+  }
+
+  // 제출 수 / 행 수 한도 안에서 오래된 것부터 채움 (한 건이 행 한도를 넘으면 그 한 건만)
+  function takeBatch(queued, maxSubmissions) {
+    const batch = [];
+    let entries = 0;
+    for (const submission of queued) {
+      if (batch.length >= maxSubmissions) {
+        break;
+      }
+      const count = entryCount(submission);
+      if (batch.length && entries + count > MAX_ENTRIES) {
+        break;
+      }
+      batch.push(submission);
+      entries += count;
+    }
+    return batch;
+  }
+
+  // 거부된 제출은 버리지 않고 별도 보관 후 화면에 알림
+  function keepRejected(submissions, messages) {
+    if (!submissions.length) {
+      return Promise.resolve();
+    }
+    const rejected = submissions.map(s => Object.assign({}, s, {
+      message: messages[s.submission_id] || '서버에서 거부되었습니다.',
+      rejected_at: Date.now()
+    }));
+    return withStore('readwrite', store => {
+      rejected.forEach(r => store.put(r));
+    }, REJECTED_STORE).then(() => notifyRejected(rejected));
+  }
+
+  function notifyRejected(rejected) {
+    if (typeof window !== 'undefined' && global === window) {
+      showRejected(rejected);
+    } else if (global.clients) {
+      // 서비스 워커: 열린 화면에 전달
+      return global.clients.matchAll({ type: 'window' }).then(list => {
+        list.forEach(client => client.postMessage({ type: REJECTED_EVENT, rejected: rejected }));
+      });
+    }
+  }
+
+  // 화면: 이벤트를 먼저 보내고, 처리하는 화면이 없으면 기본 알림창
+  function showRejected(rejected) {
+    const event = new CustomEvent(REJECTED_EVENT, { detail: rejected, cancelable: true });
+    if (window.dispatchEvent(event)) {
+      window.alert('전송되지 않은 출역 ' + rejected.length + '건:\n' + rejected.map(r =>
+        r.project_name + ' ' + r.work_date + ' - ' + r.message).join('\n'));
+    }
+  }
+
+  function registerSync() {
+    if (!global.navigator || !navigator.serviceWorker || global.registration) {
+      return Promise.resolve();
+    }
+    return navigator.serviceWorker.ready
+      .then(reg => reg.sync && reg.sync.register(SYNC_TAG))
+      .catch(() => undefined);
+  }
+
+  const AttendanceQueue = {
+    SYNC_TAG: SYNC_TAG,
+
+    // entries: [{work_type, day, night, midnight, progress}]
+    enqueue(projectName, workDate, entries) {
+      const submission = {
+        submission_id: newSubmissionId(),
+        project_name: projectName,
+        work_date: workDate,
+        entries: entries,
+        queued_at: Date.now()
+      };
+      return withStore('readwrite', store => store.put(submission))
+        .then(() => registerSync())
+        .then(() => {
+          if (global.navigator && navigator.onLine) {
+            AttendanceQueue.flush().catch(() => undefined);
+          }
+          return submission.submission_id;
+        });
+    },
+
+    pending() {
+      return withStore('readonly', store => store.getAll());
+    },
+
+    // 거부되어 보관 중인 제출 / 확인 후 삭제
+    rejected() {
+      return withStore('readonly', store => store.getAll(), REJECTED_STORE);
+    },
+
+    dismissRejected(submissionId) {
+      return withStore('readwrite', store => store.delete(submissionId), REJECTED_STORE);
+    },
+
+    // 대기열 전체를 묶어서 전송. 네트워크 오류면 reject (다음 sync/online 때 재시도)
+    flush() {
+      if (flushing) {
+        return flushing;
+      }
+      const summary = { applied: 0, duplicate: 0, rejected: [] };
+      let maxSubmissions = MAX_SUBMISSIONS;
+      const sendNext = () => AttendanceQueue.pending().then(queued => {
+        queued.sort((a, b) => a.queued_at - b.queued_at);
+        const batch = takeBatch(queued, maxSubmissions);
+        if (!batch.length) {
+          return summary;
+        }
+        return fetch(ENDPOINT, {
+          method: 'POST',
+          credentials: 'same-origin',
+          headers: { 'Content-Type': 'application/json' },
+          body: JSON.stringify({ submissions: batch })
+        })
+          .then(response => {
+            if (response.status === 413) {
+              if (batch.length > 1) {
+                // 한도 초과: 묶음을 반으로 줄여 다시 전송
+                maxSubmissions = Math.max(1, Math.floor(batch.length / 2));
+                return sendNext();
+              }
+              // 한 건이 한도를 넘으면 다시 보내도 실패하므로 거부로 처리
+              return response.json().catch(() => ({})).then(data => ({
+                results: [{
+                  submission_id: batch[0].submission_id,
+                  status: 'rejected',
+                  message: data.message || data.error || '한 번에 보낼 수 있는 행 수를 넘었습니다.'
+                }]
+              }));
+            }
+            if (!response.ok) {
+              throw new Error('일괄 전송 실패: ' + response.status);
+            }
+            return response.json();
+          })
+          .then(data => {
+            if (data === summary) {
+              return summary;  // 줄인 묶음으로 이미 처리됨
+            }
+            // applied / duplicate는 대기열에서 제거, rejected는 거부 목록으로 옮김 (재전송해도 실패)
+            // 결과는 요청 순서(index)로 묶음의 제출과 맞춤 (413 한 건 처리는 index 없음 → 0)
+            const messages = {};
+            const finished = [];
+            data.results.forEach(r => {
+              const submission = batch[r.index || 0];
+              if (!submission) {
+                return;
+              }
+              finished.push(submission);
+              if (r.status === 'rejected') {
+                summary.rejected.push(Object.assign({}, r, { submission_id: submission.submission_id }));
+                messages[submission.submission_id] = r.message;
+              } else {
+                summary[r.status] += 1;
+              }
+            });
+            return keepRejected(finished.filter(s => s.submission_id in messages), messages)
+              .then(() => withStore('readwrite', store => {
+                finished.forEach(s => store.delete(s.submission_id));
+              }))
+              .then(() => (finished.length ? sendNext() : summary));
+          });
+      });
+      flushing = sendNext().finally(() => { flushing = null; });
+      return flushing;
+    }
+  };
+
+  global.AttendanceQueue = AttendanceQueue;
+
+  // 화면: 연결이 돌아오면 즉시 전송 (Background Sync 미지원 브라우저 대비)
+  if (typeof window !== 'undefined' && global === window) {
+    if (navigator.serviceWorker) {
+      // 서비스 워커의 백그라운드 전송에서 거부된 제출
+      navigator.serviceWorker.addEventListener('message', event => {
+        if (event.data && event.data.type === REJECTED_EVENT) {
+          showRejected(event.data.rejected);
+        }
+      });
+    }
+    window.addEventListener('online', () => AttendanceQueue.flush().catch(() => undefined));
+    window.addEventListener('load', () => {
+      if (navigator.onLine) {
+        AttendanceQueue.flush().catch(() => undefined);
+      }
+    });
+  }
+})(self);
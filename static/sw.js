@@ -1,42 +1,119 @@
-const CACHE_NAME = 'kiyeno-labor-v1';
-const urlsToCache = [
-  '/',
-  '/static/manifest.json',
-  '/static/icons/icon-192x192.png',
-  '/static/icons/icon-512x512.png'
+// ASSET_VERSION, PRECACHE_URLS는 /sw.js 라우트가 asset-manifest.json으로 앞에 붙여 제공
+const PRECACHE = 'kiyeno-labor-assets-' + ASSET_VERSION;
+const RUNTIME = 'kiyeno-labor-runtime';
+
+// 오프라인 출역 대기열 (IndexedDB) - 연결 복구 시 Background Sync로 일괄 전송
+importScripts('/static/attendance-queue.js');
+
+// 읽기 전용 API: 캐시로 즉시 응답하고 뒤에서 갱신 (stale-while-revalidate)
+const SWR_PATHS = [
+  /^\/api\/v1\/(?!changes)/,  // 변경 피드는 항상 최신이어야 하므로 제외
+  /^\/get-available-work-types$/,
+  /^\/admin\/api\/(health-history|companies|forecast)$/
 ];
 
 self.addEventListener('install', event => {
   event.waitUntil(
-    caches.open(CACHE_NAME)
-      .then(cache => {
-        return cache.addAll(urlsToCache);
-      })
+    caches.open(PRECACHE)
+      .then(cache => cache.addAll(PRECACHE_URLS))
+      .then(() => self.skipWaiting())
   );
 });
 
-self.addEventListener('fetch', event => {
-  event.respondWith(
-    caches.match(event.request)
-      .then(response => {
-        if (response) {
-          return response;
-        }
-        return fetch(event.request);
-      })
+self.addEventListener('activate', event => {
+  // 이전 버전의 사전 캐시 삭제 (런타임 캐시는 유지)
+  event.waitUntil(
+    caches.keys()
+      .then(cacheNames => Promise.all(
+        cacheNames
+          .filter(name => name !== PRECACHE && name !== RUNTIME)
+          .map(name => caches.delete(name))
+      ))
+      .then(() => self.clients.claim())
   );
 });
 
-self.addEventListener('activate', event => {
-  event.waitUntil(
-    caches.keys().then(cacheNames => {
-      return Promise.all(
-        cacheNames.map(cacheName => {
-          if (cacheName !== CACHE_NAME) {
-            return caches.delete(cacheName);
-          }
-        })
-      );
+function cacheable(response) {
+  return response && response.ok && response.type === 'basic' &&
+    !(response.headers.get('Cache-Control') || '').includes('no-store');
+}
+
+// 해시가 붙은 정적 파일: 내용이 바뀌면 URL이 바뀌므로 캐시 우선
+function cacheFirst(request) {
+  return caches.match(request).then(cached => {
+    if (cached) {
+      return cached;
+    }
+    return fetch(request).then(response => {
+      if (cacheable(response)) {
+        const copy = response.clone();
+        caches.open(PRECACHE).then(cache => cache.put(request, copy));
+      }
+      return response;
+    });
+  });
+}
+
+function staleWhileRevalidate(event) {
+  const request = event.request;
+  return caches.open(RUNTIME).then(cache =>
+    cache.match(request).then(cached => {
+      const network = fetch(request).then(response => {
+        if (cacheable(response)) {
+          cache.put(request, response.clone());
+        }
+        return response;
+      });
+      if (cached) {
+        event.waitUntil(network.catch(() => undefined));
+        return cached;
+      }
+      return network;
     })
   );
-});
\ No newline at end of file
+}
+
+// 화면(HTML): 항상 네트워크, 오프라인일 때만 마지막으로 받은 화면
+function networkFirst(request) {
+  return fetch(request)
+    .then(response => {
+      if (cacheable(response)) {
+        const copy = response.clone();
+        caches.open(RUNTIME).then(cache => cache.put(request, copy));
+      }
+      return response;
+    })
+    .catch(() => caches.match(request).then(cached => cached || Response.error()));
+}
+
+self.addEventListener('fetch', event => {
+  const request = event.request;
+  const url = new URL(request.url);
+
+  // POST 등 쓰기 요청과 외부 요청은 가로채지 않음 (network-only)
+  if (request.method !== 'GET' || url.origin !== self.location.origin) {
+    return;
+  }
+
+  // 로그아웃 시 사용자별 런타임 캐시 삭제
+  if (url.pathname === '/logout') {
+    event.respondWith(caches.delete(RUNTIME).then(() => fetch(request)));
+    return;
+  }
+
+  if (url.pathname.startsWith('/static/') && url.searchParams.has('v')) {
+    event.respondWith(cacheFirst(request));
+  } else if (SWR_PATHS.some(pattern => pattern.test(url.pathname))) {
+    event.respondWith(staleWhileRevalidate(event));
+  } else if (request.mode === 'navigate') {
+    event.respondWith(networkFirst(request));
+  }
+  // 그 외(SSE, 작업 다운로드 등)는 브라우저 기본 동작
+});
+
+self.addEventListener('sync', event => {
+  if (event.tag === AttendanceQueue.SYNC_TAG) {
+    // 실패하면 reject → 브라우저가 나중에 다시 sync 실행
+    event.waitUntil(AttendanceQueue.flush());
+  }
+});
@@ -0,0 +1,102 @@
+# conftest.py - 저장소 최상위 모듈(flat 구조) import 경로 추가와 여러 테스트가 쓰는 픽스처
+import os
+import sys
+import time
+import threading
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def anomaly_detector():
+    """anomaly_detector(values, policy) -> 날짜순으로 values를 관측한 탐지기 ('A현장'/'형틀목공', 2024-01-01부터)"""
+    from anomaly import AttendanceAnomalyDetector
+
+    def make(values=(), policy=None):
+        detector = AttendanceAnomalyDetector(dict(policy or {}))
+        for day, value in enumerate(values, start=1):
+            detector.observe('A현장', '형틀목공', f'2024-01-{day:02d}', value)
+        return detector
+    return make
+
+@pytest.fixture
+def compressed_response():
+    """compressed_response(body, content_type, extra_headers, accept) -> 압축 미들웨어를 거친 (헤더, 본문)"""
+    from compression import CompressionMiddleware
+
+    def call(body, content_type='application/json', extra_headers=(), accept='gzip'):
+        def app(environ, start_response):
+            start_response('200 OK', [('Content-Type', content_type), *extra_headers])
+            return [body]
+
+        captured = {}
+
+        def start_response(status, headers, exc_info=None):
+            captured['status'], captured['headers'] = status, dict(headers)
+
+        environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': '/api', 'HTTP_ACCEPT_ENCODING': accept}
+        data = b''.join(CompressionMiddleware(app)(environ, start_response))
+        return captured['headers'], data
+    return call
+
+@pytest.fixture
+def work_type_index():
+    """work_type_index(names) -> names로 색인을 만든 WorkTypeIndex"""
+    from work_type_index import WorkTypeIndex
+
+    def build(names):
+        index = WorkTypeIndex()
+        index.build(names)
+        return index
+    return build
+
+@pytest.fixture
+def concurrent_callers():
+    """concurrent_callers(flight, fn, n_waiters, leader_hook) -> (실행 기록, 호출별 결과/예외).
+
+    리더 스레드가 fn 실행에 들어간 뒤 n_waiters개 스레드가 같은 키로 기다리게 하고 나서 fn을 풀어 준다.
+    """
+    def wait_for_waiters(flight, key, count, timeout=5):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with flight._lock:
+                call = flight._calls.get(key)
+                if call is not None and call.waiters >= count:
+                    return
+            time.sleep(0.001)
+        raise AssertionError('waiters did not arrive')
+
+    def run(flight, fn, n_waiters, leader_hook=None):
+        release = threading.Event()
+        executions = []
+
+        def gated():
+            executions.append(1)
+            release.wait(5)
+            return fn()
+
+        results, lock = [], threading.Lock()
+
+        def caller(hook=None):
+            try:
+                value = flight.do('test', 'key', gated)
+                if hook:
+                    hook(value)
+            except Exception as e:
+                value = e
+            with lock:
+                results.append(value)
+
+        leader = threading.Thread(target=caller, args=(leader_hook,))
+        leader.start()
+        while not executions:
+            time.sleep(0.001)
+        waiters = [threading.Thread(target=caller) for _ in range(n_waiters)]
+        for t in waiters:
+            t.start()
+        wait_for_waiters(flight, 'key', n_waiters)
+        release.set()
+        for t in [leader] + waiters:
+            t.join(5)
+        return executions, results
+    return run
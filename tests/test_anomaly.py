@@ -0,0 +1,66 @@
+# test_anomaly.py - 출역 이상치 판단의 최소 표본 수 경계, 늦은 입력, 변경 로그 동기화
+from datetime import date
+
+POLICY = {'BY_WEEKDAY': False, 'WINDOW_DAYS': 28, 'MIN_SAMPLES': 4, 'MIN_STD': 1.0,
+          'Z_WARN': 2.0, 'Z_DANGER': 3.0}
+
+def test_below_min_samples_is_never_flagged(anomaly_detector):
+    detector = anomaly_detector([10, 10, 10, 100], POLICY)  # 이전 표본 3개
+    assert detector.project_anomalies('A현장') == []
+    assert detector._latest[('A현장', '형틀목공')]['samples'] == 3
+
+def test_at_min_samples_outlier_is_flagged(anomaly_detector):
+    detector = anomaly_detector([10, 10, 10, 10, 100], POLICY)  # 이전 표본 4개
+    rows = detector.project_anomalies('A현장')
+    assert [r['level'] for r in rows] == ['bad']
+    assert rows[0]['samples'] == 4
+
+def test_min_std_floor_limits_sensitivity(anomaly_detector):
+    # 분산 0인 표본에서 1명 차이는 z=1 (MIN_STD 하한) → 정상
+    detector = anomaly_detector([10, 10, 10, 10, 11], POLICY)
+    assert detector.project_anomalies('A현장') == []
+
+def test_batch_write_notification_observes_every_row(anomaly_detector):
+    detector = anomaly_detector(policy=POLICY)
+    rows = [{'project_name': 'A현장', 'work_type': '형틀목공', 'work_date': f'2024-01-{d:02d}', 'total': v}
+            for d, v in enumerate([10, 10, 10, 10, 100], start=1)]
+    detector.on_data_write('daily_data', 'upsert_batch', {'project_name': 'A현장', 'rows': rows})
+    assert [r['level'] for r in detector.project_anomalies('A현장')] == ['bad']
+
+def test_late_entry_for_earlier_date_reevaluates_latest(anomaly_detector):
+    detector = anomaly_detector([10, 10, 10, 30], POLICY)  # 최신값 판단 전 표본 3개
+    assert detector.project_anomalies('A현장') == []
+    detector.observe('A현장', '형틀목공', '2023-12-31', 10)  # 늦게 들어온 과거 입력
+    assert [r['level'] for r in detector.project_anomalies('A현장')] == ['bad']
+
+class _ChangeFeed:
+    snapshot = None
+
+    def __init__(self, history):
+        self.history = history
+        self.changes = []
+        self.seed_ranges = []
+
+    def get_changes(self, since, limit=500, include_users=True):
+        head = self.changes[-1]['seq'] if self.changes else 0
+        return [c for c in self.changes if c['seq'] > since][:max(limit, 0)], head, 0
+
+    def get_daily_data_until(self, end_date, project_name=None, start_date=None):
+        self.seed_ranges.append((start_date, end_date))
+        return self.history
+
+def test_sync_seeds_weekday_window_and_applies_other_workers_entries(anomaly_detector):
+    policy = dict(POLICY, BY_WEEKDAY=True, WEEKDAY_WINDOW=6)
+    history = {'A현장': {f'2024-01-{d:02d}': {'형틀목공': {'total': 10}} for d in (1, 8, 15, 22)}}
+    feed = _ChangeFeed(history)
+    detector = anomaly_detector(policy=policy)
+    assert detector.seed_days() == 49
+    detector.sync(feed)
+    start, end = feed.seed_ranges[0]
+    assert (date.fromisoformat(end) - date.fromisoformat(start)).days == 49
+
+    feed.changes.append({'seq': 1, 'table_name': 'daily_data', 'action': 'upsert', 'data': {
+        'project_name': 'A현장', 'work_date': '2024-01-29', 'work_type': '형틀목공', 'total': 100}})
+    detector.sync(feed)
+    assert len(feed.seed_ranges) == 1
+    assert [r['level'] for r in detector.project_anomalies('A현장')] == ['bad']
@@ -0,0 +1,21 @@
+# test_compression.py - 응답 압축 미들웨어 (Accept-Encoding 협상, 최소 크기, Content-Type)
+import gzip
+
+BIG = b'{"rows":[' + b','.join(b'{"a":1}' for _ in range(200)) + b']}'
+
+def test_large_json_is_gzipped(compressed_response):
+    headers, body = compressed_response(BIG, extra_headers=[('ETag', '"abc"')])
+    assert headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in headers['Vary']
+    assert headers['ETag'] == 'W/"abc"'
+    assert gzip.decompress(body) == BIG
+
+def test_small_or_unlisted_responses_are_untouched(compressed_response):
+    headers, body = compressed_response(b'{"ok":true}')
+    assert 'Content-Encoding' not in headers and body == b'{"ok":true}'
+    headers, body = compressed_response(BIG, content_type='image/png')
+    assert 'Content-Encoding' not in headers and body == BIG
+
+def test_client_without_gzip_gets_identity(compressed_response):
+    headers, body = compressed_response(BIG, accept='gzip;q=0, identity')
+    assert 'Content-Encoding' not in headers and body == BIG
@@ -0,0 +1,76 @@
+# test_dashboard_rows.py - 대시보드 행 캐시 키와 행 조각 템플릿
+import os
+import pytest
+import calculations
+from utils import set_data_manager
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'templates')
+
+class _FakeManager:
+    """프로젝트 2개와 변경 로그만 흉내 내는 데이터 매니저 (조회 호출 기록)"""
+    snapshot = None
+
+    def __init__(self):
+        self.daily = {'2026-10-01': {'A': {'total': 3, 'progress': 5}}}
+        self.changes = []
+        self.calls = []
+
+    def get_changes(self, since, limit=500, include_users=True):
+        head = self.changes[-1]['seq'] if self.changes else 0
+        return [c for c in self.changes if c['seq'] > since][:max(limit, 0)], head, 0
+
+    def _project(self, include_daily_data=True):
+        return {'work_types': ['A'], 'contracts': {'A': 1000},
+                'daily_data': dict(self.daily) if include_daily_data else {}}
+
+    def get_projects(self, include_daily_data=True):
+        self.calls.append(('all', include_daily_data))
+        return {name: self._project(include_daily_data) for name in ('P', 'Q')}
+
+    def get_project(self, project_name, fresh=False):
+        self.calls.append(('one', project_name))
+        return self._project()
+
+    def get_labor_costs(self):
+        return {'A': {'day': 100}}
+
+    def get_daily_data_until(self, end_date, project_name=None, start_date=None):
+        return {}
+
+@pytest.fixture
+def manager():
+    dm = _FakeManager()
+    set_data_manager(dm)
+    calculations._dashboard_rows.clear()
+    yield dm
+    set_data_manager(None)
+
+def test_unchanged_projects_are_not_recomputed(manager):
+    first = calculations.calculate_dashboard_rows()
+    manager.calls.clear()
+    assert calculations.calculate_dashboard_rows() == first
+    assert manager.calls == [('all', False)]
+
+def test_change_from_other_worker_recomputes_only_that_project(manager):
+    before = dict(calculations.calculate_dashboard_rows())
+    manager.calls.clear()
+    manager.changes.append({'seq': 1, 'table_name': 'daily_data', 'action': 'upsert',
+                            'data': {'project_name': 'Q', 'work_date': '2026-10-01', 'work_type': 'A',
+                                     'total': 4, 'progress': 5}})
+    after = dict((key[0], key) for key, _ in calculations.calculate_dashboard_rows())
+    assert manager.calls == [('all', False), ('one', 'Q')]
+    assert after['P'] in before and after['Q'] not in before
+
+def test_project_row_template_renders_fields_and_anomalies():
+    jinja2 = pytest.importorskip('jinja2')
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader(TEMPLATE_DIR), autoescape=True)
+    html = env.get_template('_dashboard_project_row.html').render(project={
+        'project_name': '<현장A>', 'today_workers': 12, 'cumulative_workers': 340,
+        'status': '주의', 'status_color': 'yellow',
+        'anomalies': [{'level': 'bad', 'work_type': '철근공', 'date': '2026-10-01',
+                       'value': 40, 'mean': 10.0, 'z': 3.5}],
+    })
+    assert 'data-project="&lt;현장A&gt;"' in html
+    assert '<span data-field="today_workers">12</span>' in html
+    assert 'class="status-yellow">주의' in html
+    assert 'anomaly-bad' in html and '철근공 2026-10-01: 40명' in html
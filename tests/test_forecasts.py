@@ -0,0 +1,27 @@
+# test_forecasts.py - 예측 추세 누적합 갱신 (_refresh_trends)
+from calculations import _refresh_trends, _forecast_state, _series_points
+
+def _daily(days):
+    return {f'2026-10-{d:02d}': {'A': {'total': d, 'progress': d * 5}} for d in days}
+
+def _fresh_sums(daily):
+    points = _series_points(daily, ['A'])['A']
+    return len(points), sum(w for _, w, _ in points)
+
+def test_late_entry_inside_window_rebuilds_trend():
+    daily = _daily([1, 2, 3, 5, 6])
+    _refresh_trends('늦은입력', daily, ['A'])
+    daily.update(_daily([4]))
+    window = _refresh_trends('늦은입력', daily, ['A'])['A']
+    assert [p[0] for p in window.points] == sorted(daily)
+    assert (window.n, window.sw) == _fresh_sums(daily)
+    _forecast_state.pop('늦은입력', None)
+
+def test_new_dates_are_appended_incrementally():
+    daily = _daily([1, 2, 3])
+    first = _refresh_trends('추가', daily, ['A'])['A']
+    daily.update(_daily([4, 5]))
+    window = _refresh_trends('추가', daily, ['A'])['A']
+    assert window is first
+    assert (window.n, window.sw) == _fresh_sums(daily)
+    _forecast_state.pop('추가', None)
@@ -0,0 +1,33 @@
+# test_labor_rates.py - 적용일자별 노무단가 구간 조회 (LaborRateTable)
+from calculations import LaborRateTable
+
+HISTORY = {
+    '형틀목공': [
+        {'effective_date': '2024-03-01', 'day': 200000, 'night': 250000, 'midnight': 300000},
+        {'effective_date': '2024-01-01', 'day': 180000, 'night': 220000, 'midnight': 260000},
+    ],
+}
+CURRENT = {'형틀목공': {'day': 200000}, '철근공': {'day': 190000, 'night': 230000}}
+
+def test_rate_before_first_breakpoint_uses_first_rate():
+    table = LaborRateTable(HISTORY, CURRENT)
+    assert table.rate_on('형틀목공', '2023-12-31')['day'] == 180000
+
+def test_rate_on_and_between_breakpoints():
+    table = LaborRateTable(HISTORY, CURRENT)
+    assert table.rate_on('형틀목공', '2024-01-01')['day'] == 180000
+    assert table.rate_on('형틀목공', '2024-02-29')['day'] == 180000
+    assert table.rate_on('형틀목공', '2024-03-01')['day'] == 200000
+    assert table.rate_on('형틀목공', '2030-01-01')['day'] == 200000
+
+def test_work_type_without_history_uses_current_rate():
+    table = LaborRateTable(HISTORY, CURRENT)
+    assert table.rate_on('철근공', '2024-02-01') == {'day': 190000, 'night': 230000}
+    assert table.rate_on('없는공종', '2024-02-01') == {}
+
+def test_daily_cost_uses_shift_rates_of_that_day():
+    table = LaborRateTable(HISTORY, CURRENT)
+    work = {'day': 2, 'night': 1, 'midnight': '1'}
+    assert table.daily_cost('형틀목공', '2024-02-01', work) == 2 * 180000 + 220000 + 260000
+    assert table.daily_cost('형틀목공', '2024-03-02', work) == 2 * 200000 + 250000 + 300000
+    assert table.daily_cost('형틀목공', '2023-06-01', {'day': 1}) == 180000
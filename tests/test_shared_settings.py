@@ -0,0 +1,21 @@
+# test_shared_settings.py - 워커 간 공유 설정 파일 (SharedSettings)
+from shared_settings import SharedSettings
+
+def _worker(path):
+    return SharedSettings(str(path), {'etag': {'enabled': True}, 'health': {'COST_WARN_RATIO': 0.8}})
+
+def test_update_in_one_worker_is_seen_by_another(tmp_path):
+    path = tmp_path / 'settings.json'
+    a, b = _worker(path), _worker(path)
+    a.update('etag', enabled=False)
+    assert b.refresh() is True
+    assert b._targets['etag'] == {'enabled': False}
+    assert b.refresh() is False  # 바뀌지 않았으면 다시 읽지 않음
+
+def test_updates_merge_and_ignore_unknown_keys(tmp_path):
+    path = tmp_path / 'settings.json'
+    a, b = _worker(path), _worker(path)
+    a.update('etag', enabled=False)
+    a.update('health', COST_WARN_RATIO=0.7, UNKNOWN=1)
+    b.refresh()
+    assert b._targets == {'etag': {'enabled': False}, 'health': {'COST_WARN_RATIO': 0.7}}
@@ -0,0 +1,38 @@
+# test_simulation.py - 시뮬레이션 입력 검증과 시나리오 평가
+import pytest
+from simulation import validate_scenario, prepare_simulation_base, simulate_scenarios
+
+@pytest.mark.parametrize('scenario', [
+    {},
+    {'name': '단가 인상', 'labor_costs': {'형틀목공': 250000, '철근공': {'day': '210000'}}},
+    {'thresholds': {'cost_warn_ratio': 90, 'workers_warn_drop': None}},
+])
+def test_valid_scenarios(scenario):
+    assert validate_scenario(scenario) is None
+
+@pytest.mark.parametrize('scenario', [
+    'not a dict',
+    {'name': 3},
+    {'labor_costs': ['형틀목공']},
+    {'labor_costs': {'형틀목공': 'abc'}},
+    {'labor_costs': {'형틀목공': -1}},
+    {'labor_costs': {'형틀목공': float('nan')}},
+    {'labor_costs': {'형틀목공': {'day': [1]}}},
+    {'labor_costs': {'형틀목공': True}},
+    {'thresholds': 5},
+    {'thresholds': {'cost_warn_ratio': {}}},
+])
+def test_invalid_scenarios(scenario):
+    assert validate_scenario(scenario)
+
+def test_scenario_rate_change_only_reports_changed_projects():
+    projects = {
+        'A현장': {'work_types': ['형틀목공'], 'contracts': {'형틀목공': 10000000},
+                 'daily_data': {'2024-01-01': {'형틀목공': {'total': 10, 'progress': 50}}}},
+    }
+    base = prepare_simulation_base(projects, {'형틀목공': {'day': 100000}})
+    same, doubled = simulate_scenarios(base, [{'name': '동일'}, {'labor_costs': {'형틀목공': 200000}}])
+    assert same['changed_count'] == 0
+    assert doubled['name'] == '시나리오 2'
+    assert doubled['changed'][0]['before']['contract_workers'] == 100
+    assert doubled['changed'][0]['after']['contract_workers'] == 50
@@ -0,0 +1,30 @@
+# test_singleflight.py - 동시 호출 합치기 (SingleFlight)
+import pytest
+from singleflight import SingleFlight
+
+def test_concurrent_callers_share_one_execution(concurrent_callers):
+    flight = SingleFlight()
+    executions, results = concurrent_callers(flight, lambda: {'rows': [1, 2, 3]}, 5)
+    assert len(executions) == 1
+    assert results == [{'rows': [1, 2, 3]}] * 6
+    assert len({id(r) for r in results}) == 6  # 각자 사본
+    stats = flight.stats()['test']
+    assert stats['executions'] == 1 and stats['shared'] == 5 and stats['max_waiters'] == 5
+
+def test_leader_mutation_does_not_leak_to_waiters(concurrent_callers):
+    flight = SingleFlight()
+    executions, results = concurrent_callers(
+        flight, lambda: {'rows': [1]}, 3, leader_hook=lambda value: value['rows'].append('leader'))
+    assert sorted(len(r['rows']) for r in results) == [1, 1, 1, 2]
+
+def test_exception_is_raised_in_every_caller(concurrent_callers):
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('boom')
+
+    executions, results = concurrent_callers(flight, fail, 2)
+    assert len(executions) == 1
+    assert len(results) == 3 and all(isinstance(r, ValueError) for r in results)
+    with pytest.raises(ValueError):
+        flight.do('test', 'key', fail)
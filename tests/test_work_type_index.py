@@ -0,0 +1,23 @@
+# test_work_type_index.py - 공종명 정규화와 유사도 검색
+from work_type_index import normalize
+
+def test_normalize_removes_spaces_separators_and_width():
+    assert normalize(' 철근 공 ') == '철근공'
+    assert normalize('형틀-목공(A)') == '형틀목공a'
+    assert normalize('ＡＢＣ') == 'abc'
+    assert normalize(None) == ''
+
+def test_same_normalized_name_scores_one(work_type_index):
+    results = work_type_index(['철근공', '형틀목공', '미장공']).search('철 근-공')
+    assert results[0] == {'work_type': '철근공', 'score': 1.0, 'reason': 'normalized'}
+
+def test_exact_name_is_excluded(work_type_index):
+    assert all(r['work_type'] != '철근공' for r in work_type_index(['철근공', '철근']).search('철근공'))
+
+def test_containment_and_typo_candidates(work_type_index):
+    index = work_type_index(['철근공', '형틀목공', '도장공'])
+    assert index.search('철근')[0]['work_type'] == '철근공'
+    assert index.search('형틀목곡')[0]['work_type'] == '형틀목공'
+
+def test_blank_query_returns_nothing(work_type_index):
+    assert work_type_index(['철근공']).search('  ') == []
@@ -1,4 +1,5 @@
 # utils.py - 유틸리티 함수
+import os
 
 _data_manager = None
 
@@ -8,9 +9,159 @@ HEALTH_POLICY = {
     'long_term_care_rate': 0.004591,  # 장기요양보험료율 0.4591%
     'WORKERS_WINDOW_DAYS': 7,  # 평균 계산 기간(일)
     'PROGRESS_THRESHOLD': 80,  # 진도율 임계값(%)
-    'COST_DEVIATION_THRESHOLD': 20  # 비용 편차 임계값(%)
+    'COST_DEVIATION_THRESHOLD': 20,  # 비용 편차 임계값(%)
+    # 위험도 임계값 (관리자 설정 화면 기본값과 동일)
+    'COST_WARN_RATIO': 0.8,
+    'COST_DANGER_RATIO': 1.0,
+    'PROGRESS_WARN_DIFF': 0.05,
+    'PROGRESS_DANGER_DIFF': 0.10,
+    'WORKERS_WARN_DROP': -0.4,
+    'WORKERS_DANGER_DROP': -0.6,
+    'WORKERS_WARN_SURGE': 0.4,
+    'WORKERS_DANGER_SURGE': 0.6,
 }
 
+# 출역 이상치 탐지 설정 (공종별 이동 평균/분산 z-score)
+ANOMALY_POLICY = {
+    'BY_WEEKDAY': True,    # 요일별로 분리해 비교 (주말/휴일 패턴 반영)
+    'WINDOW_DAYS': 28,     # 요일 분리 안 할 때 비교 입력일 수
+    'WEEKDAY_WINDOW': 6,   # 요일 분리 시 같은 요일 비교 주 수
+    'MIN_SAMPLES': 4,      # 판단에 필요한 최소 표본 수
+    'MIN_STD': 1.0,        # 표준편차 하한 (분산이 0에 가까울 때 과민 반응 방지)
+    'Z_WARN': 2.0,
+    'Z_DANGER': 3.0,
+}
+
+# 조건부 GET(ETag) 설정 - 관리자 화면에서 켜고 끌 수 있음
+ETAG_POLICY = {
+    'enabled': os.environ.get('ETAG_ENABLED', '1') == '1',
+}
+
+# 대시보드 프로젝트 행 조각(fragment) 캐시 설정
+FRAGMENT_POLICY = {
+    'enabled': os.environ.get('FRAGMENT_CACHE', '1') == '1',
+    'max_entries': int(os.environ.get('FRAGMENT_CACHE_SIZE', '2000') or 2000),
+}
+
+# 백그라운드 작업(리포트) 설정
+JOB_POLICY = {
+    'dir': os.environ.get('JOB_DIR'),  # 미지정 시 임시 디렉터리
+    'max_workers': int(os.environ.get('JOB_MAX_WORKERS', '2') or 2),  # 워커 프로세스당 동시 실행 수
+    'retention': int(os.environ.get('JOB_RETENTION_SECONDS', '600') or 600),  # 결과 보관 시간(초)
+}
+
+# 실시간 대시보드(SSE) 설정
+SSE_POLICY = {
+    'channel': 'laborapp_changes',  # PostgreSQL LISTEN/NOTIFY 채널
+    'heartbeat': 15,  # 초, 유휴 연결 유지용 주석 전송 간격
+    # 스레드 워커(gthread)는 연결마다 스레드를 점유하므로 소수만 허용, gevent 워커는 크게
+    'max_streams': int(os.environ.get('SSE_MAX_STREAMS', '2') or 2),
+    'max_streams_async': int(os.environ.get('SSE_MAX_STREAMS_ASYNC', '1000') or 1000),
+}
+
+# 응답 압축 설정
+COMPRESSION_POLICY = {
+    'enabled': os.environ.get('COMPRESSION_ENABLED', '1') == '1',
+    'min_size': 500,       # 바이트, 이보다 작은 응답은 압축하지 않음
+    'level': 6,            # gzip 압축 레벨
+    'brotli_quality': 5,   # brotli 품질 (동적 응답용, 사전 압축은 최대 품질)
+    'content_types': (
+        'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript',
+        'application/javascript', 'application/json', 'application/manifest+json',
+        'image/svg+xml',
+    ),
+}
+
+# 공종명 유사도 검사 설정 (자모 n-gram 색인)
+SIMILARITY_POLICY = {
+    'min_score': 0.6,   # 이 점수 이상만 후보로 반환 (0~1)
+    'limit': 10,        # 최대 후보 수
+    'refresh': 60,      # 초, 다른 워커에서 바뀐 노무단가 반영 주기
+}
+
+# 증분 동기화 변경 로그 설정
+CHANGE_FEED_POLICY = {
+    'retention_days': int(os.environ.get('CHANGE_LOG_RETENTION_DAYS', '30') or 30),  # 이 기간이 지난 항목 삭제
+    'compact_after_hours': 24,   # 이보다 오래된 항목은 엔터티별 최신 항목만 유지
+    'compact_interval': 3600,    # 초, 워커별 정리 실행 간격
+    'max_limit': 1000,
+}
+
+# 프로젝트 조회에 포함하는 최근 일일 데이터 기간 (DB 조회와 스냅샷이 같은 값 사용)
+DAILY_DATA_WINDOW_DAYS = 30
+
+# 읽기 스냅샷 설정 (워커별 메모리 스냅샷에서 조회, 변경 로그로 갱신)
+SNAPSHOT_POLICY = {
+    'enabled': os.environ.get('DATA_SNAPSHOT', '0') == '1',
+    'poll_interval': float(os.environ.get('DATA_SNAPSHOT_POLL', '2') or 2),  # 초, 다른 워커 변경 확인 주기
+    'full_refresh_interval': 300,  # 초, 전체 재생성 주기
+    'max_changes': 500,            # 한 번에 밀린 변경이 이보다 많으면 전체 재생성
+}
+
+# 동시 계산 합치기 (같은 계산이 진행 중이면 기다렸다가 결과 공유)
+SINGLE_FLIGHT_POLICY = {
+    'enabled': os.environ.get('SINGLE_FLIGHT', '1') == '1',
+}
+
+# Prometheus 지표 (/metrics). 워커별 값을 로컬 파일로 모아 합산
+METRICS_POLICY = {
+    'enabled': os.environ.get('METRICS', '1') == '1',
+    'dir': os.environ.get('METRICS_DIR', ''),  # 비우면 임시 디렉터리
+    'token': os.environ.get('METRICS_TOKEN', ''),  # 설정하면 Authorization: Bearer 필요
+    'flush_interval': 5,  # 초, 워커 값 파일 기록 주기
+}
+
+# 요청 구간 시간 측정 (Server-Timing 헤더, 느린 요청 로그)
+SERVER_TIMING_POLICY = {
+    'enabled': os.environ.get('SERVER_TIMING', '1') == '1',
+    'header': os.environ.get('SERVER_TIMING_HEADER', '1') == '1',  # 0이면 로그만
+    'slow_request_ms': int(os.environ.get('SLOW_REQUEST_MS', '1000')),
+}
+
+# 관리자 요청 프로파일링 (?__profile=1 또는 X-Profile: 1 요청만 측정)
+PROFILE_POLICY = {
+    'enabled': os.environ.get('PROFILING', '1') == '1',
+    'dir': os.environ.get('PROFILE_DIR', ''),  # 비우면 임시 디렉터리
+    'max_files': int(os.environ.get('PROFILE_MAX_FILES', '50')),
+    'max_age_days': 7,
+    'top_functions': 40,
+}
+
+# 로그 (app_logging.py): 큐에 넣고 백그라운드 스레드가 stdout으로 기록
+LOG_POLICY = {
+    'level': os.environ.get('LOG_LEVEL', 'INFO').upper(),
+    'format': os.environ.get('LOG_FORMAT', 'json'),  # json | text
+    'access_log': os.environ.get('LOG_ACCESS', '1') == '1',  # 요청마다 1줄 (request_id, duration_ms)
+    'queue_size': 10000,  # 가득 차면 요청을 막지 않고 버림
+}
+
+# 대시보드 병렬 계산 설정 (프로세스 풀)
+PARALLEL_POLICY = {
+    'enabled': os.environ.get('DASHBOARD_PARALLEL', '0') == '1',
+    'max_workers': int(os.environ.get('DASHBOARD_PARALLEL_WORKERS', '0') or 0) or None,  # None이면 CPU 수
+    'min_projects': int(os.environ.get('DASHBOARD_PARALLEL_MIN_PROJECTS', '40') or 40),  # 이보다 적으면 직렬
+}
+
+# 설정 화면 위험도 임계값(%) → HEALTH_POLICY 키 변환 규칙
+_THRESHOLD_KEYS = {
+    'cost_warn_ratio': ('COST_WARN_RATIO', 1),
+    'cost_danger_ratio': ('COST_DANGER_RATIO', 1),
+    'progress_warn_diff': ('PROGRESS_WARN_DIFF', 1),
+    'progress_danger_diff': ('PROGRESS_DANGER_DIFF', 1),
+    'workers_warn_drop': ('WORKERS_WARN_DROP', -1),
+    'workers_danger_drop': ('WORKERS_DANGER_DROP', -1),
+    'workers_warn_surge': ('WORKERS_WARN_SURGE', 1),
+    'workers_danger_surge': ('WORKERS_DANGER_SURGE', 1),
+}
+
+def policy_from_thresholds(risk_thresholds):
+    """설정 화면 형식의 임계값(%)을 HEALTH_POLICY 갱신용 dict로 변환 (주어진 키만)"""
+    policy = {}
+    for key, (policy_key, sign) in _THRESHOLD_KEYS.items():
+        if key in risk_thresholds and risk_thresholds[key] is not None:
+            policy[policy_key] = sign * abs(parse_float(risk_thresholds[key])) / 100.0
+    return policy
+
 def set_data_manager(dm):
     """데이터 매니저를 설정합니다."""
     global _data_manager
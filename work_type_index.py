@@ -0,0 +1,183 @@
+# work_type_index.py - 공종명 유사도 색인 (정규화 + 한글 자모 분해 + 문자 n-gram)
+import re
+import math
+import heapq
+import time
+import threading
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from utils import SIMILARITY_POLICY, get_data_manager
+
+NGRAM = 2
+# 정규화 시 제거할 문자 (공백, 구분 기호)
+_SEPARATORS = re.compile(r'[\s\-_·.,/()\[\]{}]+')
+
+def normalize(name):
+    """비교용 정규형: 호환 문자 통일, 소문자, 공백/구분 기호 제거"""
+    return _SEPARATORS.sub('', unicodedata.normalize('NFKC', name or '').lower())
+
+def decompose_jamo(text):
+    """한글 음절을 초성/중성/종성 자모로 분해 ('철' → 'ᄎ','ᅥ','ᆯ'), 그 외 문자는 그대로"""
+    out = []
+    for ch in text:
+        code = ord(ch) - 0xAC00
+        if 0 <= code < 11172:
+            out.append(chr(0x1100 + code // 588))
+            out.append(chr(0x1161 + (code % 588) // 28))
+            if code % 28:
+                out.append(chr(0x11A7 + code % 28))
+        else:
+            out.append(ch)
+    return ''.join(out)
+
+def _containment_score(ratio):
+    """포함 관계 점수 (짧은 쪽 길이 / 긴 쪽 길이 비율 기준)"""
+    return 0.3 + 0.7 * ratio
+
+def _containment_ratio(min_score):
+    """포함 관계 점수가 min_score 이상이 되는 최소 길이 비율"""
+    return max(0.0, (min_score - 0.3) / 0.7)
+
+def ngrams(text, n=NGRAM):
+    """앞뒤 경계 표시를 붙인 문자 n-gram 집합"""
+    padded = f'^{text}$'
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+class WorkTypeIndex:
+    """공종명 유사도 색인. 자모 n-gram 역색인으로 후보를 좁힌 뒤 Dice 계수로 점수화.
+
+    - 정규형이 같으면('철근공' / '철 근공') 1.0
+    - 한쪽 정규형이 다른 쪽을 포함하면 길이 비율로 점수 ('철근' / '철근공')
+    - 그 외 자모 n-gram Dice 계수 (오타 한 글자도 자모 단위로 대부분 겹침)
+
+    id는 n-gram 개수 순으로 매기므로, 점수 하한으로 정해지는 후보 크기 범위를
+    각 역색인 목록에서 이분 탐색으로 잘라낼 수 있다. 입력과 가장 드문 n-gram을
+    하나도 공유하지 않는 이름은 하한을 넘을 수 없어 보지 않는다 (prefix filter).
+    """
+
+    def __init__(self):
+        self._names = []        # id → 원래 공종명 (n-gram 개수 순)
+        self._normalized = []   # id → 정규형
+        self._grams = []        # id → 자모 n-gram 집합
+        self._sizes = []        # id → n-gram 개수 (오름차순)
+        self._postings = {}     # n-gram → id 목록 (오름차순)
+        self._substrings = {}   # 정규형의 부분 문자열 → 그 문자열을 포함하는 id 목록
+        self._by_normalized = {}
+        self._built_at = None
+        self._dirty = True
+        self._lock = threading.Lock()
+
+    def build(self, names):
+        entries = []
+        for name in set(names):
+            norm = normalize(name)
+            if norm:
+                entries.append((name, norm, ngrams(decompose_jamo(norm))))
+        entries.sort(key=lambda e: (len(e[2]), e[0]))
+
+        # 포함 관계 점수가 하한을 넘을 수 있는 길이의 부분 문자열만 등록
+        min_ratio = _containment_ratio(SIMILARITY_POLICY.get('min_score', 0.6))
+        postings, substrings, by_normalized = defaultdict(list), defaultdict(list), defaultdict(list)
+        for i, (_, norm, gram_set) in enumerate(entries):
+            for g in gram_set:
+                postings[g].append(i)
+            by_normalized[norm].append(i)
+            length = len(norm)
+            shortest = max(1, math.ceil(length * min_ratio))
+            subs = {norm[a:b] for a in range(length) for b in range(a + shortest, length + 1)}
+            for sub in subs:
+                if sub != norm:
+                    substrings[sub].append(i)
+
+        with self._lock:
+            self._names = [e[0] for e in entries]
+            self._normalized = [e[1] for e in entries]
+            self._grams = [e[2] for e in entries]
+            self._sizes = [len(e[2]) for e in entries]
+            self._postings, self._substrings = dict(postings), dict(substrings)
+            self._by_normalized = dict(by_normalized)
+            self._built_at = time.monotonic()
+            self._dirty = False
+
+    def _ensure_fresh(self):
+        """쓰기 알림을 받았거나 refresh 주기가 지나면 노무단가 목록으로 재색인"""
+        if not self._dirty and time.monotonic() - self._built_at < SIMILARITY_POLICY.get('refresh', 60):
+            return
+        dm = get_data_manager()
+        if dm is not None:
+            self.build(dm.get_labor_costs().keys())
+
+    def search(self, query, limit=None, min_score=None):
+        """[{'work_type', 'score', 'reason'}] 점수 내림차순 (입력과 완전히 같은 이름은 제외)"""
+        self._ensure_fresh()
+        limit = limit or SIMILARITY_POLICY.get('limit', 10)
+        min_score = SIMILARITY_POLICY.get('min_score', 0.6) if min_score is None else min_score
+        min_score = max(min_score, 0.01)
+        query = (query or '').strip()
+        q_norm = normalize(query)
+        if not q_norm:
+            return []
+        q_grams = ngrams(decompose_jamo(q_norm))
+        q_size = len(q_grams)
+
+        with self._lock:
+            names, normalized, grams, sizes = self._names, self._normalized, self._grams, self._sizes
+            postings, substrings, by_normalized = self._postings, self._substrings, self._by_normalized
+
+        scores = {}
+        # Dice ≥ t 이려면 후보 크기가 [q·t/(2-t), q·(2-t)/t] 안에 있고 공통 n-gram이 q·t/(2-t)개 이상
+        lo_id = bisect_left(sizes, math.ceil(q_size * min_score / (2 - min_score) - 1e-9))
+        hi_id = bisect_right(sizes, math.floor(q_size * (2 - min_score) / min_score + 1e-9))
+        min_overlap = max(1, math.ceil(q_size * min_score / (2 - min_score) - 1e-9))
+        ordered = sorted(q_grams, key=lambda g: len(postings.get(g, ())))
+        prefix = q_size - min_overlap + 1
+        candidates, common = set(), Counter()
+        for rank, g in enumerate(ordered):
+            ids = postings.get(g)
+            if not ids:
+                continue
+            ids = ids[bisect_left(ids, lo_id):bisect_left(ids, hi_id)]
+            common.update(ids)
+            if rank < prefix:
+                candidates.update(ids)
+        for i in candidates:
+            count = common[i]
+            if count >= min_overlap:
+                score = 2.0 * count / (q_size + sizes[i])
+                if score >= min_score:
+                    scores[i] = (score, 'jamo')
+
+        # 포함 관계: 입력이 더 짧은 경우(부분 문자열 표), 입력이 더 긴 경우(입력의 부분 문자열)
+        contained = [(i, len(normalized[i])) for i in substrings.get(q_norm, ())]
+        for a in range(len(q_norm)):
+            for b in range(a + 1, len(q_norm) + 1):
+                if b - a < len(q_norm):
+                    contained.extend((i, len(q_norm)) for i in by_normalized.get(q_norm[a:b], ()))
+        for i, longer in contained:
+            shorter = min(len(q_norm), len(normalized[i]))
+            score = _containment_score(shorter / longer)
+            if score >= min_score and score > scores.get(i, (0, ''))[0]:
+                scores[i] = (score, 'contains')
+
+        for i in by_normalized.get(q_norm, ()):
+            scores[i] = (1.0, 'normalized')
+
+        query_lower = query.lower()
+        ranked = heapq.nsmallest(limit + 1, ((-score, names[i], reason) for i, (score, reason) in scores.items()))
+        return [
+            {'work_type': name, 'score': round(-neg_score, 3), 'reason': reason}
+            for neg_score, name, reason in ranked if name.lower() != query_lower
+        ][:limit]
+
+    def size(self):
+        return len(self._names)
+
+    def on_data_write(self, table, action, data):
+        """DatabaseManager 쓰기 알림 콜백 - 노무단가 변경 시 다음 조회에서 재색인"""
+        if table == 'labor_costs':
+            self._dirty = True
+
+work_type_index = WorkTypeIndex()